@@ -0,0 +1,175 @@
+"""初始表结构
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy import Text
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('knowledge_points',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=True),
+    sa.Column('subject', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('parent_id', sa.UUID(), nullable=True),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['parent_id'], ['knowledge_points.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    op.create_index(op.f('ix_knowledge_points_id'), 'knowledge_points', ['id'], unique=False)
+    op.create_index(op.f('ix_knowledge_points_name'), 'knowledge_points', ['name'], unique=False)
+    op.create_index(op.f('ix_knowledge_points_parent_id'), 'knowledge_points', ['parent_id'], unique=False)
+    op.create_index(op.f('ix_knowledge_points_subject'), 'knowledge_points', ['subject'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('nickname', sa.String(length=50), nullable=True),
+    sa.Column('bio', sa.String(length=500), nullable=True),
+    sa.Column('role', sa.Enum('STUDENT', 'TEACHER', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('phone')
+    )
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_role'), 'users', ['role'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('error_questions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('subject', sa.String(length=50), nullable=False),
+    sa.Column('chapter', sa.String(length=100), nullable=True),
+    sa.Column('question_text', sa.Text(), nullable=True),
+    sa.Column('question_image_url', sa.Text(), nullable=True),
+    sa.Column('correct_answer', sa.Text(), nullable=True),
+    sa.Column('user_answer', sa.Text(), nullable=True),
+    sa.Column('explanation', sa.Text(), nullable=True),
+    sa.Column('difficulty', sa.Enum('EASY', 'MEDIUM', 'HARD', name='difficultylevel'), nullable=False),
+    sa.Column('error_type', sa.Enum('CONCEPT', 'CALCULATION', 'CARELESS', 'METHOD', 'OTHER', name='errortype'), nullable=False),
+    sa.Column('tags', sa.String(length=500), nullable=True),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('mastery_level', sa.Float(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('next_review_at', sa.DateTime(), nullable=True),
+    sa.Column('is_archived', sa.Boolean(), nullable=False),
+    sa.Column('is_favorite', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_error_questions_created_at'), 'error_questions', ['created_at'], unique=False)
+    op.create_index(op.f('ix_error_questions_difficulty'), 'error_questions', ['difficulty'], unique=False)
+    op.create_index(op.f('ix_error_questions_error_type'), 'error_questions', ['error_type'], unique=False)
+    op.create_index(op.f('ix_error_questions_id'), 'error_questions', ['id'], unique=False)
+    op.create_index(op.f('ix_error_questions_subject'), 'error_questions', ['subject'], unique=False)
+    op.create_index(op.f('ix_error_questions_user_id'), 'error_questions', ['user_id'], unique=False)
+    op.create_table('ai_analyses',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('analysis_type', sa.String(length=50), nullable=False),
+    sa.Column('analysis_result', postgresql.JSONB(astext_type=Text()), nullable=False),
+    sa.Column('model_name', sa.String(length=100), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['error_questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_analyses_analysis_type'), 'ai_analyses', ['analysis_type'], unique=False)
+    op.create_index(op.f('ix_ai_analyses_id'), 'ai_analyses', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_analyses_question_id'), 'ai_analyses', ['question_id'], unique=False)
+    op.create_table('practice_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('user_answer', sa.Text(), nullable=True),
+    sa.Column('time_spent', sa.Integer(), nullable=False),
+    sa.Column('confidence', sa.Double(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['error_questions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_practice_records_created_at'), 'practice_records', ['created_at'], unique=False)
+    op.create_index(op.f('ix_practice_records_id'), 'practice_records', ['id'], unique=False)
+    op.create_index(op.f('ix_practice_records_question_id'), 'practice_records', ['question_id'], unique=False)
+    op.create_index(op.f('ix_practice_records_user_id'), 'practice_records', ['user_id'], unique=False)
+    op.create_table('question_knowledge_mappings',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('knowledge_point_id', sa.UUID(), nullable=False),
+    sa.Column('relevance_score', sa.Double(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['knowledge_point_id'], ['knowledge_points.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['error_questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_question_knowledge_mappings_knowledge_point_id'), 'question_knowledge_mappings', ['knowledge_point_id'], unique=False)
+    op.create_index(op.f('ix_question_knowledge_mappings_question_id'), 'question_knowledge_mappings', ['question_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_knowledge_mappings_knowledge_point_id'), table_name='question_knowledge_mappings')
+    op.drop_index(op.f('ix_question_knowledge_mappings_question_id'), table_name='question_knowledge_mappings')
+    op.drop_table('question_knowledge_mappings')
+    op.drop_index(op.f('ix_practice_records_created_at'), table_name='practice_records')
+    op.drop_index(op.f('ix_practice_records_id'), table_name='practice_records')
+    op.drop_index(op.f('ix_practice_records_question_id'), table_name='practice_records')
+    op.drop_index(op.f('ix_practice_records_user_id'), table_name='practice_records')
+    op.drop_table('practice_records')
+    op.drop_index(op.f('ix_ai_analyses_analysis_type'), table_name='ai_analyses')
+    op.drop_index(op.f('ix_ai_analyses_id'), table_name='ai_analyses')
+    op.drop_index(op.f('ix_ai_analyses_question_id'), table_name='ai_analyses')
+    op.drop_table('ai_analyses')
+    op.drop_index(op.f('ix_error_questions_created_at'), table_name='error_questions')
+    op.drop_index(op.f('ix_error_questions_difficulty'), table_name='error_questions')
+    op.drop_index(op.f('ix_error_questions_error_type'), table_name='error_questions')
+    op.drop_index(op.f('ix_error_questions_id'), table_name='error_questions')
+    op.drop_index(op.f('ix_error_questions_subject'), table_name='error_questions')
+    op.drop_index(op.f('ix_error_questions_user_id'), table_name='error_questions')
+    op.drop_table('error_questions')
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_role'), table_name='users')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_knowledge_points_id'), table_name='knowledge_points')
+    op.drop_index(op.f('ix_knowledge_points_name'), table_name='knowledge_points')
+    op.drop_index(op.f('ix_knowledge_points_parent_id'), table_name='knowledge_points')
+    op.drop_index(op.f('ix_knowledge_points_subject'), table_name='knowledge_points')
+    op.drop_table('knowledge_points')
+    sa.Enum(name="errortype").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="difficultylevel").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
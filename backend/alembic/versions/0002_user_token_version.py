@@ -0,0 +1,30 @@
+"""users.token_version：递增后使已签发的 Token 失效
+
+Revision ID: 0002_user_token_version
+Revises: 0001_baseline
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_user_token_version"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 带常量默认值的 ADD COLUMN 在 PostgreSQL 11+ 只修改元数据，不重写表
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,35 @@
+"""user_question_counters：按用户、维度维护的错题计数
+
+Revision ID: 0003_user_question_counters
+Revises: 0002_user_token_version
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_user_question_counters"
+down_revision: Union[str, Sequence[str], None] = "0002_user_token_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有用户的计数在首次读取或写入时由 question_counters 对账初始化，
+    # 也可在迁移后执行 python -m app.services.question_counters 一次性回填
+    op.create_table('user_question_counters',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'dimension', 'value')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_question_counters')
@@ -0,0 +1,73 @@
+"""error_questions：筛选 + 排序复合索引（替换单列索引）
+
+Revision ID: 0004_error_question_access_indexes
+Revises: 0003_user_question_counters
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_error_question_access_indexes"
+down_revision: Union[str, Sequence[str], None] = "0003_user_question_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SORT_COLUMNS = {"created": "created_at", "updated": "updated_at", "mastery": "mastery_level"}
+
+# (索引名, 列, 部分索引条件)，与 ErrorQuestion.__table_args__ 一致
+INDEXES = [
+    *[(f"ix_error_questions_user_{name}", ["user_id", column, "id"], None)
+      for name, column in SORT_COLUMNS.items()],
+    *[(f"ix_error_questions_user_subject_{name}", ["user_id", "subject", column, "id"], None)
+      for name, column in SORT_COLUMNS.items()],
+    ("ix_error_questions_user_difficulty_created", ["user_id", "difficulty", "created_at", "id"], None),
+    ("ix_error_questions_user_error_type_created", ["user_id", "error_type", "created_at", "id"], None),
+    *[(f"ix_error_questions_user_active_{name}", ["user_id", column, "id"], "is_archived = false")
+      for name, column in SORT_COLUMNS.items()],
+    *[(f"ix_error_questions_user_favorite_{name}", ["user_id", column, "id"], "is_favorite = true")
+      for name, column in SORT_COLUMNS.items()],
+]
+
+# 被复合索引覆盖的单列索引
+SINGLE_COLUMN_INDEXES = ["user_id", "subject", "difficulty", "error_type", "created_at"]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不阻塞写入，但不能在事务中执行
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                "error_questions",
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for column in SINGLE_COLUMN_INDEXES:
+            op.drop_index(
+                f"ix_error_questions_{column}",
+                table_name="error_questions",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SINGLE_COLUMN_INDEXES:
+            op.create_index(
+                f"ix_error_questions_{column}",
+                "error_questions",
+                [column],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, _, _ in INDEXES:
+            op.drop_index(name, table_name="error_questions", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,56 @@
+"""error_questions.tags：JSON 字符串改为 varchar(50)[]，并建立 GIN 索引
+
+Revision ID: 0005_error_question_tags_array
+Revises: 0004_error_question_access_indexes
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_error_question_tags_array"
+down_revision: Union[str, Sequence[str], None] = "0004_error_question_access_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 旧值为 json.dumps 生成的数组字符串；ALTER COLUMN ... USING 不允许子查询，改为新增列转换后替换
+    op.add_column(
+        "error_questions",
+        sa.Column("tags_array", postgresql.ARRAY(sa.String(length=50)), server_default="{}", nullable=False),
+    )
+    op.execute("""
+        UPDATE error_questions
+        SET tags_array = ARRAY(
+            -- 与 normalize_tags 一致：去除首尾空白、去重并保留首次出现的顺序
+            SELECT tag FROM (
+                SELECT left(btrim(t.tag), 50) AS tag, min(t.position) AS position
+                FROM jsonb_array_elements_text(tags::jsonb) WITH ORDINALITY AS t(tag, position)
+                WHERE btrim(t.tag) <> ''
+                GROUP BY 1
+            ) AS normalized
+            ORDER BY position
+        )
+        WHERE tags LIKE '[%'
+    """)
+    op.drop_column("error_questions", "tags")
+    op.alter_column("error_questions", "tags_array", new_column_name="tags")
+    op.create_index("ix_error_questions_tags", "error_questions", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_error_questions_tags", table_name="error_questions", postgresql_using="gin")
+    op.add_column("error_questions", sa.Column("tags_json", sa.String(length=500), nullable=True))
+    op.execute("""
+        UPDATE error_questions
+        SET tags_json = array_to_json(tags)::text
+        WHERE cardinality(tags) > 0
+    """)
+    op.drop_column("error_questions", "tags")
+    op.alter_column("error_questions", "tags_json", new_column_name="tags")
@@ -0,0 +1,46 @@
+"""error_questions.search_vector：全文检索生成列与 GIN 索引
+
+Revision ID: 0006_error_question_search_vector
+Revises: 0005_error_question_tags_array
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_error_question_search_vector"
+down_revision: Union[str, Sequence[str], None] = "0005_error_question_tags_array"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 迁移时的 SEARCH_VECTOR_EXPRESSION（app.models.error_question），之后修改表达式需新建迁移
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', regexp_replace(coalesce(question_text, ''), '([\\u3400-\\u9fff\\uf900-\\ufaff])', ' \\1 ', 'g')), 'A') || "
+    "setweight(to_tsvector('simple', regexp_replace(coalesce(explanation, ''), '([\\u3400-\\u9fff\\uf900-\\ufaff])', ' \\1 ', 'g')), 'B') || "
+    "setweight(to_tsvector('simple', regexp_replace(coalesce(chapter, ''), '([\\u3400-\\u9fff\\uf900-\\ufaff])', ' \\1 ', 'g')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # 添加存储生成列会重写整张表并持有排他锁，大表应在低峰期执行
+    op.add_column(
+        "error_questions",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_error_questions_search", "error_questions", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_error_questions_search", table_name="error_questions", postgresql_using="gin")
+    op.drop_column("error_questions", "search_vector")
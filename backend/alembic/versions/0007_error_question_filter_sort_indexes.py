@@ -0,0 +1,45 @@
+"""error_questions：难度 / 错误类型与 updated_at、mastery_level 排序的复合索引
+
+Revision ID: 0007_error_question_filter_sort_indexes
+Revises: 0006_error_question_search_vector
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_error_question_filter_sort_indexes"
+down_revision: Union[str, Sequence[str], None] = "0006_error_question_search_vector"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SORT_COLUMNS = {"updated": "updated_at", "mastery": "mastery_level"}
+
+# (索引名, 列)，与 ErrorQuestion.__table_args__ 一致
+INDEXES = [
+    (f"ix_error_questions_user_{filter_column}_{name}", ["user_id", filter_column, column, "id"])
+    for filter_column in ("difficulty", "error_type")
+    for name, column in SORT_COLUMNS.items()
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不阻塞写入，但不能在事务中执行
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                "error_questions",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name="error_questions", postgresql_concurrently=True, if_exists=True)
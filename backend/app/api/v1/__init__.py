@@ -1,7 +1,7 @@
 """
 API v1 模块
 """
-from app.api.v1 import auth, errors, ai, knowledge, practice, reports
+from app.api.v1 import ai, auth, errors, knowledge, practice, reports, users
 
-__all__ = ["auth", "errors", "ai", "knowledge", "practice", "reports"]
+__all__ = ["auth", "users", "errors", "ai", "knowledge", "practice", "reports"]
 
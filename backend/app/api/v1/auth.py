@@ -1,31 +1,90 @@
 """
 认证相关API
 """
+import uuid
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import AsyncGenerator
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.core.database import get_db
+from app.config import settings
+from app.core.database import bind_user, get_db, read_session, replicas
+from app.core.exceptions import AlreadyExists, AuthenticationError, PermissionDenied, ServiceBusy
+from app.core.hashing import password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import LOGIN_ACCOUNT_POLICY, login_identity, rate_limiter
+from app.core.refresh_tokens import (
+    RefreshTokenRejected,
+    RefreshTokenStoreUnavailable,
+    refresh_tokens,
+)
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     decode_token,
 )
-from app.core.exceptions import AuthenticationError, AlreadyExists
-from app.config import settings
-from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
+from app.core.token_versions import token_versions
+from app.models.user import User, UserRole
 from app.schemas.common import ResponseModel
+from app.schemas.user import TokenResponse, UserCreate, UserLogin, UserResponse
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
 
+def _token_claims(user: User) -> dict:
+    """生成 Token 负载（无状态模式下鉴权所需的全部信息）"""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role.value,
+        "active": user.is_active,
+        "ver": user.token_version or 0,
+    }
+
+
+async def _issue_tokens(claims: dict, family: str = None) -> TokenResponse:
+    """签发 Access Token 与 Refresh Token（Refresh Token 登记到轮换存储）"""
+    refresh_claims = {**claims, **refresh_tokens.new_token_ids(family)}
+    await refresh_tokens.register(refresh_claims)
+
+    return TokenResponse(
+        access_token=create_access_token(claims),
+        refresh_token=create_refresh_token(refresh_claims),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+def _principal_from_claims(payload: dict) -> User:
+    """根据 Token 负载构建当前用户（不含完整资料）"""
+    return User(
+        id=uuid.UUID(payload["sub"]),
+        email=payload.get("email"),
+        role=UserRole(payload["role"]),
+        is_active=payload["active"],
+        token_version=payload["ver"],
+    )
+
+
+async def _load_user(user_id: str, db: AsyncSession) -> User:
+    """加载用户（优先从缓存读取，稳定状态下不访问数据库）"""
+    user = await principal_cache.get(user_id)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+
+        if not user:
+            raise AuthenticationError("用户不存在")
+
+        await principal_cache.set(user)
+
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
@@ -34,23 +93,68 @@ async def get_current_user(
     payload = decode_token(token)
     if not payload:
         raise AuthenticationError("无效的 Token")
-    
+
     user_id = payload.get("sub")
     if not user_id:
         raise AuthenticationError("Token 中缺少用户信息")
-    
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise AuthenticationError("用户不存在")
-    
+
+    # 本请求会话中的写入提交后，该用户的读请求暂时回到主库（读己之写）
+    bind_user(db, user_id)
+
+    # 无状态模式：仅校验 Token 版本，不访问数据库（版本登记表未就绪时回退到数据库校验）
+    if settings.AUTH_STATELESS_ENABLED and "ver" in payload and token_versions.ready:
+        if not payload.get("active"):
+            raise AuthenticationError("用户已被禁用")
+        if not token_versions.is_valid(user_id, payload["ver"]):
+            raise AuthenticationError("Token 已失效，请重新登录")
+        return _principal_from_claims(payload)
+
+    user = await _load_user(user_id, db)
+
     if not user.is_active:
         raise AuthenticationError("用户已被禁用")
-    
+
+    if payload.get("ver", 0) < (user.token_version or 0):
+        raise AuthenticationError("Token 已失效，请重新登录")
+
     return user
 
 
+async def get_current_user_profile(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """获取当前用户的完整资料（无状态模式下 get_current_user 只包含 Token 中的字段）"""
+    if current_user.username is not None:
+        return current_user
+    return await _load_user(str(current_user.id), db)
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取只读会话的依赖函数（只读副本负载均衡，用户刚写入过或副本不可用时为主库会话）
+    只能用于不写入的接口；未配置副本时直接复用请求的主库会话，不额外占用连接
+    """
+    if not replicas.replicas:
+        yield db
+        return
+    async with read_session(current_user.id) as session:
+        yield session
+
+
+def require_roles(*roles: UserRole):
+    """限制只有指定角色才能访问（依赖注入）"""
+    async def checker(current_user: User = Depends(get_current_user)) -> User:
+        if current_user.role not in roles:
+            raise PermissionDenied()
+        return current_user
+
+    return checker
+
+
 @router.post("/register", response_model=ResponseModel[UserResponse])
 async def register(
     user_data: UserCreate,
@@ -63,25 +167,25 @@ async def register(
     )
     if result.scalar_one_or_none():
         raise AlreadyExists("用户名已存在")
-    
+
     # 检查邮箱是否存在
     result = await db.execute(
         select(User).where(User.email == user_data.email)
     )
     if result.scalar_one_or_none():
         raise AlreadyExists("邮箱已被注册")
-    
+
     # 创建用户
     user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
     )
-    
+
     db.add(user)
     await db.commit()
     await db.refresh(user)
-    
+
     return ResponseModel(
         success=True,
         message="注册成功",
@@ -92,9 +196,14 @@ async def register(
 @router.post("/login", response_model=ResponseModel[TokenResponse])
 async def login(
     login_data: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """用户登录"""
+    # 同一 IP + 账号的尝试次数（同一 IP 的总次数由限流中间件控制）
+    if settings.RATE_LIMIT_ENABLED:
+        await rate_limiter.enforce(LOGIN_ACCOUNT_POLICY, login_identity(request.scope, login_data.username_or_email))
+
     # 查找用户（支持用户名或邮箱）
     result = await db.execute(
         select(User).where(
@@ -103,37 +212,30 @@ async def login(
         )
     )
     user = result.scalar_one_or_none()
-    
+
     if not user:
         raise AuthenticationError("用户名或密码错误")
-    
+
     # 验证密码
-    if not verify_password(login_data.password, user.password_hash):
+    if not await password_hasher.verify(login_data.password, user.password_hash):
         raise AuthenticationError("用户名或密码错误")
-    
+
     if not user.is_active:
         raise AuthenticationError("用户已被禁用")
-    
+
     # 生成 Token
-    token_data = {"sub": str(user.id), "email": user.email}
-    
-    access_token = create_access_token(token_data)
-    refresh_token = create_refresh_token(token_data)
-    
+    tokens = await _issue_tokens(_token_claims(user))
+
     return ResponseModel(
         success=True,
         message="登录成功",
-        data=TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        ),
+        data=tokens,
     )
 
 
 @router.get("/me", response_model=ResponseModel[UserResponse])
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_profile),
 ):
     """获取当前用户信息"""
     return ResponseModel(
@@ -148,30 +250,114 @@ async def refresh_token(
     refresh_token: str,
     db: AsyncSession = Depends(get_db),
 ):
-    """刷新 Token"""
+    """
+    刷新 Token
+    Refresh Token 每次使用后即轮换，旧 Token 被再次使用时吊销整个家族；
+    校验完全在 Redis 中完成，仅在用户快照缺失时回源数据库。
+    Redis 不可用时返回 503，不按数据库放行（否则已使用、已吊销的 Token 可绕过检测）；
+    只有不带 jti / fam 的旧版 Token 按数据库校验
+    """
     payload = decode_token(refresh_token)
     if not payload or payload.get("type") != "refresh":
         raise AuthenticationError("无效的 Refresh Token")
-    
+
     user_id = payload.get("sub")
+    family = payload.get("fam")
+
+    if payload.get("jti") and family:
+        new_ids = refresh_tokens.new_token_ids(family)
+        try:
+            snapshot = await refresh_tokens.rotate(payload, new_ids["jti"])
+        except RefreshTokenRejected as e:
+            raise AuthenticationError(e.message) from None
+        except RefreshTokenStoreUnavailable:
+            raise ServiceBusy("Token 刷新服务暂不可用，请稍后重试") from None
+
+        if snapshot is None:
+            # 用户快照缺失：回源数据库并重建快照
+            claims = await _load_refresh_claims(user_id, payload, db)
+            await refresh_tokens.save_user(claims)
+        else:
+            claims = {"sub": user_id, **snapshot}
+            if not claims["active"]:
+                raise AuthenticationError("用户不存在或已被禁用")
+
+        # 新 Token 已由轮换脚本登记
+        tokens = TokenResponse(
+            access_token=create_access_token(claims),
+            refresh_token=create_refresh_token({**claims, **new_ids}),
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+        return ResponseModel(success=True, message="Token 刷新成功", data=tokens)
+
+    # 旧版 Token（不带 jti / fam）：按数据库校验
+    claims = await _load_refresh_claims(user_id, payload, db)
+    tokens = await _issue_tokens(claims, family=family)
+
+    return ResponseModel(
+        success=True,
+        message="Token 刷新成功",
+        data=tokens,
+    )
+
+
+async def _load_refresh_claims(user_id: str, payload: dict, db: AsyncSession) -> dict:
+    """从数据库加载用户并校验 Refresh Token 版本"""
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
-    
+
     if not user or not user.is_active:
         raise AuthenticationError("用户不存在或已被禁用")
-    
-    # 生成新的 Token
-    token_data = {"sub": str(user.id), "email": user.email}
-    new_access_token = create_access_token(token_data)
-    new_refresh_token = create_refresh_token(token_data)
-    
+
+    if payload.get("ver", 0) < (user.token_version or 0):
+        raise AuthenticationError("Refresh Token 已失效，请重新登录")
+
+    return _token_claims(user)
+
+
+@router.post("/logout", response_model=ResponseModel[None])
+async def logout(
+    refresh_token: str,
+):
+    """退出当前设备（吊销该 Refresh Token 所在家族；吊销未能写入时返回 503，由客户端重试）"""
+    payload = decode_token(refresh_token)
+    if not payload or payload.get("type") != "refresh":
+        raise AuthenticationError("无效的 Refresh Token")
+
+    if payload.get("fam"):
+        try:
+            await refresh_tokens.revoke_family(payload["fam"])
+        except RefreshTokenStoreUnavailable:
+            raise ServiceBusy("退出登录暂不可用，请稍后重试") from None
+
     return ResponseModel(
         success=True,
-        message="Token 刷新成功",
-        data=TokenResponse(
-            access_token=new_access_token,
-            refresh_token=new_refresh_token,
-            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        ),
+        message="已退出登录",
+        data=None,
     )
 
+
+@router.post("/logout-all", response_model=ResponseModel[None])
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """退出所有设备（使该用户已签发的全部 Token 失效）"""
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version, User.is_active)
+    )
+    version, is_active = result.one()
+    await db.commit()
+
+    await principal_cache.invalidate(current_user.id)
+    await refresh_tokens.invalidate_user(current_user.id)
+    await token_versions.publish(current_user.id, version, is_active)
+
+    return ResponseModel(
+        success=True,
+        message="已退出所有设备",
+        data=None,
+    )
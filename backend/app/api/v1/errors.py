@@ -1,24 +1,40 @@
 """
 错题管理API
 """
-from typing import List
+import enum
+from datetime import datetime
+from typing import Any, Dict, List, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, func, literal, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
 
+from app.api.v1.auth import get_current_user, get_read_db
+from app.core.book_version import book_versions
 from app.core.database import get_db
-from app.core.exceptions import NotFound
-from app.models.user import User
+from app.core.exceptions import NotFound, ValidationError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.response_cache import response_cache
 from app.models.error_question import ErrorQuestion
-from app.api.v1.auth import get_current_user
+from app.models.user import User
+from app.schemas.common import CursorPage, PaginatedResponse, PaginationParams, ResponseModel
 from app.schemas.error_question import (
+    ErrorQuestionBatchCreate,
+    ErrorQuestionBatchDelete,
+    ErrorQuestionBatchResult,
+    ErrorQuestionBatchUpdate,
     ErrorQuestionCreate,
-    ErrorQuestionUpdate,
-    ErrorQuestionResponse,
     ErrorQuestionFilter,
+    ErrorQuestionImportJob,
+    ErrorQuestionProjection,
+    ErrorQuestionResponse,
+    ErrorQuestionSearchHit,
+    ErrorQuestionUpdate,
+    TagCount,
 )
-from app.schemas.common import ResponseModel, PaginationParams, PaginatedResponse
+from app.services import error_questions, export, question_counters, question_import, search
 
 router = APIRouter()
 
@@ -30,12 +46,6 @@ async def create_error_question(
     db: AsyncSession = Depends(get_db),
 ):
     """创建错题"""
-    # 处理标签（转为JSON字符串）
-    tags_str = None
-    if question_data.tags:
-        import json
-        tags_str = json.dumps(question_data.tags, ensure_ascii=False)
-    
     question = ErrorQuestion(
         user_id=current_user.id,
         subject=question_data.subject,
@@ -47,13 +57,19 @@ async def create_error_question(
         explanation=question_data.explanation,
         difficulty=question_data.difficulty,
         error_type=question_data.error_type,
-        tags=tags_str,
+        tags=error_questions.normalize_tags(question_data.tags),
     )
-    
+
     db.add(question)
+    await db.flush()
+    await question_counters.apply_deltas(
+        db,
+        current_user.id,
+        question_counters.question_deltas(None, question_counters.dimensions_of(question)),
+    )
     await db.commit()
     await db.refresh(question)
-    
+
     return ResponseModel(
         success=True,
         message="错题创建成功",
@@ -61,8 +77,126 @@ async def create_error_question(
     )
 
 
-@router.get("", response_model=ResponseModel[PaginatedResponse[ErrorQuestionResponse]])
+# 允许排序的字段
+SORT_FIELDS = ("created_at", "updated_at", "mastery_level")
+
+
+def _filtered_query(
+    query,
+    user_id,
+    subject: str = None,
+    difficulty: str = None,
+    error_type: str = None,
+    is_favorite: bool = None,
+    is_archived: bool = None,
+    tags_any: List[str] = None,
+    tags_all: List[str] = None,
+):
+    """为查询添加用户范围与筛选条件"""
+    query = query.where(ErrorQuestion.user_id == user_id)
+    if subject:
+        query = query.where(ErrorQuestion.subject == subject)
+    if difficulty:
+        query = query.where(ErrorQuestion.difficulty == difficulty)
+    if error_type:
+        query = query.where(ErrorQuestion.error_type == error_type)
+    if is_favorite is not None:
+        query = query.where(ErrorQuestion.is_favorite == is_favorite)
+    if is_archived is not None:
+        query = query.where(ErrorQuestion.is_archived == is_archived)
+    if tags_any:
+        query = query.where(ErrorQuestion.tags.overlap(tags_any))
+    if tags_all:
+        query = query.where(ErrorQuestion.tags.contains(tags_all))
+    return query
+
+
+# 可投影的字段（与 ErrorQuestionProjection 一致）
+PROJECTABLE_FIELDS = tuple(ErrorQuestionProjection.model_fields)
+
+# 卡片列表使用的精简视图：不含题目、答案、解析等大文本列
+SUMMARY_FIELDS = (
+    "id",
+    "subject",
+    "chapter",
+    "difficulty",
+    "error_type",
+    "tags",
+    "review_count",
+    "mastery_level",
+    "next_review_at",
+    "is_favorite",
+    "is_archived",
+    "created_at",
+    "updated_at",
+)
+
+
+def _projection_fields(fields: str = None, view: str = None) -> List[str]:
+    """解析 fields / view 参数，返回需要查询的字段（id 始终包含）"""
+    if view is not None and view != "summary":
+        raise ValidationError("不支持的视图", detail={"view": view, "allowed": ["summary"]})
+
+    selected = list(SUMMARY_FIELDS) if view == "summary" else []
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in PROJECTABLE_FIELDS]
+        if unknown:
+            raise ValidationError(
+                "不支持的字段",
+                detail={"fields": unknown, "allowed": list(PROJECTABLE_FIELDS)},
+            )
+        selected.extend(requested)
+
+    return list(dict.fromkeys(["id", *selected]))
+
+
+def _project_value(value: Any) -> Any:
+    """将列值转换为可直接 JSON 序列化的值"""
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _project_row(row) -> Dict[str, Any]:
+    return {name: _project_value(value) for name, value in row.items()}
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    """条件请求相关响应头：客户端可缓存，但每次使用前需重新验证"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _json_response(payload: Dict[str, Any], etag: str = None, cache_status: str = None) -> JSONResponse:
+    """返回已序列化的响应（附带 ETag 与缓存命中标记）"""
+    headers = _cache_headers(etag) if etag else {}
+    if cache_status:
+        headers["X-Cache"] = cache_status
+    return JSONResponse(content=payload, headers=headers)
+
+
+def _sort_column(sort_by: str):
+    """校验并返回排序字段"""
+    if sort_by not in SORT_FIELDS:
+        raise ValidationError(
+            "不支持的排序字段",
+            detail={"sort_by": sort_by, "allowed": list(SORT_FIELDS)},
+        )
+    return getattr(ErrorQuestion, sort_by)
+
+
+@router.get(
+    "",
+    response_model=ResponseModel[PaginatedResponse[Union[ErrorQuestionResponse, ErrorQuestionProjection]]],
+)
 async def get_error_questions(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     subject: str = Query(None),
@@ -70,48 +204,74 @@ async def get_error_questions(
     error_type: str = Query(None),
     is_favorite: bool = Query(None),
     is_archived: bool = Query(None),
+    tags_any: List[str] = Query(None, description="包含任一标签（可重复传参）"),
+    tags_all: List[str] = Query(None, description="包含全部标签（可重复传参）"),
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc"),
+    fields: str = Query(None, description="逗号分隔的返回字段，如 id,subject,mastery_level"),
+    view: str = Query(None, description="精简视图：summary（不含题目、答案、解析文本）"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """获取错题列表（分页、筛选、排序）"""
+    """
+    获取错题列表（分页、筛选、排序）
+    指定 fields 或 view 时只查询所需列，直接由行数据构造响应（ErrorQuestionProjection），不实例化 ORM 对象
+    支持 If-None-Match：错题本未变化时直接返回 304；相同请求的响应按错题本版本号缓存
+    """
+    # 先读取版本号再查询：并发写入时缓存的数据只会比版本号新，不会更旧
+    version = await book_versions.current(current_user.id)
+    etag = book_versions.etag(current_user.id, version, request)
+    if book_versions.not_modified(request, etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
+    cached = await response_cache.get("errors.list", current_user.id, version, request)
+    if cached is not None:
+        return _json_response(cached, etag, "HIT")
+
     # 构建查询
-    query = select(ErrorQuestion).where(ErrorQuestion.user_id == current_user.id)
-    
-    # 筛选条件
-    if subject:
-        query = query.where(ErrorQuestion.subject == subject)
-    if difficulty:
-        query = query.where(ErrorQuestion.difficulty == difficulty)
-    if error_type:
-        query = query.where(ErrorQuestion.error_type == error_type)
-    if is_favorite is not None:
-        query = query.where(ErrorQuestion.is_favorite == is_favorite)
-    if is_archived is not None:
-        query = query.where(ErrorQuestion.is_archived == is_archived)
-    
+    filters = {
+        "subject": subject,
+        "difficulty": difficulty,
+        "error_type": error_type,
+        "is_favorite": is_favorite,
+        "is_archived": is_archived,
+        "tags_any": tags_any,
+        "tags_all": tags_all,
+    }
+    projection = None
+    if fields or view:
+        projection = _projection_fields(fields, view)
+        columns = [ErrorQuestion.__table__.c[name] for name in projection]
+        query = _filtered_query(select(*columns), current_user.id, **filters)
+    else:
+        query = _filtered_query(select(ErrorQuestion), current_user.id, **filters)
+
     # 排序
+    sort_column = _sort_column(sort_by)
     if sort_order == "desc":
-        query = query.order_by(getattr(ErrorQuestion, sort_by).desc())
+        query = query.order_by(sort_column.desc(), ErrorQuestion.id.desc())
     else:
-        query = query.order_by(getattr(ErrorQuestion, sort_by).asc())
-    
+        query = query.order_by(sort_column.asc(), ErrorQuestion.id.asc())
+
     # 计算总数
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-    
+    total = await _count_error_questions(db, current_user.id, filters)
+
     # 分页
     query = query.offset((page - 1) * page_size).limit(page_size)
-    
+
     # 执行查询
     result = await db.execute(query)
-    questions = result.scalars().all()
-    
-    # 转换为响应模型
-    items = [ErrorQuestionResponse.model_validate(q) for q in questions]
-    
-    return ResponseModel(
+
+    if projection is not None:
+        items = [_project_row(row) for row in result.mappings()]
+    else:
+        # 转换为响应模型
+        items = [
+            ErrorQuestionResponse.model_validate(q).model_dump(mode="json")
+            for q in result.scalars()
+        ]
+
+    payload = ResponseModel(
         success=True,
         message="获取成功",
         data=PaginatedResponse.create(
@@ -120,34 +280,399 @@ async def get_error_questions(
             page=page,
             page_size=page_size,
         ),
+    ).model_dump(mode="json")
+    await response_cache.set(current_user.id, version, request, payload)
+
+    return _json_response(payload, etag, "MISS")
+
+
+@router.get("/scroll", response_model=ResponseModel[CursorPage[ErrorQuestionResponse]])
+async def scroll_error_questions(
+    cursor: str = Query(None, description="上一页返回的 next_cursor，首页不传"),
+    limit: int = Query(20, ge=1, le=100),
+    subject: str = Query(None),
+    difficulty: str = Query(None),
+    error_type: str = Query(None),
+    is_favorite: bool = Query(None),
+    is_archived: bool = Query(None),
+    tags_any: List[str] = Query(None, description="包含任一标签（可重复传参）"),
+    tags_all: List[str] = Query(None, description="包含全部标签（可重复传参）"),
+    sort_by: str = Query("created_at"),
+    sort_order: str = Query("desc"),
+    include_total: bool = Query(False, description="是否同时返回总数"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    获取错题列表（游标分页）
+    按 (排序字段, id) 做键集分页，任意深度的翻页开销与首页相同
+    """
+    filters = {
+        "subject": subject,
+        "difficulty": difficulty,
+        "error_type": error_type,
+        "is_favorite": is_favorite,
+        "is_archived": is_archived,
+        "tags_any": tags_any,
+        "tags_all": tags_all,
+    }
+    sort_column = _sort_column(sort_by)
+    descending = sort_order == "desc"
+
+    query = _filtered_query(select(ErrorQuestion), current_user.id, **filters)
+
+    if cursor:
+        try:
+            cursor_sort_by, cursor_order, last_value, last_id = decode_cursor(cursor)
+            last_id = UUID(last_id)
+        except (ValueError, TypeError):
+            raise ValidationError("无效的分页游标") from None
+        if (cursor_sort_by, cursor_order) != (sort_by, sort_order):
+            raise ValidationError("分页游标与排序参数不匹配")
+        position = tuple_(sort_column, ErrorQuestion.id)
+        boundary = tuple_(
+            literal(last_value, sort_column.type),
+            literal(last_id, ErrorQuestion.id.type),
+        )
+        query = query.where(position < boundary if descending else position > boundary)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), ErrorQuestion.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), ErrorQuestion.id.asc())
+
+    # 多取一条判断是否还有下一页
+    result = await db.execute(query.limit(limit + 1))
+    questions = result.scalars().all()
+    has_more = len(questions) > limit
+    questions = questions[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = questions[-1]
+        next_cursor = encode_cursor([sort_by, sort_order, getattr(last, sort_by), str(last.id)])
+
+    total = None
+    if include_total:
+        total = await _count_error_questions(db, current_user.id, filters)
+
+    return ResponseModel(
+        success=True,
+        message="获取成功",
+        data=CursorPage(
+            items=[ErrorQuestionResponse.model_validate(q) for q in questions],
+            next_cursor=next_cursor,
+            has_more=has_more,
+            total=total,
+        ),
     )
 
 
-@router.get("/{question_id}", response_model=ResponseModel[ErrorQuestionResponse])
-async def get_error_question(
-    question_id: UUID,
+async def _count_error_questions(db: AsyncSession, user_id, filters: dict) -> int:
+    """
+    统计满足筛选条件的错题数量
+    无筛选或单维度筛选直接读取计数表，多维度组合或按标签筛选时才执行 COUNT
+    """
+    active = {name: value for name, value in filters.items() if value not in (None, "", [])}
+    if not active:
+        return await question_counters.get_count(db, user_id)
+    if len(active) == 1 and set(active) <= set(question_counters.COUNTER_DIMENSIONS):
+        (dimension, value), = active.items()
+        return await question_counters.get_count(db, user_id, dimension, value)
+
+    query = _filtered_query(select(func.count(ErrorQuestion.id)), user_id, **filters)
+    return await db.scalar(query) or 0
+
+
+@router.get("/count", response_model=ResponseModel[int])
+async def count_error_questions(
+    subject: str = Query(None),
+    difficulty: str = Query(None),
+    error_type: str = Query(None),
+    is_favorite: bool = Query(None),
+    is_archived: bool = Query(None),
+    tags_any: List[str] = Query(None, description="包含任一标签（可重复传参）"),
+    tags_all: List[str] = Query(None, description="包含全部标签（可重复传参）"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取满足筛选条件的错题总数（与游标分页配合使用）"""
+    total = await _count_error_questions(
+        db,
+        current_user.id,
+        {
+            "subject": subject,
+            "difficulty": difficulty,
+            "error_type": error_type,
+            "is_favorite": is_favorite,
+            "is_archived": is_archived,
+            "tags_any": tags_any,
+            "tags_all": tags_all,
+        },
+    )
+
+    return ResponseModel(
+        success=True,
+        message="获取成功",
+        data=total,
+    )
+
+
+@router.get("/search", response_model=ResponseModel[CursorPage[ErrorQuestionSearchHit]])
+async def search_error_questions(
+    q: str = Query(..., min_length=1, max_length=200, description="检索关键词，空格分隔多个词"),
+    cursor: str = Query(None, description="上一页返回的 next_cursor，首页不传"),
+    limit: int = Query(20, ge=1, le=50),
+    subject: str = Query(None),
+    difficulty: str = Query(None),
+    error_type: str = Query(None),
+    is_favorite: bool = Query(None),
+    is_archived: bool = Query(None),
+    tags_any: List[str] = Query(None, description="包含任一标签（可重复传参）"),
+    tags_all: List[str] = Query(None, description="包含全部标签（可重复传参）"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    全文检索错题（题目、解析、章节），按相关度排序并返回高亮片段
+    可与列表接口的筛选条件组合使用
+    """
+    terms = search.parse_terms(q)
+    tsquery = search.tsquery(terms)
+    rank = search.rank_expression(tsquery).label("rank")
+
+    offset = 0
+    if cursor:
+        try:
+            cursor_q, offset = decode_cursor(cursor)
+            offset = int(offset)
+        except (ValueError, TypeError):
+            raise ValidationError("无效的分页游标") from None
+        if cursor_q != q:
+            raise ValidationError("分页游标与检索关键词不匹配")
+
+    query = _filtered_query(
+        select(ErrorQuestion, rank),
+        current_user.id,
+        subject=subject,
+        difficulty=difficulty,
+        error_type=error_type,
+        is_favorite=is_favorite,
+        is_archived=is_archived,
+        tags_any=tags_any,
+        tags_all=tags_all,
+    ).where(search.search_condition(tsquery))
+
+    # 多取一条判断是否还有下一页
+    result = await db.execute(
+        query.order_by(rank.desc(), ErrorQuestion.id).offset(offset).limit(limit + 1)
+    )
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        ErrorQuestionSearchHit(
+            question=ErrorQuestionResponse.model_validate(question),
+            rank=score,
+            highlights=search.highlights_of(question, terms),
+        )
+        for question, score in rows
+    ]
+
+    return ResponseModel(
+        success=True,
+        message="检索成功",
+        data=CursorPage(
+            items=items,
+            next_cursor=encode_cursor([q, offset + limit]) if has_more else None,
+            has_more=has_more,
+        ),
+    )
+
+
+@router.get("/export")
+async def export_error_questions(
+    format: str = Query("ndjson", description="导出格式：ndjson, csv"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    导出完整错题本（含 AI 分析与练习记录）
+    流式输出，数据库读取在独立会话中按块进行
+    """
+    stream = export.export_stream(current_user.id, format)
+    filename = f"error-book-{datetime.utcnow():%Y%m%d}.{format}"
+
+    return StreamingResponse(
+        stream,
+        media_type=f"{export.EXPORT_FORMATS[format]}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=ResponseModel[ErrorQuestionImportJob], status_code=202)
+async def import_error_questions(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV（含表头）或 NDJSON 文件，字段同创建错题"),
+    format: str = Query(None, description="csv 或 ndjson，默认按文件扩展名判断"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    批量导入错题（后台执行）
+    返回任务状态，通过 GET /errors/import/{job_id} 查询进度；CSV 中多个标签以 ; 分隔
+    """
+    job, path = await question_import.create_job(current_user.id, file, format)
+    background_tasks.add_task(question_import.run_job, current_user.id, job, path)
+
+    return ResponseModel(
+        success=True,
+        message="导入任务已创建",
+        data=job,
+    )
+
+
+@router.get("/import/{job_id}", response_model=ResponseModel[ErrorQuestionImportJob])
+async def get_import_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """查询错题导入任务进度"""
+    job = await question_import.get_job(current_user.id, job_id)
+
+    return ResponseModel(
+        success=True,
+        message="获取成功",
+        data=job,
+    )
+
+
+@router.get("/tags", response_model=ResponseModel[List[TagCount]])
+async def get_error_question_tags(
+    subject: str = Query(None),
+    is_archived: bool = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取当前用户的标签及对应错题数量（按数量降序）"""
+    tag = func.unnest(ErrorQuestion.tags).label("tag")
+    tags = _filtered_query(
+        select(tag),
+        current_user.id,
+        subject=subject,
+        is_archived=is_archived,
+    ).subquery()
+
+    result = await db.execute(
+        select(tags.c.tag, func.count().label("count"))
+        .group_by(tags.c.tag)
+        .order_by(func.count().desc(), tags.c.tag)
+        .limit(limit)
+    )
+
+    return ResponseModel(
+        success=True,
+        message="获取成功",
+        data=[TagCount(tag=row.tag, count=row.count) for row in result],
+    )
+
+
+@router.post("/batch", response_model=ResponseModel[ErrorQuestionBatchResult], status_code=201)
+async def batch_create_error_questions(
+    batch: ErrorQuestionBatchCreate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """获取错题详情"""
+    """批量创建错题（整卷录入、导入试卷），逐条返回结果"""
+    result = await error_questions.create_batch(db, current_user.id, batch.items)
+
+    return ResponseModel(
+        success=True,
+        message=f"成功创建 {result.succeeded} 道错题",
+        data=result,
+    )
+
+
+@router.patch("/batch", response_model=ResponseModel[ErrorQuestionBatchResult])
+async def batch_update_error_questions(
+    batch: ErrorQuestionBatchUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """批量更新错题（修改字段、收藏、归档），每道错题可以有不同的修改"""
+    result = await error_questions.update_batch(db, current_user.id, batch.change_sets())
+
+    return ResponseModel(
+        success=True,
+        message=f"成功更新 {result.succeeded} 道错题",
+        data=result,
+    )
+
+
+@router.post("/batch/delete", response_model=ResponseModel[ErrorQuestionBatchResult])
+async def batch_delete_error_questions(
+    batch: ErrorQuestionBatchDelete,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """批量删除错题"""
+    result = await error_questions.delete_batch(db, current_user.id, batch.ids)
+
+    return ResponseModel(
+        success=True,
+        message=f"成功删除 {result.succeeded} 道错题",
+        data=result,
+    )
+
+
+async def _get_owned_question(db: AsyncSession, user_id, question_id: UUID) -> ErrorQuestion:
+    """
+    获取当前用户的错题
+
+    Raises:
+        NotFound: 错题不存在或不属于该用户
+    """
     result = await db.execute(
         select(ErrorQuestion).where(
             and_(
                 ErrorQuestion.id == question_id,
-                ErrorQuestion.user_id == current_user.id,
+                ErrorQuestion.user_id == user_id,
             )
         )
     )
     question = result.scalar_one_or_none()
-    
+
     if not question:
         raise NotFound("错题不存在")
-    
-    return ResponseModel(
+    return question
+
+
+@router.get("/{question_id}", response_model=ResponseModel[ErrorQuestionResponse])
+async def get_error_question(
+    question_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取错题详情（支持 If-None-Match，响应按错题本版本号缓存）"""
+    version = await book_versions.current(current_user.id)
+    etag = book_versions.etag(current_user.id, version, request)
+    if book_versions.not_modified(request, etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
+    cached = await response_cache.get("errors.detail", current_user.id, version, request)
+    if cached is not None:
+        return _json_response(cached, etag, "HIT")
+
+    question = await _get_owned_question(db, current_user.id, question_id)
+    payload = ResponseModel(
         success=True,
         message="获取成功",
         data=ErrorQuestionResponse.model_validate(question),
-    )
+    ).model_dump(mode="json")
+    await response_cache.set(current_user.id, version, request, payload)
+
+    return _json_response(payload, etag, "MISS")
 
 
 @router.put("/{question_id}", response_model=ResponseModel[ErrorQuestionResponse])
@@ -157,38 +682,25 @@ async def update_error_question(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """更新错题"""
-    result = await db.execute(
-        select(ErrorQuestion).where(
-            and_(
-                ErrorQuestion.id == question_id,
-                ErrorQuestion.user_id == current_user.id,
-            )
+    """更新错题（单条 UPDATE ... RETURNING，归属校验在 WHERE 中完成）"""
+    update_data = question_data.model_dump(exclude_unset=True)
+    if not update_data:
+        question = await _get_owned_question(db, current_user.id, question_id)
+        return ResponseModel(
+            success=True,
+            message="更新成功",
+            data=ErrorQuestionResponse.model_validate(question),
         )
-    )
-    question = result.scalar_one_or_none()
-    
-    if not question:
+
+    rows = await error_questions.update_questions(db, current_user.id, [question_id], update_data)
+    if not rows:
         raise NotFound("错题不存在")
-    
-    # 更新字段
-    update_data = question_data.model_dump(exclude_unset=True)
-    
-    # 处理标签
-    if "tags" in update_data and update_data["tags"]:
-        import json
-        update_data["tags"] = json.dumps(update_data["tags"], ensure_ascii=False)
-    
-    for field, value in update_data.items():
-        setattr(question, field, value)
-    
     await db.commit()
-    await db.refresh(question)
-    
+
     return ResponseModel(
         success=True,
         message="更新成功",
-        data=ErrorQuestionResponse.model_validate(question),
+        data=ErrorQuestionResponse.model_validate(dict(rows[0])),
     )
 
 
@@ -198,26 +710,14 @@ async def delete_error_question(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """删除错题"""
-    result = await db.execute(
-        select(ErrorQuestion).where(
-            and_(
-                ErrorQuestion.id == question_id,
-                ErrorQuestion.user_id == current_user.id,
-            )
-        )
-    )
-    question = result.scalar_one_or_none()
-    
-    if not question:
+    """删除错题（单条 DELETE ... RETURNING，关联记录由外键级联删除）"""
+    rows = await error_questions.delete_questions(db, current_user.id, [question_id])
+    if not rows:
         raise NotFound("错题不存在")
-    
-    await db.delete(question)
     await db.commit()
-    
+
     return ResponseModel(
         success=True,
         message="删除成功",
         data=None,
     )
-
@@ -4,23 +4,30 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.v1.auth import get_current_user, get_read_db
+from app.config import settings
+from app.core.book_version import USER_BOOK_TAG
+from app.core.cached import cached
 from app.models.user import User
-from app.api.v1.auth import get_current_user
 from app.schemas.common import ResponseModel
 
 router = APIRouter()
 
+# 知识图谱 / 薄弱点 / 学习路径缓存时间（秒），错题本变化时立即失效
+GRAPH_CACHE_TTL = 600
+ANALYSIS_CACHE_TTL = 600
+
 
 @router.get("/graph", response_model=ResponseModel[dict])
+@cached("knowledge.graph", ttl=GRAPH_CACHE_TTL, tags=[USER_BOOK_TAG], local_ttl=settings.LOCAL_CACHE_TTL)
 async def get_knowledge_graph(
     subject: str = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """获取知识图谱"""
+    """获取知识图谱（两级缓存）"""
     # TODO: 实现知识图谱查询逻辑
-    
+
     return ResponseModel(
         success=True,
         message="获取成功",
@@ -32,13 +39,14 @@ async def get_knowledge_graph(
 
 
 @router.get("/weak-points", response_model=ResponseModel[list[dict]])
+@cached("knowledge.weak_points", ttl=ANALYSIS_CACHE_TTL, tags=[USER_BOOK_TAG])
 async def get_weak_knowledge_points(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取薄弱知识点"""
     # TODO: 实现薄弱点分析逻辑
-    
+
     return ResponseModel(
         success=True,
         message="获取成功",
@@ -47,14 +55,15 @@ async def get_weak_knowledge_points(
 
 
 @router.get("/learning-path", response_model=ResponseModel[dict])
+@cached("knowledge.learning_path", ttl=ANALYSIS_CACHE_TTL, tags=[USER_BOOK_TAG], stale_ttl=ANALYSIS_CACHE_TTL)
 async def get_learning_path(
     subject: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取学习路径"""
     # TODO: 实现学习路径规划逻辑
-    
+
     return ResponseModel(
         success=True,
         message="获取成功",
@@ -4,24 +4,35 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.auth import get_current_user, get_read_db
+from app.core.book_version import USER_BOOK_TAG
+from app.core.cache import cache
+from app.core.cached import cached
 from app.core.database import get_db
 from app.models.user import User
-from app.api.v1.auth import get_current_user
 from app.schemas.common import ResponseModel
 
 router = APIRouter()
 
+# 练习记录变化时失效的缓存标签
+PRACTICE_TAG = "practice:{user_id}"
+
+# 推荐题目 / 复习计划缓存时间（秒）
+RECOMMEND_CACHE_TTL = 300
+REVIEW_PLAN_CACHE_TTL = 600
+
 
 @router.get("/recommend", response_model=ResponseModel[list[dict]])
+@cached("practice.recommend", ttl=RECOMMEND_CACHE_TTL, tags=[USER_BOOK_TAG, PRACTICE_TAG])
 async def recommend_practice_questions(
     subject: str = None,
     limit: int = 10,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """推荐练习题"""
     # TODO: 实现个性化推荐逻辑
-    
+
     return ResponseModel(
         success=True,
         message="推荐成功",
@@ -39,7 +50,9 @@ async def submit_practice_answer(
 ):
     """提交练习答案"""
     # TODO: 实现答案提交和评估逻辑
-    
+
+    await cache.invalidate_tags(PRACTICE_TAG.format(user_id=current_user.id))
+
     return ResponseModel(
         success=True,
         message="提交成功",
@@ -51,13 +64,14 @@ async def submit_practice_answer(
 
 
 @router.get("/review-plan", response_model=ResponseModel[dict])
+@cached("practice.review_plan", ttl=REVIEW_PLAN_CACHE_TTL, tags=[USER_BOOK_TAG, PRACTICE_TAG])
 async def get_review_plan(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取复习计划"""
     # TODO: 实现复习计划生成逻辑（基于遗忘曲线）
-    
+
     return ResponseModel(
         success=True,
         message="获取成功",
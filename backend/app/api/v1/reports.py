@@ -2,44 +2,69 @@
 报告API
 """
 from fastapi import APIRouter, Depends
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.v1.auth import get_current_user, get_read_db
+from app.config import settings
+from app.core.book_version import USER_BOOK_TAG
+from app.core.cached import cached
+from app.models.error_question import ErrorQuestion
 from app.models.user import User
-from app.api.v1.auth import get_current_user
 from app.schemas.common import ResponseModel
+from app.services import question_counters
 
 router = APIRouter()
 
+# 掌握程度达到该值视为已掌握
+MASTERED_THRESHOLD = 0.8
+
+# 统计数据 / 周报缓存时间（秒），错题本变化时立即失效
+STATISTICS_CACHE_TTL = 600
+WEEKLY_CACHE_TTL = 3600
+
 
 @router.get("/statistics", response_model=ResponseModel[dict])
+@cached("reports.statistics", ttl=STATISTICS_CACHE_TTL, tags=[USER_BOOK_TAG], local_ttl=settings.LOCAL_CACHE_TTL)
 async def get_statistics(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """获取统计数据"""
-    # TODO: 实现统计数据查询
-    
+    """获取统计数据（两级缓存）"""
+    counters = await question_counters.get_counters(db, current_user.id)
+
+    mastered_count = await db.scalar(
+        select(func.count(ErrorQuestion.id)).where(
+            ErrorQuestion.user_id == current_user.id,
+            ErrorQuestion.mastery_level >= MASTERED_THRESHOLD,
+        )
+    )
+
     return ResponseModel(
         success=True,
         message="获取成功",
         data={
-            "total_errors": 0,
-            "mastered_count": 0,
-            "subjects": {},
+            "total_errors": counters["total"][""],
+            "mastered_count": mastered_count or 0,
+            "subjects": counters.get("subject", {}),
+            "difficulties": counters.get("difficulty", {}),
+            "error_types": counters.get("error_type", {}),
+            "favorite_count": counters.get("is_favorite", {}).get("true", 0),
+            "archived_count": counters.get("is_archived", {}).get("true", 0),
             "weekly_progress": [],
         },
     )
 
 
 @router.get("/weekly", response_model=ResponseModel[dict])
+@cached("reports.weekly", ttl=WEEKLY_CACHE_TTL, tags=[USER_BOOK_TAG], stale_ttl=WEEKLY_CACHE_TTL)
 async def get_weekly_report(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取周报"""
     # TODO: 实现周报生成逻辑
-    
+
     return ResponseModel(
         success=True,
         message="获取成功",
@@ -0,0 +1,38 @@
+"""
+用户管理API
+"""
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.auth import require_roles
+from app.core.database import get_db
+from app.models.user import User, UserRole
+from app.schemas.common import ResponseModel
+from app.schemas.user import UserProvisionResult
+from app.services.user_provisioning import parse_records, provision_users
+
+router = APIRouter()
+
+
+@router.post("/bulk", response_model=ResponseModel[UserProvisionResult])
+async def bulk_provision_users(
+    file: UploadFile = File(..., description="CSV（含表头）或 NDJSON 名单"),
+    format: str = Query(None, description="csv 或 ndjson，默认按文件扩展名判断"),
+    current_user: User = Depends(require_roles(UserRole.TEACHER, UserRole.ADMIN)),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    批量开通账号（教师/管理员）
+    每行字段：username, email, password，可选 role, nickname
+    """
+    fmt = format or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    content = (await file.read()).decode("utf-8-sig")
+    records = parse_records(content, fmt)
+
+    result = await provision_users(db, records, operator=current_user)
+
+    return ResponseModel(
+        success=True,
+        message=f"成功开通 {result.created} 个账号",
+        data=result,
+    )
@@ -0,0 +1,156 @@
+"""
+错题本版本号
+每个用户的错题本有一个版本号（Redis 键 book:ver:{uid}），任何错题写入提交后都会更新。
+读接口用 版本号 + 请求路径/参数 生成弱 ETag，客户端携带 If-None-Match 时只需读取一次版本号
+即可返回 304，无需查询数据库。
+
+写入路径：
+- ORM 写入（新增 / 修改 / 删除 ErrorQuestion 对象）在 flush 时自动记录
+- Core 批量语句需调用 mark_changed(db, user_id) 登记
+两者都在事务提交后、commit() 返回前更新版本号（回滚时丢弃），
+写请求返回后紧接着的读请求不会拿到旧 ETag 的 304 或旧缓存页。
+
+Redis 不可用导致更新失败时，该用户记为待更新并在后台重试；重试成功前本进程读取版本号
+返回 None（不生成 ETag、不使用响应缓存），Redis 恢复后旧版本号不会继续生效。
+"""
+import asyncio
+import hashlib
+import time
+from typing import Optional, Set
+
+from fastapi import Request
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import commit_hooks
+from app.core.cache import cache
+from app.models.error_question import ErrorQuestion
+
+# 依赖错题本内容的缓存标签（@cached(tags=[USER_BOOK_TAG])），错题本变化时一并失效
+USER_BOOK_TAG = "book:{user_id}"
+
+
+class BookVersions:
+    """错题本版本号管理器"""
+
+    # 待更新版本号的重试间隔（秒）；熔断期间重试会被熔断器直接跳过，不产生网络请求
+    RETRY_INTERVAL = 1.0
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        # 版本号更新失败、等待重试的用户
+        self._pending: Set[str] = set()
+        self._retry_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"book:ver:{user_id}"
+
+    async def current(self, user_id) -> Optional[str]:
+        """
+        获取当前版本号（不存在时初始化）
+
+        Returns:
+            版本号，Redis 不可用、熔断或该用户的版本号待更新时返回 None
+        """
+        if str(user_id) in self._pending:
+            return None
+        key = self._key(user_id)
+
+        async def read():
+            version = await cache.redis.get(key)
+            if version is None:
+                # 以时间戳初始化，键过期或 Redis 清空后也不会与之前签发的 ETag 重复
+                await cache.redis.set(key, str(time.time_ns()), ex=self.ttl, nx=True)
+                version = await cache.redis.get(key)
+            return version
+
+        return await cache.guarded("book version get", read)
+
+    async def bump(self, user_id) -> bool:
+        """
+        更新版本号，并失效依赖错题本的缓存
+
+        Returns:
+            是否成功；失败时记为待更新并在后台重试
+        """
+        user_id = str(user_id)
+        updated = await cache.guarded(
+            "book version bump",
+            lambda: cache.redis.set(self._key(user_id), str(time.time_ns()), ex=self.ttl),
+            False,
+        )
+        if updated and await cache.invalidate_tags(USER_BOOK_TAG.format(user_id=user_id)) is not None:
+            self._pending.discard(user_id)
+            return True
+
+        if user_id not in self._pending:
+            self._pending.add(user_id)
+            logger.warning(f"Book version bump failed, retrying in background: user={user_id}")
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_task = asyncio.create_task(self._retry_pending())
+        return False
+
+    async def _retry_pending(self) -> None:
+        """重试待更新的版本号，全部成功后退出"""
+        while self._pending:
+            await asyncio.sleep(self.RETRY_INTERVAL)
+            for user_id in list(self._pending):
+                await self.bump(user_id)
+
+    @staticmethod
+    def etag(user_id, version: Optional[str], request: Request) -> Optional[str]:
+        """生成弱 ETag：版本号 + 路径 + 查询参数（版本号为空时返回 None）"""
+        if version is None:
+            return None
+        digest = hashlib.blake2b(
+            f"{user_id}|{version}|{request.url.path}|{request.url.query}".encode(),
+            digest_size=12,
+        ).hexdigest()
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def not_modified(request: Request, etag: Optional[str]) -> bool:
+        """If-None-Match 是否命中（弱比较）"""
+        header = request.headers.get("if-none-match")
+        if not etag or not header:
+            return False
+        if header.strip() == "*":
+            return True
+        opaque = etag.removeprefix("W/")
+        return any(
+            candidate.strip().removeprefix("W/") == opaque
+            for candidate in header.split(",")
+        )
+
+    @staticmethod
+    def mark_changed(session, user_id) -> None:
+        """登记本事务修改了用户的错题本（提交后更新版本号）"""
+        session.info.setdefault(_INFO_KEY, set()).add(str(user_id))
+
+
+# 全局错题本版本号实例
+book_versions = BookVersions(ttl=settings.BOOK_VERSION_TTL)
+
+
+# ==================== 提交后更新版本号 ====================
+
+_INFO_KEY = "book_version_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_question_changes(session: Session, flush_context) -> None:
+    """flush 后记录 ORM 写入涉及的用户"""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ErrorQuestion) and obj.user_id is not None:
+            session.info.setdefault(_INFO_KEY, set()).add(str(obj.user_id))
+
+
+async def _bump_all(user_ids: Set[str]) -> None:
+    """事务提交后更新版本号"""
+    await asyncio.gather(*(book_versions.bump(user_id) for user_id in user_ids))
+
+
+commit_hooks.on_commit(_INFO_KEY, _bump_all, awaited=True)
@@ -1,99 +1,663 @@
 """
 Redis 缓存管理
+
+get / set / delete / exists 为单层 Redis 缓存；mget / mset / execute_many 以一次往返完成多键读写，
+写入时可附带标签，invalidate_tags 按标签集合批量失效（不使用 KEYS 扫描）。
+get_or_set / invalidate 为两级缓存（进程内 LRU + Redis），声明式缓存装饰器 @cached（app.core.cached）基于它实现：
+
+- 进程内命中无网络开销；Redis 中的值同时回填到进程内
+- 同一键的回源计算在进程内（asyncio.Future）和跨进程（Redis SET NX 锁）均只执行一次
+- 概率提前过期（XFetch）：临近过期时按回源耗时随机提前刷新，避免集中过期
+- stale_ttl：过期后的一段时间内直接返回旧值，由一个后台任务刷新
+- invalidate 通过 Redis 发布/订阅通知所有工作进程清除进程内副本
+
+缓存值经 CacheSerializer 编码（json / orjson / msgpack，超过阈值时 zstd 压缩），
+通过独立的二进制连接 raw 读写；redis 属性仍为文本模式连接，供锁、计数、发布订阅等直接使用。
+
+快速失败：两个连接各自使用有上限的连接池，每次操作有独立的短超时；连续失败达到阈值后熔断，
+熔断期间所有操作立即返回降级值（未命中 / False），不再等待超时、不再逐条记录错误日志。
+其他模块直接使用 redis 连接时，可通过 guarded() 获得同样的保护。
 """
+import asyncio
 import json
-from typing import Any, Optional
-from redis.asyncio import Redis
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
 from loguru import logger
+from redis.asyncio import BlockingConnectionPool, Redis
+
 from app.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.codecs import CacheSerializer
+
+T = TypeVar("T")
+
+
+# 释放分布式锁：仅当锁仍由自己持有时删除
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 按标签失效：读取标签集合、删除其中的键和标签集合本身在一次原子操作中完成，
+# 执行期间新加入标签的键不会在删除集合时丢失；返回去重后被删除的键
+INVALIDATE_TAGS_SCRIPT = """
+local seen, keys = {}, {}
+for _, tag_key in ipairs(KEYS) do
+    for _, key in ipairs(redis.call('SMEMBERS', tag_key)) do
+        if not seen[key] then
+            seen[key] = true
+            keys[#keys + 1] = key
+        end
+    end
+end
+for start = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, start, math.min(start + 499, #keys)))
+end
+redis.call('DEL', unpack(KEYS))
+return keys
+"""
 
 
 class RedisCache:
     """Redis 缓存管理器"""
-    
-    def __init__(self):
+
+    # 进程内副本失效通知频道
+    INVALIDATION_CHANNEL = "cache:invalidate"
+
+    # 标签集合键前缀：tag:{标签} -> 带该标签的缓存键集合
+    TAG_PREFIX = "tag:"
+
+    def __init__(
+        self,
+        local_max_size: int = 10000,
+        local_ttl: int = 30,
+        lock_timeout: int = 10,
+        xfetch_beta: float = 1.0,
+        serializer: Optional[CacheSerializer] = None,
+        op_timeout: float = 0.25,
+        max_connections: int = 50,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        # 文本模式连接（decode_responses=True）
         self.redis: Optional[Redis] = None
-    
+        # 二进制连接，用于读写经编码的缓存值
+        self.raw: Optional[Redis] = None
+        self.serializer = serializer or CacheSerializer()
+
+        # 单次操作超时（秒）与每个连接池的连接上限
+        self.op_timeout = op_timeout
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker("redis", probe_timeout=op_timeout)
+
+        # 进程内缓存：key -> (值, 过期时间, 回源耗时)
+        self.local_max_size = local_max_size
+        self.local_ttl = local_ttl
+        self._local: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+
+        # 进程内回源中的请求：key -> Future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.lock_timeout = lock_timeout
+        self.xfetch_beta = xfetch_beta
+
+        # 订阅失效通知的独立连接（阻塞读取，不受 socket_timeout 限制，也不占用连接池）
+        self._subscriber: Optional[Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        # 其他进程内缓存的失效回调：收到失效通知的键列表，None 表示清空
+        self._invalidation_callbacks: List[Callable[[Optional[List[str]]], None]] = []
+
+        # 统计
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.early_refreshes = 0
+        self.stale_hits = 0
+        self.refresh_errors = 0
+
+        # 持有后台刷新任务的引用，防止被提前回收
+        self._background_tasks: Set[asyncio.Task] = set()
+
     async def connect(self):
-        """连接 Redis"""
+        """
+        连接 Redis
+
+        启动时 Redis 不可用不会放弃连接：熔断器直接熔断，缓存按降级处理，
+        冷却后由半开探测恢复，失效通知订阅也在后台持续重连，无需重启进程
+        """
+        self.redis = Redis(connection_pool=self._build_pool(decode_responses=True, encoding="utf-8"))
+        self.raw = Redis(connection_pool=self._build_pool(decode_responses=False))
+        self._subscriber = Redis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True,
+            encoding="utf-8",
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_keepalive=True,
+        )
         try:
-            self.redis = Redis.from_url(
-                settings.REDIS_URL,
-                password=settings.REDIS_PASSWORD,
-                decode_responses=True,
-                encoding="utf-8",
-            )
-            await self.redis.ping()
-            logger.info("✅ Redis connected successfully")
+            await asyncio.wait_for(self.redis.ping(), settings.REDIS_CONNECT_TIMEOUT)
+            logger.info(f"✅ Redis connected successfully (codec: {self.serializer.codec.name})")
+        except Exception as e:
+            logger.error(f"❌ Redis connection failed, cache degraded until it recovers: {e}")
+            self.breaker.trip(e)
+
+        self._listener = asyncio.create_task(self._listen_invalidations())
+
+    def _build_pool(self, **kwargs) -> BlockingConnectionPool:
+        """有上限的连接池：连接耗尽时最多等待一个操作超时，而不是无限新建连接"""
+        return BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            max_connections=self.max_connections,
+            timeout=self.op_timeout,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            **kwargs,
+        )
+
+    async def guarded(
+        self,
+        name: str,
+        operation: Callable[[], Awaitable[T]],
+        default: T = None,
+    ) -> T:
+        """
+        在熔断器与超时保护下执行 Redis 操作
+
+        Args:
+            name: 操作名（用于日志）
+            operation: 返回协程的函数，如 lambda: cache.redis.get(key)
+            default: Redis 未连接、熔断或操作失败时的返回值
+        """
+        if not self.redis or not self.breaker.allow():
+            return default
+        try:
+            result = await asyncio.wait_for(operation(), self.op_timeout)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            # 熔断后由熔断器记录一次日志，此处只记录熔断前的失败
+            if self.breaker.state == CircuitBreaker.CLOSED:
+                logger.warning(f"Redis {name} error: {type(e).__name__}: {e}")
+            return default
+        self.breaker.record_success()
+        return result
+
+    def _decode(self, data: Optional[bytes]) -> Optional[Any]:
+        """解码缓存值，无法解码时视为未命中"""
+        try:
+            return self.serializer.loads(data)
         except Exception as e:
-            logger.error(f"❌ Redis connection failed: {e}")
-            self.redis = None
-    
+            logger.error(f"Cache decode error: {e}")
+            return None
+
     async def close(self):
         """关闭 Redis 连接"""
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._subscriber:
+            await self._subscriber.aclose()
+            self._subscriber = None
+        if self.raw:
+            await self.raw.close()
         if self.redis:
             await self.redis.close()
             logger.info("Redis connection closed")
-    
+
     async def get(self, key: str) -> Optional[Any]:
         """获取缓存"""
-        if not self.redis:
-            return None
-        
-        try:
-            value = await self.redis.get(key)
-            if value:
-                return json.loads(value)
-            return None
-        except Exception as e:
-            logger.error(f"Redis get error: {e}")
-            return None
-    
+        return self._decode(await self.guarded("get", lambda: self.raw.get(key)))
+
     async def set(
         self,
         key: str,
         value: Any,
         expire: int = 3600,
+        tags: Optional[Iterable[str]] = None,
     ) -> bool:
-        """设置缓存"""
-        if not self.redis:
-            return False
-        
-        try:
-            await self.redis.setex(
-                key,
-                expire,
-                json.dumps(value, ensure_ascii=False),
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Redis set error: {e}")
-            return False
-    
+        """设置缓存（可附带标签）"""
+        if tags:
+            return await self.mset({key: value}, expire=expire, tags=tags)
+
+        data = self.serializer.dumps(value)
+        return await self.guarded("set", lambda: self.raw.setex(key, expire, data), False)
+
     async def delete(self, key: str) -> bool:
         """删除缓存"""
-        if not self.redis:
-            return False
-        
-        try:
-            await self.redis.delete(key)
-            return True
-        except Exception as e:
-            logger.error(f"Redis delete error: {e}")
-            return False
-    
+        return await self.delete_many([key])
+
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
-        if not self.redis:
+        return await self.guarded("exists", lambda: self.redis.exists(key), 0) > 0
+
+    # ==================== 批量操作 ====================
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """批量获取缓存（一次 MGET），结果与 keys 一一对应，未命中为 None"""
+        if not keys:
+            return []
+
+        values = await self.guarded("mget", lambda: self.raw.mget(keys))
+        if values is None:
+            return [None] * len(keys)
+        return [self._decode(value) for value in values]
+
+    async def mset(
+        self,
+        items: Mapping[str, Any],
+        expire: Union[int, Mapping[str, int]] = 3600,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        批量设置缓存（一次流水线往返）
+
+        Args:
+            items: 键 -> 值
+            expire: 统一过期时间，或 键 -> 过期时间（未列出的键使用 3600 秒）
+            tags: 为全部键附加的标签
+        """
+        if not items:
             return False
-        
-        try:
-            return await self.redis.exists(key) > 0
-        except Exception as e:
-            logger.error(f"Redis exists error: {e}")
+
+        ttls = {
+            key: expire.get(key, 3600) if isinstance(expire, Mapping) else expire
+            for key in items
+        }
+        encoded = {key: self.serializer.dumps(value) for key, value in items.items()}
+
+        async def write():
+            async with self.raw.pipeline(transaction=False) as pipe:
+                for key, data in encoded.items():
+                    pipe.setex(key, ttls[key], data)
+                for tag in tags or ():
+                    tag_key = f"{self.TAG_PREFIX}{tag}"
+                    pipe.sadd(tag_key, *items)
+                    # 标签集合至少与其中最晚过期的键同时存在（EXPIRE GT/NX 需要 Redis 7）
+                    pipe.expire(tag_key, max(ttls.values()), gt=True)
+                    pipe.expire(tag_key, max(ttls.values()), nx=True)
+                await pipe.execute()
+            return True
+
+        return await self.guarded("mset", write, False)
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """读取原始字节（不经编解码，用于图片、向量等二进制数据）"""
+        return await self.guarded("get", lambda: self.raw.get(key))
+
+    async def set_raw(self, key: str, data: bytes, expire: int = 3600) -> bool:
+        """写入原始字节"""
+        return await self.guarded("set", lambda: self.raw.setex(key, expire, data), False)
+
+    async def execute_many(self, commands: Sequence[Tuple[Any, ...]]) -> Optional[List[Any]]:
+        """
+        以流水线执行多条命令
+
+        Args:
+            commands: (命令方法名, *参数)，如 [("incr", "a"), ("expire", "a", 60)]
+
+        Returns:
+            各命令结果；Redis 不可用或执行失败时返回 None
+        """
+        async def run():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name, *args in commands:
+                    getattr(pipe, name)(*args)
+                return await pipe.execute()
+
+        return await self.guarded("pipeline", run)
+
+    async def invalidate_tags(self, *tags: str) -> Optional[int]:
+        """
+        失效带有任一标签的全部缓存（两级），返回删除的键数；Redis 不可用或熔断时返回 None
+        """
+        if not tags:
+            return 0
+
+        tag_keys = [f"{self.TAG_PREFIX}{tag}" for tag in tags]
+        keys = await self.guarded(
+            "invalidate tags",
+            lambda: self.redis.eval(INVALIDATE_TAGS_SCRIPT, len(tag_keys), *tag_keys),
+        )
+        if keys is None:
+            return None
+        if not keys:
+            return 0
+
+        # Redis 中的键已删除，只需通知各工作进程清除进程内副本
+        for key in keys:
+            self._local.pop(key, None)
+        await self.execute_many([
+            ("publish", self.INVALIDATION_CHANNEL, json.dumps(keys[start:start + 500]))
+            for start in range(0, len(keys), 500)
+        ])
+        return len(keys)
+
+    async def delete_many(self, keys: Sequence[str]) -> bool:
+        """批量删除缓存"""
+        if not keys:
             return False
+        return await self.guarded("delete", lambda: self.redis.delete(*keys), None) is not None
 
+    # ==================== 两级缓存 ====================
 
-# 全局缓存实例
-cache = RedisCache()
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int = 3600,
+        local_ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+        *,
+        expire_for: Optional[Callable[[Any], int]] = None,
+        stale_ttl: int = 0,
+        refresh_loader: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        读取两级缓存，未命中时调用 loader 回源并写入
+
+        Args:
+            key: 缓存键
+            loader: 回源函数（返回值需可 JSON 序列化）
+            expire: Redis 过期时间（秒）
+            local_ttl: 进程内过期时间（秒），默认取 min(expire, LOCAL_CACHE_TTL)，0 表示只使用 Redis
+            tags: 标签，可通过 invalidate_tags 批量失效
+            expire_for: 按回源结果决定过期时间（如空结果缩短），返回 0 时不写入缓存
+            stale_ttl: 过期后 stale_ttl 秒内直接返回旧值，并在后台刷新
+            refresh_loader: 后台刷新使用的回源函数，默认同 loader
+        """
+        now = time.time()
+        local_ttl = min(expire, self.local_ttl if local_ttl is None else local_ttl)
+
+        # 1. 进程内
+        entry = self._local.get(key)
+        if entry is not None:
+            value, expires_at, delta = entry
+            if not self._should_refresh(expires_at, delta, now):
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return value
+
+        # 2. Redis
+        stale = None
+        envelope = await self._get_envelope(key)
+        if envelope is not None:
+            value, expires_at, delta = envelope["v"], envelope["e"], envelope["d"]
+            if not self._should_refresh(expires_at, delta, now):
+                if local_ttl > 0:
+                    self._set_local(key, value, min(expires_at, now + local_ttl), delta)
+                self.redis_hits += 1
+                return value
+            stale = envelope
+            if now >= expires_at:
+                # 已过期、仍在 stale 窗口内：直接返回旧值，由一个后台任务刷新
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._refresh_in_background(key, lambda: self._load(
+                        key, refresh_loader or loader, expire, local_ttl, stale, tags, expire_for, stale_ttl,
+                    ))
+                return value
+            # 提前过期：由一个调用方刷新，其余调用方直接使用旧值
+            self.early_refreshes += 1
+
+        # 3. 回源（进程内合并）
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            if stale is not None:
+                return stale["v"]
+            return await asyncio.shield(inflight)
+
+        return await self._run_load(key, self._begin_load(key), lambda: self._load(
+            key, loader, expire, local_ttl, stale, tags, expire_for, stale_ttl,
+        ))
+
+    def _begin_load(self, key: str) -> asyncio.Future:
+        """登记进程内回源，同一键的其他调用方等待同一结果"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
 
+    async def _run_load(self, key: str, future: asyncio.Future, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await load()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "Future exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key: str, load: Callable[[], Awaitable[Any]]) -> None:
+        """后台刷新过期键（先同步登记，避免同一轮事件循环内重复刷新）"""
+        future = self._begin_load(key)
+
+        async def run() -> None:
+            try:
+                await self._run_load(key, future, load)
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"Cache refresh error ({key}): {e}")
+
+        task = asyncio.create_task(run())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def invalidate(self, *keys: str) -> None:
+        """删除两级缓存中的键，并通知其他工作进程清除进程内副本"""
+        if not keys:
+            return
+        for key in keys:
+            self._local.pop(key, None)
+        await self.execute_many([
+            ("delete", *keys),
+            ("publish", self.INVALIDATION_CHANNEL, json.dumps(list(keys))),
+        ])
+
+    def local_stats(self) -> Dict[str, Any]:
+        """两级缓存命中统计"""
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "early_refreshes": self.early_refreshes,
+            "stale_hits": self.stale_hits,
+            "refresh_errors": self.refresh_errors,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        """熔断器状态与连接池配置"""
+        return {
+            **self.breaker.stats(),
+            "connected": self.redis is not None,
+            "op_timeout": self.op_timeout,
+            "max_connections": self.max_connections,
+        }
+
+    def _should_refresh(self, expires_at: float, delta: float, now: float) -> bool:
+        """XFetch：now - delta * beta * ln(rand) >= expiry 时提前刷新"""
+        return now - delta * self.xfetch_beta * math.log(random.random() or 1e-12) >= expires_at
+
+    def _set_local(self, key: str, value: Any, expires_at: float, delta: float) -> None:
+        self._local[key] = (value, expires_at, delta)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    async def _get_envelope(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取带过期时间与回源耗时的缓存包"""
+        envelope = await self.get(key)
+        if isinstance(envelope, dict) and {"v", "e", "d"} <= envelope.keys():
+            return envelope
+        return None
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int,
+        local_ttl: int,
+        stale: Optional[Dict[str, Any]],
+        tags: Optional[Iterable[str]] = None,
+        expire_for: Optional[Callable[[Any], int]] = None,
+        stale_ttl: int = 0,
+    ) -> Any:
+        """跨进程单飞回源：获得锁的进程计算，其余进程等待结果（有旧值时直接返回旧值）"""
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{key}"
+        locked = await self._acquire_lock(lock_key, token)
+
+        if not locked:
+            if stale is not None:
+                return stale["v"]
+            envelope = await self._wait_for_value(key)
+            if envelope is not None:
+                self.redis_hits += 1
+                return envelope["v"]
+            # 等待超时（持锁进程异常），自行回源
+
+        try:
+            self.misses += 1
+            started = time.time()
+            value = await loader()
+            finished = time.time()
+            delta = finished - started
+
+            ttl = expire_for(value) if expire_for else expire
+            if ttl <= 0:
+                return value
+            await self.set(
+                key,
+                {"v": value, "e": finished + ttl, "d": delta},
+                expire=ttl + stale_ttl,
+                tags=tags,
+            )
+            if local_ttl > 0:
+                self._set_local(key, value, finished + min(ttl, local_ttl), delta)
+            return value
+        finally:
+            if locked:
+                await self._release_lock(lock_key, token)
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        """获取分布式锁；Redis 不可用或熔断时视为已获得（仅进程内合并）"""
+        return bool(await self.guarded(
+            "lock",
+            lambda: self.redis.set(lock_key, token, nx=True, ex=self.lock_timeout),
+            True,
+        ))
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        await self.guarded("unlock", lambda: self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token))
+
+    async def _wait_for_value(self, key: str) -> Optional[Dict[str, Any]]:
+        """等待持锁进程写入结果，最长等待锁超时时间"""
+        deadline = time.time() + self.lock_timeout
+        delay = 0.02
+        # 熔断后不再等待，调用方自行回源
+        while time.time() < deadline and self.breaker.state == CircuitBreaker.CLOSED:
+            await asyncio.sleep(delay)
+            envelope = await self._get_envelope(key)
+            if envelope is not None:
+                return envelope
+            delay = min(delay * 2, 0.2)
+        return None
+
+    def on_invalidate(self, callback: Callable[[Optional[List[str]]], None]) -> None:
+        """
+        注册进程内缓存的失效回调（invalidate 通知经发布/订阅到达每个工作进程，包括发送方）
+
+        Args:
+            callback: 接收失效的键列表；订阅中断期间可能漏掉通知，此时以 None 调用，应清空全部副本
+        """
+        self._invalidation_callbacks.append(callback)
+
+    def _notify_invalidation(self, keys: Optional[List[str]]) -> None:
+        for callback in self._invalidation_callbacks:
+            try:
+                callback(keys)
+            except Exception as e:
+                logger.error(f"Cache invalidation callback error: {e}")
+
+    def _clear_local_tiers(self) -> None:
+        self._local.clear()
+        self._notify_invalidation(None)
+
+    async def _listen_invalidations(self) -> None:
+        """订阅失效通知，清除进程内副本（断线后指数退避重连，每次断线只记录一次错误）"""
+        delay = 1
+        while True:
+            try:
+                async with self._subscriber.pubsub() as pubsub:
+                    await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                    if delay > 1:
+                        logger.info("Cache invalidation subscription restored")
+                        self._clear_local_tiers()
+                        delay = 1
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        keys = json.loads(message["data"])
+                        for key in keys:
+                            self._local.pop(key, None)
+                        self._notify_invalidation(keys)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if delay == 1:
+                    logger.error(f"Cache invalidation subscription error: {e}")
+                # 断线期间可能漏掉通知，清空进程内副本
+                self._clear_local_tiers()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+# 全局缓存实例
+cache = RedisCache(
+    local_max_size=settings.LOCAL_CACHE_MAX_SIZE,
+    local_ttl=settings.LOCAL_CACHE_TTL,
+    lock_timeout=settings.CACHE_LOCK_TIMEOUT,
+    xfetch_beta=settings.CACHE_XFETCH_BETA,
+    serializer=CacheSerializer(
+        codec=settings.CACHE_CODEC,
+        compress_threshold=settings.CACHE_COMPRESS_THRESHOLD,
+        compress_level=settings.CACHE_COMPRESS_LEVEL,
+    ),
+    op_timeout=settings.REDIS_OP_TIMEOUT,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    breaker=CircuitBreaker(
+        "redis",
+        failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=settings.REDIS_BREAKER_RECOVERY_TIMEOUT,
+        probe_timeout=settings.REDIS_OP_TIMEOUT,
+    ),
+)
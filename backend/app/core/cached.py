@@ -0,0 +1,163 @@
+"""
+声明式缓存装饰器
+用于路由处理函数、FastAPI 依赖和服务层的 async 函数：
+
+    @router.get("/weekly")
+    @cached("reports.weekly", ttl=600, tags=[USER_BOOK_TAG])
+    async def get_weekly_report(current_user: User = Depends(get_current_user), ...):
+        ...
+
+- 缓存键：cached:{名称}:{用户 ID}:{其余参数摘要}，数据库会话、Request 等请求级对象不参与
+- 标签：模板按用户 ID 与参数格式化，如 "book:{user_id}"，可通过 cache.invalidate_tags 批量失效
+- 基于 cache.get_or_set：同一键并发未命中只回源一次（进程内合并 + Redis SET NX 锁），临近过期按 XFetch 提前刷新
+- 空结果（None、空列表/字典，统一响应按 data 判断）按 negative_ttl 单独缓存，避免反复回源
+- stale_ttl > 0 时，过期后的 stale_ttl 秒内直接返回旧值，并在后台刷新
+- local_ttl > 0 时额外保留进程内副本（失效通知与两级缓存一致）
+
+缓存值为 jsonable_encoder 编码后的结构，命中与未命中均返回该结构（路由按 response_model 序列化，结果一致）。
+"""
+import functools
+import hashlib
+import inspect
+import json
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+from fastapi import BackgroundTasks, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.database import read_session
+
+# 不参与缓存键的参数类型（请求级对象）
+_UNKEYED_TYPES = (AsyncSession, Request, Response, BackgroundTasks)
+
+
+class CachedMetrics:
+    """各缓存函数的调用与回源统计（命中层级见 cache.local_stats）"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.refreshes: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for name, calls in self.calls.items():
+            result[name] = {
+                "calls": calls,
+                "misses": self.misses[name],
+                "negative": self.negative[name],
+                "refreshes": self.refreshes[name],
+                "hit_rate": 1 - self.misses[name] / calls if calls else 0.0,
+            }
+        return result
+
+
+# 全局统计实例
+cached_metrics = CachedMetrics()
+
+
+def _is_empty(value: Any) -> bool:
+    """是否为空结果（统一响应按 data 判断）"""
+    if isinstance(value, dict) and {"success", "data"} <= value.keys():
+        value = value["data"]
+    return value is None or (isinstance(value, (list, dict, str)) and not value)
+
+
+def cached(
+    name: str,
+    ttl: int = 300,
+    *,
+    tags: Iterable[str] = (),
+    per_user: bool = True,
+    user_arg: str = "current_user",
+    key_args: Optional[Sequence[str]] = None,
+    negative_ttl: int = 60,
+    stale_ttl: int = 0,
+    local_ttl: int = 0,
+) -> Callable:
+    """
+    缓存 async 函数的返回值
+
+    Args:
+        name: 缓存名称（缓存键前缀与统计名）
+        ttl: 新鲜期（秒）
+        tags: 标签模板，可引用 {user_id} 与函数参数
+        per_user: 是否按用户隔离
+        user_arg: 当前用户参数名（User 对象取其 id，也可直接为用户 ID）
+        key_args: 参与缓存键的参数名，默认为除用户与请求级对象外的全部参数
+        negative_ttl: 空结果的缓存时间（秒），0 表示不缓存空结果
+        stale_ttl: 过期后仍可返回旧值并后台刷新的时间（秒）
+        local_ttl: 进程内副本的保留时间（秒），0 表示只使用 Redis
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        if per_user and user_arg not in signature.parameters:
+            raise ValueError(f"@cached({name!r}): {func.__qualname__} has no '{user_arg}' parameter")
+
+        def build_key(arguments: Dict[str, Any]) -> tuple:
+            user_id = None
+            if per_user:
+                user = arguments[user_arg]
+                user_id = str(getattr(user, "id", user))
+            key_values = {
+                arg: value
+                for arg, value in arguments.items()
+                if (arg in key_args if key_args is not None else arg != user_arg)
+                and not isinstance(value, _UNKEYED_TYPES)
+            }
+            digest = hashlib.blake2b(
+                json.dumps(jsonable_encoder(key_values), sort_keys=True, default=str).encode(),
+                digest_size=12,
+            ).hexdigest()
+            key = f"cached:{name}:{user_id}:{digest}" if per_user else f"cached:{name}:{digest}"
+            fields = {**arguments, "user_id": user_id} if per_user else arguments
+            tag_list = [tag.format_map(fields) for tag in tags]
+            return key, tag_list
+
+        def expire_for(value: Any) -> int:
+            if _is_empty(value):
+                cached_metrics.negative[name] += 1
+                return negative_ttl
+            return ttl
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key, tag_list = build_key(bound.arguments)
+            cached_metrics.calls[name] += 1
+
+            async def load() -> Any:
+                cached_metrics.misses[name] += 1
+                return jsonable_encoder(await func(*args, **kwargs))
+
+            async def refresh() -> Any:
+                """后台刷新：请求级会话已关闭，改用新的只读会话"""
+                cached_metrics.refreshes[name] += 1
+                async with read_session() as db:
+                    refreshed = inspect.BoundArguments(signature, {
+                        arg: db if isinstance(value, AsyncSession) else value
+                        for arg, value in bound.arguments.items()
+                    })
+                    return jsonable_encoder(await func(*refreshed.args, **refreshed.kwargs))
+
+            return await cache.get_or_set(
+                key,
+                load,
+                expire=ttl,
+                local_ttl=local_ttl,
+                tags=tag_list,
+                expire_for=expire_for,
+                stale_ttl=stale_ttl,
+                refresh_loader=refresh,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,121 @@
+"""
+熔断器
+依赖（Redis 等）连续失败达到阈值后熔断，熔断期间调用方直接跳过依赖、走降级逻辑，
+不再逐个等待超时；冷却时间过后进入半开状态，放行单个探测请求：成功则恢复，失败则重新熔断。
+
+状态变化只在切换时记录一次日志，避免依赖故障期间刷屏。
+"""
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+class CircuitBreaker:
+    """连续失败计数熔断器（非线程安全，供单个事件循环使用）"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 10.0,
+        probe_timeout: float = 1.0,
+    ):
+        """
+        Args:
+            name: 名称（用于日志与统计）
+            failure_threshold: 连续失败多少次后熔断
+            recovery_timeout: 熔断后多久进入半开状态（秒）
+            probe_timeout: 半开状态下探测请求的最长占用时间（秒），超过后放行下一个探测
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_timeout = probe_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+        # 统计
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self.last_error: Optional[str] = None
+
+    def allow(self) -> bool:
+        """是否放行本次调用"""
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._transition(self.HALF_OPEN)
+            self._probe_started_at = now
+            return True
+        # 半开状态只放行一个探测；探测超时未返回（如调用方被取消）时放行下一个
+        if self.state == self.HALF_OPEN and now - self._probe_started_at >= self.probe_timeout:
+            self._probe_started_at = now
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """记录一次成功调用"""
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        """记录一次失败调用"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self.opened += 1
+            self._transition(self.OPEN)
+
+    def trip(self, error: BaseException) -> None:
+        """立即熔断（如启动时依赖不可用），冷却后同样由半开探测恢复"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state != self.OPEN:
+            self._opened_at = time.monotonic()
+            self.opened += 1
+            self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        if state == self.OPEN:
+            logger.error(
+                f"Circuit breaker '{self.name}' opened after {self.consecutive_failures} failure(s), "
+                f"bypassing for {self.recovery_timeout}s: {self.last_error}"
+            )
+        elif state == self.HALF_OPEN:
+            logger.info(f"Circuit breaker '{self.name}' half-open, probing")
+        elif previous != self.CLOSED:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+
+    def stats(self) -> Dict[str, Any]:
+        """熔断器状态与计数"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,143 @@
+"""
+缓存序列化编解码
+缓存值以 1 字节标记开头，标明编码方式，因此不同配置（或滚动发布期间新旧进程）写入的值可以互相读取：
+
+- \\x01 JSON（json / orjson 写入，格式相同）
+- \\x02 MessagePack（可直接存储 bytes）
+- \\x03 zstd 压缩，解压后再按内层标记解码
+- 其他：无标记的历史 JSON 文本
+
+orjson / msgpack / zstandard 为可选依赖（pip install ".[cache]"），未安装时回退到标准库 json、不压缩。
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+
+JSON_MARKER = b"\x01"
+MSGPACK_MARKER = b"\x02"
+ZSTD_MARKER = b"\x03"
+
+
+class Codec(ABC):
+    """编解码器基类"""
+
+    name = ""
+    marker = b""
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """编码为字节（不含标记）"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """从字节（不含标记）解码"""
+
+
+class JsonCodec(Codec):
+    """标准库 JSON"""
+
+    name = "json"
+    marker = JSON_MARKER
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson：与 JSON 格式相同，编解码速度更快"""
+
+    name = "orjson"
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack：体积更小，支持 bytes"""
+
+    name = "msgpack"
+    marker = MSGPACK_MARKER
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class CacheSerializer:
+    """带标记与可选压缩的缓存序列化器"""
+
+    def __init__(self, codec: str = "json", compress_threshold: int = 0, compress_level: int = 3):
+        self.codec = self._build_codec(codec)
+        self._decoders: Dict[bytes, Codec] = {JSON_MARKER: JsonCodec()}
+        if msgpack is not None:
+            self._decoders[MSGPACK_MARKER] = MsgpackCodec()
+
+        self.compress_threshold = compress_threshold if zstandard is not None else 0
+        if compress_threshold and zstandard is None:
+            logger.info("zstandard is not installed, cache compression disabled")
+        self._compressor = zstandard.ZstdCompressor(level=compress_level) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    @staticmethod
+    def _build_codec(name: str) -> Codec:
+        if name == "orjson":
+            if orjson is not None:
+                return OrjsonCodec()
+            logger.warning("orjson is not installed, falling back to json cache codec")
+        elif name == "msgpack":
+            if msgpack is not None:
+                return MsgpackCodec()
+            logger.warning("msgpack is not installed, falling back to json cache codec")
+        elif name != "json":
+            raise ValueError(f"Unknown cache codec: {name}")
+        return JsonCodec()
+
+    def dumps(self, value: Any) -> bytes:
+        """序列化（超过阈值时压缩）"""
+        data = self.codec.marker + self.codec.encode(value)
+        if self.compress_threshold and len(data) > self.compress_threshold:
+            compressed = self._compressor.compress(data)
+            if len(compressed) + 1 < len(data):
+                return ZSTD_MARKER + compressed
+        return data
+
+    def loads(self, data: Optional[bytes]) -> Any:
+        """反序列化（None 表示未命中）"""
+        if data is None:
+            return None
+        if data[:1] == ZSTD_MARKER:
+            if self._decompressor is None:
+                raise ValueError("zstandard is required to read compressed cache values")
+            data = self._decompressor.decompress(data[1:])
+        decoder = self._decoders.get(data[:1])
+        if decoder is not None:
+            return decoder.decode(data[1:])
+        if data[:1] == MSGPACK_MARKER:
+            raise ValueError("msgpack is required to read msgpack cache values")
+        # 无标记：历史 JSON 文本
+        return json.loads(data)
@@ -0,0 +1,98 @@
+"""
+事务提交后任务
+各模块在 flush 或显式登记时把待处理项收集到 session.info[键]，再通过 on_commit 注册处理函数：
+提交后统一执行，回滚时丢弃。
+
+    on_commit("book_version_changes", bump_all, awaited=True)
+
+- 后台模式（默认）：提交后创建后台任务，不阻塞写请求
+- 等待模式（awaited=True）：在 AppSession.commit() 返回前执行完毕，
+  紧随写请求之后的读请求一定能看到结果（如错题本版本号、读己之写标记）
+- local：提交时同步执行的进程内处理（如清除本进程缓存），不等待网络
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+@dataclass(frozen=True)
+class CommitHook:
+    """提交后任务：info_key 下收集的待处理项交给 handler"""
+    info_key: str
+    handler: Callable[[Any], Awaitable[None]]
+    awaited: bool = False
+    local: Optional[Callable[[Any], None]] = None
+
+
+_hooks: List[CommitHook] = []
+
+# 等待模式下已提交、待执行的任务
+_PENDING_KEY = "commit_hooks_pending"
+
+# 持有后台任务的引用，防止被提前回收
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def on_commit(
+    info_key: str,
+    handler: Callable[[Any], Awaitable[None]],
+    *,
+    awaited: bool = False,
+    local: Optional[Callable[[Any], None]] = None,
+) -> None:
+    """
+    注册提交后任务
+
+    Args:
+        info_key: session.info 中待处理项的键
+        handler: 接收待处理项的异步处理函数
+        awaited: 是否在 commit() 返回前执行完毕
+        local: 提交时同步执行的处理函数
+    """
+    _hooks.append(CommitHook(info_key, handler, awaited, local))
+
+
+async def _run(hook: CommitHook, items: Any) -> None:
+    try:
+        await hook.handler(items)
+    except Exception as e:
+        logger.error(f"After-commit hook '{hook.info_key}' failed: {e}")
+
+
+async def run_pending(session: Session) -> None:
+    """执行等待模式的提交后任务（由 AppSession.commit / close 调用）"""
+    pending: List[Tuple[CommitHook, Any]] = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        await asyncio.gather(*(_run(hook, items) for hook, items in pending))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    for hook in _hooks:
+        items = session.info.pop(hook.info_key, None)
+        if not items:
+            continue
+        if hook.local is not None:
+            hook.local(items)
+        if hook.awaited:
+            session.info.setdefault(_PENDING_KEY, []).append((hook, items))
+        elif loop is not None:
+            task = loop.create_task(_run(hook, items))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    """事务回滚时丢弃未提交的待处理项"""
+    for hook in _hooks:
+        session.info.pop(hook.info_key, None)
@@ -1,10 +1,41 @@
 """
 数据库连接和会话管理
+
+写入与强一致读取使用主库会话（get_db）；配置 DATABASE_REPLICA_URLS 后，读多写少的接口
+可改用只读会话（read_session / api.v1.auth.get_read_db）：
+
+- 在健康的只读副本间轮询分配，副本不可用或复制延迟超过 DATABASE_REPLICA_MAX_LAG 时回退主库
+- 读己之写：用户的写事务提交后 READ_YOUR_WRITES_WINDOW 秒内，其读请求仍走主库
+  （写入方由 get_current_user 通过 bind_user 登记到会话上，跨进程通过 Redis 共享）
 """
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+
 from app.config import settings
+from app.core import commit_hooks
+from app.core.cache import cache
+
+
+class AppSession(AsyncSession):
+    """异步会话：commit() 返回前执行等待模式的提交后任务（见 app.core.commit_hooks）"""
+
+    async def commit(self) -> None:
+        await super().commit()
+        await commit_hooks.run_pending(self.sync_session)
+
+    async def close(self) -> None:
+        # 通过 session.begin() 提交的事务不经过 commit()，在关闭前补充执行
+        await commit_hooks.run_pending(self.sync_session)
+        await super().close()
 
 
 # 创建异步引擎
@@ -19,7 +50,7 @@ engine = create_async_engine(
 # 创建会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=AppSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -44,3 +75,268 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+
+# ==================== 只读副本 ====================
+
+# 会话 info 键：只读副本会话标记 / 会话所属用户 / 本事务有写入的用户
+_READ_ONLY_KEY = "read_only"
+_USER_KEY = "user_id"
+_WRITES_KEY = "recent_writers"
+
+# 复制延迟：WAL 已全部回放时为 0，否则为距最后一次回放事务的秒数（主库返回 0）
+REPLICA_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+
+class Replica:
+    """只读副本（独立连接池）"""
+
+    def __init__(self, index: int, url: str):
+        # 日志与统计中使用序号，避免输出连接串中的密码
+        self.name = f"replica-{index}"
+        self.engine = create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+            max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        self.sessionmaker = async_sessionmaker(
+            self.engine,
+            class_=AppSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+            info={_READ_ONLY_KEY: True},
+        )
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reads = 0
+
+
+class ReplicaSet:
+    """只读副本集合：后台健康检查 + 轮询分配"""
+
+    def __init__(self, urls: List[str], max_lag: float, check_interval: float, check_timeout: float):
+        self.replicas = [Replica(index, url) for index, url in enumerate(urls, 1)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计：走主库的读请求（未配置副本 / 读己之写 / 无可用副本）
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallback_reads = 0
+
+    async def start(self) -> None:
+        """首次检查后启动后台健康检查"""
+        if not self.replicas:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+        healthy = sum(replica.healthy for replica in self.replicas)
+        logger.info(f"✅ Read replicas started ({healthy}/{len(self.replicas)} healthy)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def check(self) -> None:
+        """并发检查全部副本的可用性与复制延迟"""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        async def measure() -> float:
+            async with replica.engine.connect() as conn:
+                return float(await conn.scalar(REPLICA_LAG_SQL))
+
+        try:
+            replica.lag = await asyncio.wait_for(measure(), self.check_timeout)
+            replica.last_error = None
+            healthy = replica.lag <= self.max_lag
+            reason = f"replication lag {replica.lag:.1f}s"
+        except Exception as e:
+            replica.lag = None
+            replica.last_error = f"{type(e).__name__}: {e}"
+            healthy = False
+            reason = replica.last_error
+
+        # 只在状态变化时记录日志
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info(f"Read replica {replica.name} is available ({reason})")
+            else:
+                logger.warning(f"Read replica {replica.name} is unavailable, falling back to primary ({reason})")
+        replica.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Read replica health check error: {e}")
+
+    def pick(self) -> Optional[Replica]:
+        """在健康副本间轮询，没有可用副本时返回 None"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def session_factory(self, user_id=None) -> async_sessionmaker:
+        """选择本次读请求使用的会话工厂"""
+        if not self.replicas:
+            self.primary_reads += 1
+            return AsyncSessionLocal
+        if user_id is not None and await recent_writes.is_recent(user_id):
+            self.sticky_reads += 1
+            return AsyncSessionLocal
+        replica = self.pick()
+        if replica is None:
+            self.fallback_reads += 1
+            return AsyncSessionLocal
+        replica.reads += 1
+        return replica.sessionmaker
+
+    def stats(self) -> Dict:
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag": replica.lag,
+                    "reads": replica.reads,
+                    "last_error": replica.last_error,
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallback_reads": self.fallback_reads,
+        }
+
+
+class RecentWrites:
+    """最近有写入的用户（进程内记录 + Redis 共享给其他工作进程）"""
+
+    def __init__(self, window: float, max_size: int = 10000):
+        self.window = window
+        self.max_size = max_size
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"db:rw:{user_id}"
+
+    def mark_local(self, user_id) -> None:
+        """登记用户刚刚提交了写入（本进程，提交时同步执行）"""
+        user_id = str(user_id)
+        self._local[user_id] = time.monotonic() + self.window
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def share(self, user_ids: Iterable) -> None:
+        """将写入标记同步到 Redis，供其他工作进程判断"""
+        px = int(self.window * 1000)
+        await cache.execute_many([
+            ("set", self._key(str(user_id)), "1", None, px) for user_id in user_ids
+        ])
+
+    async def mark(self, user_id) -> None:
+        """登记用户刚刚提交了写入"""
+        self.mark_local(user_id)
+        await self.share([user_id])
+
+    async def is_recent(self, user_id) -> bool:
+        """用户是否在窗口期内写入过（Redis 不可用时只看本进程记录）"""
+        user_id = str(user_id)
+        until = self._local.get(user_id)
+        if until is not None:
+            if until > time.monotonic():
+                return True
+            del self._local[user_id]
+        return bool(await cache.guarded(
+            "recent write check",
+            lambda: cache.redis.exists(self._key(user_id)),
+            0,
+        ))
+
+
+# 全局只读副本与读己之写实例
+replicas = ReplicaSet(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL,
+    check_timeout=settings.DATABASE_REPLICA_CHECK_TIMEOUT,
+)
+recent_writes = RecentWrites(window=settings.READ_YOUR_WRITES_WINDOW)
+
+
+@asynccontextmanager
+async def read_session(user_id=None) -> AsyncIterator[AsyncSession]:
+    """
+    获取只读会话（副本不可用或用户刚写入过时为主库会话）
+
+    Args:
+        user_id: 当前用户，用于读己之写；后台任务等无用户场景可不传
+    """
+    factory = await replicas.session_factory(user_id)
+    async with factory() as session:
+        yield session
+
+
+def is_read_only(session: AsyncSession) -> bool:
+    """会话是否连接只读副本（不能执行写入）"""
+    return bool(session.info.get(_READ_ONLY_KEY))
+
+
+def bind_user(session: AsyncSession, user_id) -> None:
+    """登记会话所属用户，提交写入后该用户的读请求在窗口期内回到主库"""
+    session.info[_USER_KEY] = str(user_id)
+
+
+# ==================== 提交后登记写入用户 ====================
+
+def _collect_writer(session: Session) -> None:
+    """记录本事务有写入的用户（未配置副本或会话未登记用户时跳过）"""
+    user_id = session.info.get(_USER_KEY)
+    if user_id is not None and replicas.replicas:
+        session.info.setdefault(_WRITES_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_writes(orm_execute_state) -> None:
+    """Core / ORM 批量 INSERT、UPDATE、DELETE"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _collect_writer(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush_writes(session: Session, flush_context) -> None:
+    """ORM 对象写入"""
+    _collect_writer(session)
+
+
+def _mark_writers_local(user_ids: Set[str]) -> None:
+    for user_id in user_ids:
+        recent_writes.mark_local(user_id)
+
+
+# 本进程标记在提交时同步写入；Redis 标记在 commit() 返回前写完，响应发出后其他进程也能看到
+commit_hooks.on_commit(_WRITES_KEY, recent_writes.share, awaited=True, local=_mark_writers_local)
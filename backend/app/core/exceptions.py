@@ -1,24 +1,27 @@
 """
 自定义异常类
 """
-from typing import Optional, Any
+from typing import Any, Dict, Optional
+
 from fastapi import status
 
 
 class AppException(Exception):
     """应用基础异常类"""
-    
+
     def __init__(
         self,
         message: str,
         status_code: int = status.HTTP_400_BAD_REQUEST,
         error_code: str = "APP_ERROR",
         detail: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
     ):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code
         self.detail = detail
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -26,7 +29,7 @@ class AppException(Exception):
 
 class AuthenticationError(AppException):
     """认证失败异常"""
-    
+
     def __init__(
         self,
         message: str = "认证失败",
@@ -42,7 +45,7 @@ class AuthenticationError(AppException):
 
 class PermissionDenied(AppException):
     """权限不足异常"""
-    
+
     def __init__(
         self,
         message: str = "权限不足",
@@ -58,7 +61,7 @@ class PermissionDenied(AppException):
 
 class TokenExpired(AppException):
     """Token 过期异常"""
-    
+
     def __init__(
         self,
         message: str = "Token 已过期",
@@ -74,7 +77,7 @@ class TokenExpired(AppException):
 
 class InvalidToken(AppException):
     """无效 Token 异常"""
-    
+
     def __init__(
         self,
         message: str = "无效的 Token",
@@ -92,7 +95,7 @@ class InvalidToken(AppException):
 
 class NotFound(AppException):
     """资源未找到异常"""
-    
+
     def __init__(
         self,
         message: str = "资源未找到",
@@ -108,7 +111,7 @@ class NotFound(AppException):
 
 class AlreadyExists(AppException):
     """资源已存在异常"""
-    
+
     def __init__(
         self,
         message: str = "资源已存在",
@@ -126,7 +129,7 @@ class AlreadyExists(AppException):
 
 class ValidationError(AppException):
     """数据验证失败异常"""
-    
+
     def __init__(
         self,
         message: str = "数据验证失败",
@@ -142,7 +145,7 @@ class ValidationError(AppException):
 
 class BusinessLogicError(AppException):
     """业务逻辑错误异常"""
-    
+
     def __init__(
         self,
         message: str = "业务逻辑错误",
@@ -160,7 +163,7 @@ class BusinessLogicError(AppException):
 
 class ExternalServiceError(AppException):
     """外部服务错误异常"""
-    
+
     def __init__(
         self,
         message: str = "外部服务错误",
@@ -174,9 +177,43 @@ class ExternalServiceError(AppException):
         )
 
 
+class RateLimitExceeded(AppException):
+    """请求过于频繁异常"""
+
+    def __init__(
+        self,
+        policy: str,
+        retry_after: int,
+        message: str = "请求过于频繁，请稍后再试",
+    ):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            error_code="RATE_LIMIT_EXCEEDED",
+            detail={"policy": policy, "retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class ServiceBusy(AppException):
+    """服务繁忙异常"""
+
+    def __init__(
+        self,
+        message: str = "服务繁忙",
+        detail: Optional[Any] = None,
+    ):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="SERVICE_BUSY",
+            detail=detail,
+        )
+
+
 class AIServiceError(AppException):
     """AI 服务错误异常"""
-    
+
     def __init__(
         self,
         message: str = "AI 服务错误",
@@ -0,0 +1,127 @@
+"""
+异步密码哈希服务
+bcrypt 计算耗时 100ms 以上，放到独立的线程池/进程池中执行，避免阻塞事件循环
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.core.exceptions import ServiceBusy
+from app.core.security import get_password_hash, verify_password
+
+
+def _hash_batch(passwords: List[str]) -> List[str]:
+    """批量生成密码哈希（在工作池中执行）"""
+    return [get_password_hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    密码哈希服务
+
+    - 使用有界队列：排队中 + 执行中的任务超过 max_pending 时直接拒绝（503），
+      避免登录洪峰把请求无限堆积在内存中
+    - 统计执行中任务数、峰值与拒绝次数，用于观察饱和度
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        max_workers: int = 4,
+        max_pending: int = 64,
+    ):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+
+        # 统计
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        """延迟创建工作池"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+            logger.info(
+                f"Password hasher started: {self.executor_type} pool, "
+                f"{self.max_workers} workers"
+            )
+        return self._executor
+
+    async def _run(self, func, *args) -> Any:
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise ServiceBusy("服务繁忙，请稍后重试")
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        """生成密码哈希"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """验证密码"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        批量生成密码哈希
+        按工作线程数切分为若干批次并行执行，每个批次只占用一个队列名额
+        """
+        if not passwords:
+            return []
+
+        chunk_size = max(1, -(-len(passwords) // self.max_workers))
+        chunks = [
+            passwords[i:i + chunk_size]
+            for i in range(0, len(passwords), chunk_size)
+        ]
+        results = await asyncio.gather(*(self._run(_hash_batch, chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def stats(self) -> Dict[str, Any]:
+        """饱和度统计"""
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_pending": self.max_pending,
+            "saturation": self.in_flight / self.max_pending if self.max_pending else 0.0,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """关闭工作池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# 全局密码哈希服务实例
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,45 @@
+"""
+游标分页工具
+游标是对 (排序字段值, id) 的不透明编码，客户端只需原样传回
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from app.core.exceptions import ValidationError
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """将游标值列表编码为 URL 安全的字符串"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    解码游标
+
+    Raises:
+        ValidationError: 游标格式不正确
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor must be a list")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError) as e:
+        raise ValidationError("无效的分页游标", detail=str(e)) from None
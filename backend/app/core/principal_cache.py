@@ -0,0 +1,228 @@
+"""
+认证主体缓存
+按用户 ID 缓存已认证用户的快照，避免 get_current_user 每次请求都查询数据库
+
+两级结构：
+- 进程内 LRU（短 TTL，微秒级命中）
+- Redis（可选，长 TTL，多个 worker 共享）
+
+用户的状态、角色或资料发生变化并提交后，会自动失效对应缓存：本进程副本在提交时立即清除，
+其他 worker 的副本通过缓存失效频道（cache.invalidate 的发布/订阅）清除。
+"""
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import commit_hooks
+from app.core.cache import cache
+from app.models.user import User, UserRole
+
+# 缓存快照中包含的字段（不缓存密码哈希）
+PRINCIPAL_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "phone",
+    "avatar_url",
+    "nickname",
+    "bio",
+    "role",
+    "is_active",
+    "is_verified",
+    "token_version",
+    "created_at",
+    "updated_at",
+    "last_login_at",
+)
+
+# 需要在序列化时转换的时间字段
+_DATETIME_FIELDS = ("created_at", "updated_at", "last_login_at")
+
+
+def _serialize(user: User) -> Dict[str, Any]:
+    """将用户对象转换为可缓存的字典"""
+    data: Dict[str, Any] = {}
+    for field in PRINCIPAL_FIELDS:
+        value = getattr(user, field)
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UserRole):
+            value = value.value
+        data[field] = value
+    return data
+
+
+def _deserialize(data: Dict[str, Any]) -> User:
+    """从缓存字典还原（游离状态的）用户对象"""
+    values = dict(data)
+    values["id"] = uuid.UUID(values["id"])
+    values["role"] = UserRole(values["role"])
+    for field in _DATETIME_FIELDS:
+        if values.get(field):
+            values[field] = datetime.fromisoformat(values[field])
+    return User(**values)
+
+
+class PrincipalCache:
+    """认证主体缓存"""
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        local_ttl: int = 30,
+        redis_ttl: int = 300,
+        redis_enabled: bool = True,
+    ):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.redis_enabled = redis_enabled
+        self._local: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # 命中统计
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    KEY_PREFIX = "auth:principal:"
+
+    @classmethod
+    def _redis_key(cls, user_id: str) -> str:
+        return f"{cls.KEY_PREFIX}{user_id}"
+
+    async def get(self, user_id: str) -> Optional[User]:
+        """获取缓存的用户，未命中返回 None"""
+        user_id = str(user_id)
+
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                self.local_hits += 1
+                return _deserialize(data)
+            self._local.pop(user_id, None)
+
+        if self.redis_enabled:
+            data = await cache.get(self._redis_key(user_id))
+            if data:
+                self._store_local(user_id, data)
+                self.redis_hits += 1
+                return _deserialize(data)
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: User) -> None:
+        """写入缓存"""
+        data = _serialize(user)
+        self._store_local(data["id"], data)
+        if self.redis_enabled:
+            await cache.set(self._redis_key(data["id"]), data, expire=self.redis_ttl)
+
+    async def invalidate(self, user_id: str) -> None:
+        """失效指定用户的缓存，并通知所有 worker 清除进程内副本"""
+        user_id = str(user_id)
+        self._local.pop(user_id, None)
+        await cache.invalidate(self._redis_key(user_id))
+
+    def _on_invalidate(self, keys: Optional[List[str]]) -> None:
+        """缓存失效通知回调"""
+        if keys is None:
+            self._local.clear()
+            return
+        for key in keys:
+            if key.startswith(self.KEY_PREFIX):
+                self._local.pop(key[len(self.KEY_PREFIX):], None)
+
+    def invalidate_local(self, user_id: str) -> None:
+        """仅失效本进程的缓存"""
+        self._local.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        """清空本进程缓存"""
+        self._local.clear()
+
+    def _store_local(self, user_id: str, data: Dict[str, Any]) -> None:
+        self._local[user_id] = (time.monotonic() + self.local_ttl, data)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+# 全局认证主体缓存实例
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PRINCIPAL_CACHE_TTL,
+    redis_enabled=settings.PRINCIPAL_CACHE_REDIS_ENABLED,
+)
+cache.on_invalidate(principal_cache._on_invalidate)
+
+
+# ==================== 缓存失效 ====================
+
+_INFO_KEY = "principal_cache_invalidations"
+
+
+def _changed_users(session: Session) -> Set[str]:
+    """收集本次 flush 中发生变化的用户 ID"""
+    user_ids: Set[str] = set()
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(
+            state.attrs[field].history.has_changes()
+            for field in PRINCIPAL_FIELDS
+            if field in state.attrs
+        ):
+            user_ids.add(str(obj.id))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            user_ids.add(str(obj.id))
+    return user_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_user_changes(session: Session, flush_context, instances) -> None:
+    """flush 前记录需要失效的用户（提交后再失效，避免读到旧数据回填）"""
+    user_ids = _changed_users(session)
+    if user_ids:
+        session.info.setdefault(_INFO_KEY, set()).update(user_ids)
+
+
+def _invalidate_local(user_ids: Set[str]) -> None:
+    """事务提交时立即清除本进程缓存"""
+    for user_id in user_ids:
+        principal_cache.invalidate_local(user_id)
+
+
+async def _invalidate_all(user_ids: Set[str]) -> None:
+    """事务提交后失效 Redis 缓存并通知其他 worker"""
+    await cache.invalidate(*(principal_cache._redis_key(user_id) for user_id in user_ids))
+    logger.debug(f"Principal cache invalidated: {len(user_ids)} user(s)")
+
+
+commit_hooks.on_commit(_INFO_KEY, _invalidate_all, local=_invalidate_local)
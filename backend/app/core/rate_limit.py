@@ -0,0 +1,326 @@
+"""
+请求限流
+基于令牌桶算法的 ASGI 中间件：
+
+- 令牌桶保存在 Redis 中，通过 Lua 脚本原子更新，所有 uvicorn worker 共享同一份配额
+- Redis 不可用时自动降级为进程内令牌桶
+- 按路由匹配策略，其余接口优先按用户计数
+- 登录接口两级计数：中间件按 IP 宽松限流，登录处理函数再按 IP + 账号严格限流（enforce），
+  共用出口 IP 的教室不会因个别账号被整体锁定
+- 仅当请求来自 RATE_LIMIT_TRUSTED_PROXIES 中的代理时才使用 X-Real-IP，客户端无法伪造来源 IP
+"""
+import hashlib
+import ipaddress
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.core.cache import cache
+from app.core.exceptions import RateLimitExceeded
+from app.core.security import decode_token
+
+# 令牌桶 Lua 脚本（使用 Redis 服务器时间，避免各 worker 时钟偏差）
+# KEYS[1]: 桶的键  ARGV[1]: 每秒补充的令牌数  ARGV[2]: 桶容量
+# 返回: {是否放行, 剩余令牌数, 需等待的毫秒数}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+
+class RateLimitPolicy:
+    """限流策略"""
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: int,
+        burst: Optional[int] = None,
+        path_prefix: Optional[str] = None,
+        by_user: bool = True,
+    ):
+        self.name = name
+        self.per_minute = per_minute
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60.0  # 每秒补充的令牌数
+        self.path_prefix = path_prefix
+        self.by_user = by_user
+
+    def matches(self, path: str) -> bool:
+        return self.path_prefix is None or path.startswith(self.path_prefix)
+
+
+class LocalTokenBuckets:
+    """进程内令牌桶（Redis 不可用时的降级方案）"""
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, rate: float, capacity: int) -> Tuple[bool, int, int]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (float(capacity), now))
+        tokens = min(capacity, tokens + (now - ts) * rate)
+
+        allowed = tokens >= 1
+        retry_after_ms = 0
+        if allowed:
+            tokens -= 1
+        else:
+            retry_after_ms = int((1 - tokens) * 1000 / rate) + 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return allowed, int(tokens), retry_after_ms
+
+
+class RateLimiter:
+    """限流器"""
+
+    def __init__(self, policies: List[RateLimitPolicy], default_policy: RateLimitPolicy):
+        # 前缀越长越优先匹配
+        self.policies = sorted(policies, key=lambda p: len(p.path_prefix or ""), reverse=True)
+        self.default_policy = default_policy
+        self.local = LocalTokenBuckets()
+        self._script = None
+        self._script_client = None
+
+        # 统计
+        self.allowed = 0
+        self.limited = 0
+        self.fallbacks = 0
+
+    def policy_for(self, path: str) -> RateLimitPolicy:
+        for policy in self.policies:
+            if policy.matches(path):
+                return policy
+        return self.default_policy
+
+    async def hit(self, policy: RateLimitPolicy, identity: str) -> Tuple[bool, int, int]:
+        """消耗一个令牌，返回 (是否放行, 剩余令牌数, 需等待的毫秒数)"""
+        key = f"ratelimit:{policy.name}:{identity}"
+        result = await self._hit_redis(key, policy)
+        if result is None:
+            self.fallbacks += 1
+            result = self.local.take(key, policy.rate, policy.capacity)
+
+        if result[0]:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return result
+
+    async def _hit_redis(
+        self,
+        key: str,
+        policy: RateLimitPolicy,
+    ) -> Optional[Tuple[bool, int, int]]:
+        redis = cache.redis
+        if redis is None:
+            return None
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+            self._script_client = redis
+        # 熔断期间直接回退到进程内令牌桶
+        result = await cache.guarded(
+            "rate limit",
+            lambda: self._script(keys=[key], args=[policy.rate, policy.capacity]),
+        )
+        if result is None:
+            return None
+        allowed, remaining, retry_after_ms = result
+        return bool(allowed), int(remaining), int(retry_after_ms)
+
+    async def enforce(self, policy: RateLimitPolicy, identity: str) -> None:
+        """消耗一个令牌，超出限制时抛出 RateLimitExceeded（用于路由处理函数内的细粒度限流）"""
+        allowed, _, retry_after_ms = await self.hit(policy, identity)
+        if not allowed:
+            raise RateLimitExceeded(policy.name, retry_after_seconds(retry_after_ms))
+
+    def stats(self) -> Dict[str, int]:
+        """限流统计"""
+        return {
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def retry_after_seconds(retry_after_ms: int) -> int:
+    """Retry-After 响应头取值（向上取整，至少 1 秒）"""
+    return max(1, -(-retry_after_ms // 1000))
+
+
+def _parse_networks(values: List[str]) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    return [ipaddress.ip_network(value, strict=False) for value in values]
+
+
+# 可信反向代理
+TRUSTED_PROXIES = _parse_networks(settings.RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def client_ip(scope: Scope) -> str:
+    """客户端 IP：直连地址为可信代理时取 X-Real-IP，否则取直连地址"""
+    client = scope.get("client")
+    peer = client[0] if client else None
+    if peer and TRUSTED_PROXIES:
+        try:
+            trusted = any(ipaddress.ip_address(peer) in network for network in TRUSTED_PROXIES)
+        except ValueError:
+            trusted = False
+        if trusted:
+            for name, value in scope["headers"]:
+                if name == b"x-real-ip":
+                    return value.decode().strip()
+    return peer or "unknown"
+
+
+def login_identity(scope: Scope, username: str) -> str:
+    """登录限流主体：客户端 IP + 账号（账号取摘要，避免任意长度的输入进入键名）"""
+    account = hashlib.blake2b(username.strip().lower().encode(), digest_size=8).hexdigest()
+    return f"ip:{client_ip(scope)}:account:{account}"
+
+
+def _build_rate_limiter() -> RateLimiter:
+    prefix = settings.API_V1_PREFIX
+    policies = [
+        RateLimitPolicy(
+            "login",
+            settings.RATE_LIMIT_LOGIN_IP_PER_MINUTE,
+            path_prefix=f"{prefix}/auth/login",
+            by_user=False,
+        ),
+        RateLimitPolicy(
+            "ai",
+            settings.RATE_LIMIT_AI_PER_MINUTE,
+            path_prefix=f"{prefix}/ai/",
+        ),
+    ]
+    for index, (path_prefix, per_minute) in enumerate(settings.RATE_LIMIT_ROUTES.items()):
+        policies.append(RateLimitPolicy(f"route{index}", per_minute, path_prefix=path_prefix))
+
+    return RateLimiter(
+        policies=policies,
+        default_policy=RateLimitPolicy("default", settings.RATE_LIMIT_PER_MINUTE),
+    )
+
+
+# 全局限流器实例
+rate_limiter = _build_rate_limiter()
+
+# 登录接口按 IP + 账号的限流策略（由登录处理函数调用 rate_limiter.enforce）
+LOGIN_ACCOUNT_POLICY = RateLimitPolicy("login_account", settings.RATE_LIMIT_LOGIN_PER_MINUTE, by_user=False)
+
+
+class RateLimitMiddleware:
+    """限流中间件（纯 ASGI 实现，避免 BaseHTTPMiddleware 的额外开销）"""
+
+    # 不参与限流的路径
+    EXEMPT_PATHS = ("/health", "/docs", "/redoc", f"{settings.API_V1_PREFIX}/openapi.json")
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(self.EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        policy = self.limiter.policy_for(path)
+        identity = self._identity(scope, headers, policy)
+        allowed, remaining, retry_after_ms = await self.limiter.hit(policy, identity)
+
+        if not allowed:
+            await self._reject(send, policy, retry_after_ms)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-ratelimit-limit", str(policy.per_minute).encode()),
+                    (b"x-ratelimit-remaining", str(remaining).encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def _identity(
+        self,
+        scope: Scope,
+        headers: Dict[bytes, bytes],
+        policy: RateLimitPolicy,
+    ) -> str:
+        """限流主体：已登录用户按用户 ID，否则按客户端 IP"""
+        if policy.by_user:
+            authorization = headers.get(b"authorization", b"")
+            if authorization[:7].lower() == b"bearer ":
+                payload = decode_token(authorization[7:].decode())
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+        return f"ip:{client_ip(scope)}"
+
+    @staticmethod
+    async def _reject(send: Send, policy: RateLimitPolicy, retry_after_ms: int) -> None:
+        retry_after = retry_after_seconds(retry_after_ms)
+        body = json.dumps(
+            {
+                "success": False,
+                "error": {
+                    "code": "RATE_LIMIT_EXCEEDED",
+                    "message": "请求过于频繁，请稍后再试",
+                    "detail": {"policy": policy.name, "retry_after": retry_after},
+                },
+            },
+            ensure_ascii=False,
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                (b"x-ratelimit-limit", str(policy.per_minute).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,221 @@
+"""
+Refresh Token 轮换存储
+每个 Refresh Token 带有 jti（唯一 ID）和 fam（家族 ID，同一次登录轮换出的 Token 属于同一家族），
+状态全部保存在 Redis 中，刷新时无需访问数据库：
+
+- auth:rt:{jti}     -> 家族 ID；使用后置为 "used"
+- auth:rtf:{fam}    -> 家族已吊销标记（检测到重复使用时写入）
+- auth:rtu:{uid}    -> 用户快照（email / role / active / ver），用于签发新的 Access Token
+
+轮换、重复使用检测、退出登录均为单次 O(1) 的 Redis 操作，经 cache.guarded 获得熔断与超时保护。
+"""
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import commit_hooks
+from app.core.cache import cache
+from app.models.user import User
+
+# 轮换脚本
+# KEYS: rt:{旧 jti}, rtf:{fam}, rtu:{uid}, rt:{新 jti}
+# ARGV: fam, Token 中的 ver, 过期毫秒数
+# 返回: {1, email, role, active, ver} 轮换成功
+#       {2}  轮换成功，但用户快照缺失（需回源数据库）
+#       {-1} 家族已吊销  {-2} Token 不存在  {-3} 重复使用（已吊销家族）  {-4} 版本已失效
+ROTATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return {-1}
+end
+
+local state = redis.call('GET', KEYS[1])
+if not state then
+    return {-2}
+end
+if state == 'used' then
+    redis.call('SET', KEYS[2], '1', 'PX', ARGV[3])
+    return {-3}
+end
+
+local record = redis.call('HMGET', KEYS[3], 'email', 'role', 'active', 'ver')
+if record[4] and tonumber(record[4]) > tonumber(ARGV[2]) then
+    return {-4}
+end
+
+redis.call('SET', KEYS[1], 'used', 'KEEPTTL')
+redis.call('SET', KEYS[4], ARGV[1], 'PX', ARGV[3])
+
+if not record[4] then
+    return {2}
+end
+return {1, record[1], record[2], record[3], record[4]}
+"""
+
+_ROTATE_ERRORS = {
+    -1: "Refresh Token 已被吊销，请重新登录",
+    -2: "Refresh Token 已失效，请重新登录",
+    -3: "检测到 Refresh Token 重复使用，已强制下线，请重新登录",
+    -4: "Refresh Token 已失效，请重新登录",
+}
+
+
+class RefreshTokenRejected(Exception):
+    """Refresh Token 校验未通过"""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class RefreshTokenStoreUnavailable(Exception):
+    """Redis 不可用或熔断，无法校验或吊销（调用方应拒绝请求，不能绕过重复使用检测）"""
+
+
+class RefreshTokenStore:
+    """Refresh Token 轮换存储"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_ms = ttl_seconds * 1000
+        self._script = None
+        self._script_client = None
+
+    @staticmethod
+    def new_token_ids(family: Optional[str] = None) -> Dict[str, str]:
+        """生成新的 jti / fam"""
+        return {"jti": uuid.uuid4().hex, "fam": family or uuid.uuid4().hex}
+
+    @staticmethod
+    def _user_record(claims: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "email": claims["email"],
+            "role": claims["role"],
+            "active": int(bool(claims["active"])),
+            "ver": claims["ver"],
+        }
+
+    async def register(self, claims: Dict[str, Any]) -> None:
+        """登记新签发的 Refresh Token（登录时调用），同时写入用户快照"""
+        async def write():
+            async with cache.redis.pipeline(transaction=False) as pipe:
+                pipe.set(f"auth:rt:{claims['jti']}", claims["fam"], px=self.ttl_ms)
+                self._write_user(pipe, claims)
+                await pipe.execute()
+
+        await cache.guarded("refresh token register", write)
+
+    async def save_user(self, claims: Dict[str, Any]) -> None:
+        """写入用户快照"""
+        async def write():
+            async with cache.redis.pipeline(transaction=False) as pipe:
+                self._write_user(pipe, claims)
+                await pipe.execute()
+
+        await cache.guarded("refresh token user record", write)
+
+    def _write_user(self, pipe, claims: Dict[str, Any]) -> None:
+        key = f"auth:rtu:{claims['sub']}"
+        pipe.hset(key, mapping=self._user_record(claims))
+        pipe.pexpire(key, self.ttl_ms)
+
+    async def rotate(
+        self,
+        payload: Dict[str, Any],
+        new_jti: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        轮换 Refresh Token
+
+        Returns:
+            用户快照（email / role / active / ver），快照缺失时返回 None
+
+        Raises:
+            RefreshTokenRejected: Token 已使用、已吊销或版本失效
+            RefreshTokenStoreUnavailable: Redis 不可用或熔断
+        """
+        redis = cache.redis
+        if redis is None:
+            raise RefreshTokenStoreUnavailable()
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(ROTATE_SCRIPT)
+            self._script_client = redis
+
+        result = await cache.guarded(
+            "refresh token rotate",
+            lambda: self._script(
+                keys=[
+                    f"auth:rt:{payload['jti']}",
+                    f"auth:rtf:{payload['fam']}",
+                    f"auth:rtu:{payload['sub']}",
+                    f"auth:rt:{new_jti}",
+                ],
+                args=[payload["fam"], payload.get("ver", 0), self.ttl_ms],
+            ),
+        )
+        if result is None:
+            raise RefreshTokenStoreUnavailable()
+
+        code = int(result[0])
+        if code < 0:
+            if code == -3:
+                logger.warning(
+                    f"Refresh token reuse detected: user={payload['sub']} family={payload['fam']}"
+                )
+            raise RefreshTokenRejected(_ROTATE_ERRORS[code])
+        if code == 2:
+            return None
+
+        email, role, active, ver = result[1:]
+        return {"email": email, "role": role, "active": active == "1", "ver": int(ver)}
+
+    async def revoke_family(self, family: str) -> None:
+        """
+        吊销整个 Token 家族（退出当前设备）
+
+        Raises:
+            RefreshTokenStoreUnavailable: 吊销标记未能写入
+        """
+        revoked = await cache.guarded(
+            "refresh token revoke",
+            lambda: cache.redis.set(f"auth:rtf:{family}", "1", px=self.ttl_ms),
+        )
+        if not revoked:
+            raise RefreshTokenStoreUnavailable()
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """删除用户快照（用户资料或状态变化后，下次刷新时回源数据库）"""
+        await cache.delete(f"auth:rtu:{user_id}")
+
+
+# 全局 Refresh Token 存储实例
+refresh_tokens = RefreshTokenStore(ttl_seconds=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
+# ==================== 用户快照失效 ====================
+
+_INFO_KEY = "refresh_token_user_changes"
+_SNAPSHOT_FIELDS = ("email", "role", "is_active", "token_version")
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    """flush 后记录快照字段发生变化的用户（此时 token_version 已完成递增）"""
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if obj in session.deleted or any(
+            state.attrs[field].history.has_changes() for field in _SNAPSHOT_FIELDS
+        ):
+            session.info.setdefault(_INFO_KEY, set()).add(str(obj.id))
+
+
+async def _invalidate_all(user_ids: Set[str]) -> None:
+    """事务提交后删除用户快照"""
+    for user_id in user_ids:
+        await refresh_tokens.invalidate_user(user_id)
+
+
+commit_hooks.on_commit(_INFO_KEY, _invalidate_all)
@@ -0,0 +1,73 @@
+"""
+错题读接口响应缓存
+缓存键包含用户的错题本版本号：resp:{uid}:{版本号}:{路径与参数摘要}
+任何写入都会更新版本号，旧版本的缓存自然不再命中并随 TTL 过期，失效无需扫描或删除键。
+"""
+import hashlib
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from app.config import settings
+from app.core.cache import cache
+
+
+class ResponseCache:
+    """按错题本版本号缓存的 JSON 响应"""
+
+    def __init__(self, ttl: int, enabled: bool = True):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @staticmethod
+    def _key(user_id, version: str, request: Request) -> str:
+        digest = hashlib.blake2b(
+            f"{request.url.path}|{request.url.query}".encode(),
+            digest_size=12,
+        ).hexdigest()
+        return f"resp:{user_id}:{version}:{digest}"
+
+    async def get(self, name: str, user_id, version: Optional[str], request: Request) -> Optional[Any]:
+        """
+        读取缓存的响应
+
+        Args:
+            name: 接口名（用于命中率统计）
+            version: 错题本版本号，为空（Redis 不可用）时不使用缓存
+        """
+        if not self.enabled or version is None:
+            return None
+        payload = await cache.get(self._key(user_id, version, request))
+        if payload is None:
+            self.misses[name] += 1
+        else:
+            self.hits[name] += 1
+        return payload
+
+    async def set(self, user_id, version: Optional[str], request: Request, payload: Any) -> None:
+        """写入响应缓存"""
+        if not self.enabled or version is None:
+            return
+        await cache.set(self._key(user_id, version, request), payload, expire=self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """各接口命中统计"""
+        result = {}
+        for name in set(self.hits) | set(self.misses):
+            hits, misses = self.hits[name], self.misses[name]
+            result[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses),
+            }
+        return result
+
+
+# 全局响应缓存实例
+response_cache = ResponseCache(
+    ttl=settings.RESPONSE_CACHE_TTL,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
@@ -1,12 +1,16 @@
 """
 安全相关功能：密码加密、JWT Token 生成等
 """
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Any, Dict, Optional
+
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.config import settings
 
+from app.config import settings
 
 # 密码加密上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -28,35 +32,35 @@ def create_access_token(
 ) -> str:
     """
     创建 JWT Access Token
-    
+
     Args:
         data: 要编码的数据（通常包含 user_id, email 等）
         expires_delta: 过期时间（可选）
-    
+
     Returns:
         JWT token 字符串
     """
     to_encode = data.copy()
-    
+
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    
+
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
         "type": "access",
     })
-    
+
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
         algorithm=settings.ALGORITHM,
     )
-    
+
     return encoded_jwt
 
 
@@ -66,55 +70,126 @@ def create_refresh_token(
 ) -> str:
     """
     创建 JWT Refresh Token
-    
+
     Args:
         data: 要编码的数据
         expires_delta: 过期时间（可选）
-    
+
     Returns:
         JWT refresh token 字符串
     """
     to_encode = data.copy()
-    
+
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             days=settings.REFRESH_TOKEN_EXPIRE_DAYS
         )
-    
+
     to_encode.update({
         "exp": expire,
         "iat": datetime.utcnow(),
         "type": "refresh",
     })
-    
+
     encoded_jwt = jwt.encode(
         to_encode,
         settings.SECRET_KEY,
         algorithm=settings.ALGORITHM,
     )
-    
+
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    已验证 Token 的 LRU 缓存
+    同一个 Token 在有效期内只做一次签名校验与 JSON 解析，条目在 exp 时刻过期
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """获取已验证的负载，未命中或已过期返回 None"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """缓存已验证的负载"""
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_size <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (float(exp), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# 已验证 Token 缓存
+token_cache = VerifiedTokenCache(max_size=settings.JWT_CACHE_MAX_SIZE)
+
+
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     解码 JWT Token
-    
+
     Args:
         token: JWT token 字符串
-    
+
     Returns:
         解码后的数据字典，失败返回 None
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
-        return payload
     except JWTError:
         return None
 
+    token_cache.set(token, payload)
+    return dict(payload)
@@ -0,0 +1,220 @@
+"""
+Token 版本登记表（无状态认证模式）
+
+Access Token 中携带用户的 token_version、角色和启用状态，服务端只需在内存中
+比对版本号即可完成鉴权，无需查询数据库。
+
+- 只记录发生过版本变更（禁用、改角色、退出所有设备）的用户，内存占用很小
+- 变更写入 Redis Hash 作为快照，并通过 Pub/Sub 实时广播给所有 worker
+- 定期从快照全量同步，兜底 Pub/Sub 消息丢失
+- 启动时 Redis 不可用不会阻塞启动：后台持续重试订阅与加载；在订阅建立并完成全量同步之前
+  （以及订阅中断期间）ready 为 False，鉴权回退到查询数据库，不信任可能已撤销的 Token
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from redis.asyncio import Redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import commit_hooks
+from app.core.cache import cache
+from app.models.user import User
+
+
+class TokenVersionRegistry:
+    """Token 版本登记表"""
+
+    HASH_KEY = "auth:token_versions"
+    CHANNEL = "auth:token_versions"
+
+    def __init__(self, sync_interval: int = 30, retention: int = 1800):
+        self.sync_interval = sync_interval
+        # 超过 Access Token 有效期的记录不再需要（旧 Token 均已过期）
+        self.retention = retention
+        # user_id -> (最小有效版本, 是否启用, 更新时间)
+        self._versions: Dict[str, Tuple[int, bool, float]] = {}
+        self._redis: Optional[Redis] = None
+        self._tasks: List[asyncio.Task] = []
+        self._ready = False
+
+    # ==================== 生命周期 ====================
+
+    async def start(self) -> None:
+        """在后台订阅变更并加载快照（Redis 不可用时持续重试）"""
+        self._redis = Redis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True,
+            encoding="utf-8",
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        )
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._periodic_sync()),
+        ]
+
+    async def stop(self) -> None:
+        """停止订阅"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._ready = False
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    # ==================== 校验 ====================
+
+    @property
+    def ready(self) -> bool:
+        """订阅已建立且已完成全量同步，is_valid 的结果可信"""
+        return self._ready
+
+    def is_valid(self, user_id: str, version: int) -> bool:
+        """校验 Token 中的版本号是否仍然有效（纯内存操作）"""
+        entry = self._versions.get(str(user_id))
+        if entry is None:
+            return True
+        min_version, is_active, _ = entry
+        return is_active and version >= min_version
+
+    # ==================== 变更 ====================
+
+    async def publish(self, user_id: str, version: int, is_active: bool) -> None:
+        """登记新版本并广播给其他 worker"""
+        user_id = str(user_id)
+        now = time.time()
+        self._apply(user_id, version, is_active, now)
+
+        value = self._encode(version, is_active, now)
+        await cache.execute_many([
+            ("hset", self.HASH_KEY, user_id, value),
+            ("publish", self.CHANNEL, f"{user_id}={value}"),
+        ])
+
+    async def sync(self) -> None:
+        """从 Redis 快照全量同步，并清理过期记录"""
+        if not self._redis:
+            return
+        snapshot = await self._redis.hgetall(self.HASH_KEY)
+        expired_before = time.time() - self.retention
+
+        versions: Dict[str, Tuple[int, bool, float]] = {}
+        expired: List[str] = []
+        for user_id, value in snapshot.items():
+            entry = self._decode(value)
+            if entry is None or entry[2] < expired_before:
+                expired.append(user_id)
+            else:
+                versions[user_id] = entry
+        self._versions = versions
+
+        if expired:
+            await self._redis.hdel(self.HASH_KEY, *expired)
+
+    def _apply(self, user_id: str, version: int, is_active: bool, updated_at: float) -> None:
+        current = self._versions.get(user_id)
+        if current is None or version >= current[0]:
+            self._versions[user_id] = (version, is_active, updated_at)
+
+    @staticmethod
+    def _encode(version: int, is_active: bool, updated_at: float) -> str:
+        return f"{version}:{int(is_active)}:{int(updated_at)}"
+
+    @staticmethod
+    def _decode(value: str) -> Optional[Tuple[int, bool, float]]:
+        try:
+            version, is_active, updated_at = value.split(":")
+            return int(version), is_active == "1", float(updated_at)
+        except ValueError:
+            return None
+
+    async def _listen(self) -> None:
+        """订阅版本变更（断线后指数退避重连，重连后重新全量同步）"""
+        delay = 1
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    # 先订阅再同步：同步期间发布的变更会在之后收到，不会遗漏
+                    await self.sync()
+                    self._ready = True
+                    delay = 1
+                    logger.info(f"✅ Token version registry ready ({len(self._versions)} entries)")
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        user_id, _, value = message["data"].partition("=")
+                        entry = self._decode(value)
+                        if entry:
+                            self._apply(user_id, *entry)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._ready or delay == 1:
+                    logger.error(f"Token version subscription error, falling back to database checks: {e}")
+                self._ready = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def _periodic_sync(self) -> None:
+        """定期全量同步"""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                # 订阅中断期间由 _listen 记录错误并负责重连后的同步
+                if self._ready:
+                    logger.error(f"Token version sync error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """登记表统计"""
+        return {"entries": len(self._versions), "ready": self._ready}
+
+
+# 全局 Token 版本登记表实例
+token_versions = TokenVersionRegistry(
+    sync_interval=settings.AUTH_VERSION_SYNC_INTERVAL,
+    retention=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+# ==================== 自动递增版本 ====================
+
+_INFO_KEY = "token_version_changes"
+
+@event.listens_for(Session, "before_flush")
+def _bump_token_versions(session: Session, flush_context, instances) -> None:
+    """用户被禁用或角色变更时递增 token_version，使已签发的 Token 失效"""
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        status_changed = (
+            state.attrs.is_active.history.has_changes()
+            or state.attrs.role.history.has_changes()
+        )
+        version_changed = state.attrs.token_version.history.has_changes()
+        if not (status_changed or version_changed):
+            continue
+        if not version_changed:
+            obj.token_version = (obj.token_version or 0) + 1
+        session.info.setdefault(_INFO_KEY, {})[str(obj.id)] = (
+            obj.token_version,
+            obj.is_active,
+        )
+
+
+async def _publish_all(changes: Dict[str, Tuple[int, bool]]) -> None:
+    """事务提交后广播版本变更"""
+    for user_id, (version, is_active) in changes.items():
+        await token_versions.publish(user_id, version, is_active)
+
+
+commit_hooks.on_commit(_INFO_KEY, _publish_all)
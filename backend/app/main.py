@@ -1,19 +1,30 @@
 """
 FastAPI 应用主入口
 """
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
+
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.exceptions import RequestValidationError
 from loguru import logger
-import time
 
+from app.api.v1 import ai, auth, errors, knowledge, practice, reports, users
+from app.api.v1.auth import require_roles
 from app.config import settings
-from app.core.database import engine, Base
+from app.core.cache import cache
+from app.core.cached import cached_metrics
+from app.core.database import Base, engine, replicas
 from app.core.exceptions import AppException
-from app.api.v1 import auth, errors, ai, knowledge, practice, reports
+from app.core.hashing import password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.response_cache import response_cache
+from app.core.security import token_cache
+from app.core.token_versions import token_versions
+from app.models.user import UserRole
 
 
 @asynccontextmanager
@@ -23,18 +34,32 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Smart Error Book API...")
     logger.info(f"Environment: {settings.APP_ENV}")
     logger.info(f"Debug Mode: {settings.DEBUG}")
-    
+
     # 初始化数据库表（生产环境使用 Alembic）
     if settings.is_development:
         async with engine.begin() as conn:
             # await conn.run_sync(Base.metadata.drop_all)  # 谨慎使用
             await conn.run_sync(Base.metadata.create_all)
         logger.info("✅ Database tables created")
-    
+
+    # 连接 Redis（连接失败时熔断降级，Redis 恢复后自动恢复）
+    await cache.connect()
+
+    # 只读副本健康检查（读己之写依赖 Redis，需在连接 Redis 之后启动）
+    await replicas.start()
+
+    # 无状态认证模式下订阅 Token 版本变更
+    if settings.AUTH_STATELESS_ENABLED:
+        await token_versions.start()
+
     yield
-    
+
     # 关闭时执行
     logger.info("🛑 Shutting down Smart Error Book API...")
+    await token_versions.stop()
+    await replicas.stop()
+    await cache.close()
+    password_hasher.shutdown()
     await engine.dispose()
 
 
@@ -52,6 +77,10 @@ app = FastAPI(
 
 # ==================== 中间件配置 ====================
 
+# 限流中间件（位于 CORS 之内，429 响应同样带有 CORS 头）
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS 中间件
 app.add_middleware(
     CORSMiddleware,
@@ -70,23 +99,23 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 async def log_requests(request: Request, call_next):
     """记录所有请求"""
     start_time = time.time()
-    
+
     # 记录请求
     logger.info(f"➡️  {request.method} {request.url.path}")
-    
+
     # 处理请求
     response = await call_next(request)
-    
+
     # 计算耗时
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
-    
+
     # 记录响应
     logger.info(
         f"⬅️  {request.method} {request.url.path} "
         f"- Status: {response.status_code} - Time: {process_time:.3f}s"
     )
-    
+
     return response
 
 
@@ -106,6 +135,7 @@ async def app_exception_handler(request: Request, exc: AppException):
                 "detail": exc.detail,
             }
         },
+        headers=exc.headers,
     )
 
 
@@ -157,6 +187,27 @@ async def health_check():
     }
 
 
+# 缓存命中统计
+@app.get("/health/cache", tags=["Health"])
+async def cache_stats(_=Depends(require_roles(UserRole.ADMIN))):
+    """缓存命中统计与 Redis 熔断器状态（管理员）"""
+    return {
+        "response_cache": response_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "two_tier_cache": cache.local_stats(),
+        "cached": cached_metrics.stats(),
+        "redis_breaker": cache.breaker_stats(),
+    }
+
+
+# 只读副本状态
+@app.get("/health/database", tags=["Health"])
+async def database_stats(_=Depends(require_roles(UserRole.ADMIN))):
+    """只读副本健康状态与读请求分配统计（管理员）"""
+    return replicas.stats()
+
+
 # API 根路径
 @app.get("/", tags=["Root"])
 async def root():
@@ -175,6 +226,12 @@ app.include_router(
     tags=["Authentication"],
 )
 
+app.include_router(
+    users.router,
+    prefix=f"{settings.API_V1_PREFIX}/users",
+    tags=["Users"],
+)
+
 app.include_router(
     errors.router,
     prefix=f"{settings.API_V1_PREFIX}/errors",
@@ -208,7 +265,7 @@ app.include_router(
 
 if __name__ == "__main__":
     import uvicorn
-    
+
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
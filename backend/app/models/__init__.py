@@ -1,11 +1,12 @@
 """
 数据库模型模块
 """
-from app.models.user import User, UserRole
-from app.models.error_question import ErrorQuestion, DifficultyLevel, ErrorType
-from app.models.knowledge_point import KnowledgePoint, QuestionKnowledgeMapping
 from app.models.ai_analysis import AIAnalysis
+from app.models.error_question import DifficultyLevel, ErrorQuestion, ErrorType
+from app.models.knowledge_point import KnowledgePoint, QuestionKnowledgeMapping
 from app.models.practice_record import PracticeRecord
+from app.models.question_counter import UserQuestionCounter
+from app.models.user import User, UserRole
 
 __all__ = [
     "User",
@@ -17,5 +18,6 @@ __all__ = [
     "QuestionKnowledgeMapping",
     "AIAnalysis",
     "PracticeRecord",
+    "UserQuestionCounter",
 ]
 
@@ -1,13 +1,15 @@
 """
 错题模型
 """
+import enum
 import uuid
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import String, Text, Integer, Float, DateTime, ForeignKey, Enum as SQLEnum
+
+from sqlalchemy import Computed, DateTime, Float, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
-import enum
 
 from app.core.database import Base
 
@@ -28,10 +30,90 @@ class ErrorType(str, enum.Enum):
     OTHER = "other"  # 其他
 
 
+def _search_document(column: str, weight: str) -> str:
+    """
+    单列的全文检索文档表达式
+    内置的 simple 分词器不切分中文，这里先在每个汉字两侧补空格，使每个汉字成为一个词元，
+    查询时再把连续汉字组合成短语（<->）匹配
+    """
+    return (
+        f"setweight(to_tsvector('simple', regexp_replace(coalesce({column}, ''), "
+        f"'([\\u3400-\\u9fff\\uf900-\\ufaff])', ' \\1 ', 'g')), '{weight}')"
+    )
+
+
+# 全文检索向量：题目（A）> 解析（B）> 章节（C）
+SEARCH_VECTOR_EXPRESSION = " || ".join([
+    _search_document("question_text", "A"),
+    _search_document("explanation", "B"),
+    _search_document("chapter", "C"),
+])
+
+
 class ErrorQuestion(Base):
     """错题表"""
     __tablename__ = "error_questions"
-    
+
+    # 所有查询均为 user_id = ? AND <筛选> ORDER BY <排序字段>, id
+    # 复合索引覆盖 筛选 + 排序，使 Postgres 直接按索引顺序扫描，无需额外排序：
+    # - 无筛选、学科、难度、错误类型、未归档 / 已收藏（部分索引）与三个排序字段的全部组合
+    # - 标签、已归档 / 未收藏以及多个筛选条件组合时，按其中一个索引的顺序扫描，其余条件逐行过滤
+    # 查询计划由 app/tests/test_query_plans.py 校验（需要 TEST_DATABASE_URL）
+    __table_args__ = (
+        # 按排序字段
+        Index("ix_error_questions_user_created", "user_id", "created_at", "id"),
+        Index("ix_error_questions_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_error_questions_user_mastery", "user_id", "mastery_level", "id"),
+        # 学科 + 各排序字段
+        Index("ix_error_questions_user_subject_created", "user_id", "subject", "created_at", "id"),
+        Index("ix_error_questions_user_subject_updated", "user_id", "subject", "updated_at", "id"),
+        Index("ix_error_questions_user_subject_mastery", "user_id", "subject", "mastery_level", "id"),
+        # 难度 + 各排序字段
+        Index("ix_error_questions_user_difficulty_created", "user_id", "difficulty", "created_at", "id"),
+        Index("ix_error_questions_user_difficulty_updated", "user_id", "difficulty", "updated_at", "id"),
+        Index("ix_error_questions_user_difficulty_mastery", "user_id", "difficulty", "mastery_level", "id"),
+        # 错误类型 + 各排序字段
+        Index("ix_error_questions_user_error_type_created", "user_id", "error_type", "created_at", "id"),
+        Index("ix_error_questions_user_error_type_updated", "user_id", "error_type", "updated_at", "id"),
+        Index("ix_error_questions_user_error_type_mastery", "user_id", "error_type", "mastery_level", "id"),
+        # 部分索引：未归档 + 各排序字段
+        Index(
+            "ix_error_questions_user_active_created",
+            "user_id", "created_at", "id",
+            postgresql_where=text("is_archived = false"),
+        ),
+        Index(
+            "ix_error_questions_user_active_updated",
+            "user_id", "updated_at", "id",
+            postgresql_where=text("is_archived = false"),
+        ),
+        Index(
+            "ix_error_questions_user_active_mastery",
+            "user_id", "mastery_level", "id",
+            postgresql_where=text("is_archived = false"),
+        ),
+        # 部分索引：已收藏 + 各排序字段
+        Index(
+            "ix_error_questions_user_favorite_created",
+            "user_id", "created_at", "id",
+            postgresql_where=text("is_favorite = true"),
+        ),
+        Index(
+            "ix_error_questions_user_favorite_updated",
+            "user_id", "updated_at", "id",
+            postgresql_where=text("is_favorite = true"),
+        ),
+        Index(
+            "ix_error_questions_user_favorite_mastery",
+            "user_id", "mastery_level", "id",
+            postgresql_where=text("is_favorite = true"),
+        ),
+        # 标签：GIN 索引支持 && (任一) 与 @> (全部) 查询
+        Index("ix_error_questions_tags", "tags", postgresql_using="gin"),
+        # 全文检索
+        Index("ix_error_questions_search", "search_vector", postgresql_using="gin"),
+    )
+
     # 主键
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -39,81 +121,88 @@ class ErrorQuestion(Base):
         default=uuid.uuid4,
         index=True,
     )
-    
+
     # 用户关联
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
-        index=True,
     )
-    
+
     # 题目基本信息
-    subject: Mapped[str] = mapped_column(String(50), index=True)  # 学科
+    subject: Mapped[str] = mapped_column(String(50))  # 学科
     chapter: Mapped[str | None] = mapped_column(String(100), nullable=True)  # 章节
     question_text: Mapped[str | None] = mapped_column(Text, nullable=True)  # 题目文本
     question_image_url: Mapped[str | None] = mapped_column(Text, nullable=True)  # 题目图片
-    
+
     # 答案信息
     correct_answer: Mapped[str | None] = mapped_column(Text, nullable=True)  # 正确答案
     user_answer: Mapped[str | None] = mapped_column(Text, nullable=True)  # 用户答案
     explanation: Mapped[str | None] = mapped_column(Text, nullable=True)  # 解析
-    
+
     # 分类与标签
     difficulty: Mapped[DifficultyLevel] = mapped_column(
         SQLEnum(DifficultyLevel),
         default=DifficultyLevel.MEDIUM,
-        index=True,
     )
     error_type: Mapped[ErrorType] = mapped_column(
         SQLEnum(ErrorType),
         default=ErrorType.OTHER,
-        index=True,
     )
-    tags: Mapped[str | None] = mapped_column(String(500), nullable=True)  # JSON数组字符串
-    
+    tags: Mapped[List[str]] = mapped_column(
+        ARRAY(String(50)),
+        default=list,
+        server_default="{}",
+    )  # 标签数组
+
+    # 全文检索向量（数据库生成列，默认不加载）
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        deferred=True,
+    )
+
     # 学习数据
     review_count: Mapped[int] = mapped_column(Integer, default=0)  # 复习次数
     mastery_level: Mapped[float] = mapped_column(Float, default=0.0)  # 掌握程度 0-1
     last_reviewed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     next_review_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    
+
     # 状态
     is_archived: Mapped[bool] = mapped_column(default=False)  # 是否归档
     is_favorite: Mapped[bool] = mapped_column(default=False)  # 是否收藏
-    
+
     # 时间戳
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
-        index=True,
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
     )
-    
+
     # 关系
     user: Mapped["User"] = relationship("User", back_populates="error_questions")
-    
+
     ai_analyses: Mapped[List["AIAnalysis"]] = relationship(
         "AIAnalysis",
         back_populates="error_question",
         cascade="all, delete-orphan",
     )
-    
+
     knowledge_mappings: Mapped[List["QuestionKnowledgeMapping"]] = relationship(
         "QuestionKnowledgeMapping",
         back_populates="error_question",
         cascade="all, delete-orphan",
     )
-    
+
     practice_records: Mapped[List["PracticeRecord"]] = relationship(
         "PracticeRecord",
         back_populates="error_question",
         cascade="all, delete-orphan",
     )
-    
+
     def __repr__(self) -> str:
         return f"<ErrorQuestion {self.id} - {self.subject}>"
 
@@ -0,0 +1,30 @@
+"""
+错题计数模型
+按用户、维度维护错题数量，避免列表与统计接口反复执行 COUNT(*)
+"""
+import uuid
+
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class UserQuestionCounter(Base):
+    """用户错题计数表"""
+    __tablename__ = "user_question_counters"
+
+    # 复合主键：用户 + 维度 + 取值
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)  # total, subject, difficulty ...
+    value: Mapped[str] = mapped_column(String(50), primary_key=True)  # 维度取值，total 维度为空字符串
+
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __repr__(self) -> str:
+        return f"<UserQuestionCounter U:{self.user_id} {self.dimension}={self.value}: {self.count}>"
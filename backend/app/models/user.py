@@ -1,13 +1,15 @@
 """
 用户模型
 """
+import enum
 import uuid
 from datetime import datetime
 from typing import List
-from sqlalchemy import String, DateTime, Enum as SQLEnum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
-import enum
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
@@ -22,7 +24,7 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """用户表"""
     __tablename__ = "users"
-    
+
     # 主键
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -30,18 +32,18 @@ class User(Base):
         default=uuid.uuid4,
         index=True,
     )
-    
+
     # 基本信息
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
     email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     phone: Mapped[str | None] = mapped_column(String(20), unique=True, nullable=True)
     password_hash: Mapped[str] = mapped_column(String(255))
-    
+
     # 个人信息
     avatar_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     nickname: Mapped[str | None] = mapped_column(String(50), nullable=True)
     bio: Mapped[str | None] = mapped_column(String(500), nullable=True)
-    
+
     # 角色与状态
     role: Mapped[UserRole] = mapped_column(
         SQLEnum(UserRole),
@@ -50,7 +52,10 @@ class User(Base):
     )
     is_active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
-    
+
+    # Token 版本（递增后该用户已签发的 Token 全部失效）
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # 时间戳
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
@@ -66,20 +71,20 @@ class User(Base):
         DateTime,
         nullable=True,
     )
-    
+
     # 关系
     error_questions: Mapped[List["ErrorQuestion"]] = relationship(
         "ErrorQuestion",
         back_populates="user",
         cascade="all, delete-orphan",
     )
-    
+
     practice_records: Mapped[List["PracticeRecord"]] = relationship(
         "PracticeRecord",
         back_populates="user",
         cascade="all, delete-orphan",
     )
-    
+
     def __repr__(self) -> str:
         return f"<User {self.username}>"
 
@@ -1,9 +1,9 @@
 """
 通用 Schema 定义
 """
-from typing import TypeVar, Generic, Optional, Any
-from pydantic import BaseModel
+from typing import Any, Generic, Optional, TypeVar
 
+from pydantic import BaseModel
 
 DataT = TypeVar("DataT")
 
@@ -19,11 +19,11 @@ class PaginationParams(BaseModel):
     """分页参数"""
     page: int = 1
     page_size: int = 20
-    
+
     @property
     def skip(self) -> int:
         return (self.page - 1) * self.page_size
-    
+
     @property
     def limit(self) -> int:
         return self.page_size
@@ -36,7 +36,7 @@ class PaginatedResponse(BaseModel, Generic[DataT]):
     page: int
     page_size: int
     total_pages: int
-    
+
     @classmethod
     def create(
         cls,
@@ -54,3 +54,11 @@ class PaginatedResponse(BaseModel, Generic[DataT]):
             total_pages=(total + page_size - 1) // page_size,
         )
 
+
+
+class CursorPage(BaseModel, Generic[DataT]):
+    """游标分页响应模型"""
+    items: list[DataT]
+    next_cursor: Optional[str] = None  # 为空表示没有更多数据
+    has_more: bool = False
+    total: Optional[int] = None  # 仅在请求时返回
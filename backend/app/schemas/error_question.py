@@ -2,10 +2,15 @@
 错题相关 Schema
 """
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
 from app.models.error_question import DifficultyLevel, ErrorType
 
+Tag = Annotated[str, Field(max_length=50)]
+
 
 class ErrorQuestionBase(BaseModel):
     """错题基础模型"""
@@ -18,7 +23,7 @@ class ErrorQuestionBase(BaseModel):
     explanation: Optional[str] = Field(None, description="解析")
     difficulty: DifficultyLevel = DifficultyLevel.MEDIUM
     error_type: ErrorType = ErrorType.OTHER
-    tags: Optional[List[str]] = Field(None, description="标签列表")
+    tags: Optional[List[Tag]] = Field(None, description="标签列表")
 
 
 class ErrorQuestionCreate(ErrorQuestionBase):
@@ -37,7 +42,7 @@ class ErrorQuestionUpdate(BaseModel):
     explanation: Optional[str] = None
     difficulty: Optional[DifficultyLevel] = None
     error_type: Optional[ErrorType] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
     is_favorite: Optional[bool] = None
     is_archived: Optional[bool] = None
 
@@ -45,7 +50,7 @@ class ErrorQuestionUpdate(BaseModel):
 class ErrorQuestionResponse(ErrorQuestionBase):
     """错题响应模型"""
     model_config = ConfigDict(from_attributes=True)
-    
+
     id: str
     user_id: str
     review_count: int
@@ -57,6 +62,133 @@ class ErrorQuestionResponse(ErrorQuestionBase):
     created_at: datetime
     updated_at: datetime
 
+    @field_validator("id", "user_id", mode="before")
+    @classmethod
+    def stringify_uuid(cls, v):
+        """UUID 转为字符串"""
+        return str(v) if v is not None else v
+
+
+class ErrorQuestionProjection(BaseModel):
+    """错题投影响应模型（列表接口指定 fields / view 时返回，只包含所请求的字段，id 始终包含）"""
+    id: str
+    user_id: Optional[str] = None
+    subject: Optional[str] = None
+    chapter: Optional[str] = None
+    question_text: Optional[str] = None
+    question_image_url: Optional[str] = None
+    correct_answer: Optional[str] = None
+    user_answer: Optional[str] = None
+    explanation: Optional[str] = None
+    difficulty: Optional[DifficultyLevel] = None
+    error_type: Optional[ErrorType] = None
+    tags: Optional[List[Tag]] = None
+    review_count: Optional[int] = None
+    mastery_level: Optional[float] = None
+    last_reviewed_at: Optional[datetime] = None
+    next_review_at: Optional[datetime] = None
+    is_archived: Optional[bool] = None
+    is_favorite: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ErrorQuestionBatchCreate(BaseModel):
+    """批量创建错题（逐条校验，单条不合法不影响其他条目）"""
+    items: List[Dict[str, Any]] = Field(..., min_length=1, description="错题列表，字段同创建错题")
+
+
+class ErrorQuestionBatchUpdateItem(BaseModel):
+    """批量更新的单条修改"""
+    id: UUID
+    changes: ErrorQuestionUpdate
+
+
+class ErrorQuestionBatchUpdate(BaseModel):
+    """
+    批量更新错题（归档即 is_archived=true），两种写法二选一：
+    - items：逐条指定 {id, changes}，相同的修改合并为一条语句
+    - ids + changes：同一组修改应用到全部 ID
+    """
+    items: Optional[List[ErrorQuestionBatchUpdateItem]] = Field(None, min_length=1)
+    ids: Optional[List[UUID]] = Field(None, min_length=1)
+    changes: Optional[ErrorQuestionUpdate] = None
+
+    @model_validator(mode="after")
+    def check_form(self):
+        """items 与 ids + changes 只能且必须提供一种"""
+        if self.items is not None:
+            if self.ids is not None or self.changes is not None:
+                raise ValueError("items 与 ids / changes 不能同时提供")
+        elif self.ids is None or self.changes is None:
+            raise ValueError("需要提供 items，或同时提供 ids 与 changes")
+        return self
+
+    def change_sets(self) -> List[Tuple[UUID, Dict[str, Any]]]:
+        """按请求顺序返回 (错题 ID, 需要更新的字段)"""
+        if self.items is not None:
+            return [(item.id, item.changes.model_dump(exclude_unset=True)) for item in self.items]
+        changes = self.changes.model_dump(exclude_unset=True)
+        return [(question_id, changes) for question_id in self.ids]
+
+
+class ErrorQuestionBatchDelete(BaseModel):
+    """批量删除错题"""
+    ids: List[UUID] = Field(..., min_length=1)
+
+
+class ErrorQuestionBatchItemResult(BaseModel):
+    """批量操作的单条结果"""
+    index: int  # 在请求列表中的位置（从 0 开始）
+    id: Optional[str] = None
+    status: str  # created, updated, deleted, not_found, error
+    message: Optional[str] = None
+    data: Optional[ErrorQuestionResponse] = None
+
+
+class ErrorQuestionBatchResult(BaseModel):
+    """批量操作结果"""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[ErrorQuestionBatchItemResult]
+
+
+class ErrorQuestionImportError(BaseModel):
+    """导入失败的行"""
+    row: int  # 行号（CSV 不含表头，从 1 开始）
+    message: str
+
+
+class ErrorQuestionImportJob(BaseModel):
+    """错题导入任务状态"""
+    job_id: str
+    status: str  # pending, running, completed, failed
+    format: str
+    filename: Optional[str] = None
+    size: int = 0  # 文件字节数
+    processed: int = 0  # 已处理行数
+    imported: int = 0  # 成功写入行数
+    failed: int = 0  # 校验失败行数
+    errors: List[ErrorQuestionImportError] = []  # 错误明细（仅保留前若干条）
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class ErrorQuestionSearchHit(BaseModel):
+    """全文检索结果"""
+    question: ErrorQuestionResponse
+    rank: float  # 相关度
+    highlights: Dict[str, str] = {}  # 字段 -> 高亮片段（命中词以 <mark> 包裹）
+
+
+class TagCount(BaseModel):
+    """标签统计"""
+    tag: str
+    count: int
+
 
 class ErrorQuestionFilter(BaseModel):
     """错题筛选模型"""
@@ -67,7 +199,7 @@ class ErrorQuestionFilter(BaseModel):
     is_favorite: Optional[bool] = None
     is_archived: Optional[bool] = None
     tags: Optional[List[str]] = None
-    
+
     # 排序
     sort_by: str = "created_at"  # created_at, updated_at, mastery_level
     sort_order: str = "desc"  # asc, desc
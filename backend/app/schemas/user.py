@@ -2,8 +2,10 @@
 用户相关 Schema
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+
 from app.models.user import UserRole
 
 
@@ -18,6 +20,31 @@ class UserCreate(UserBase):
     password: str = Field(..., min_length=6, max_length=50)
 
 
+class UserProvisionRow(UserCreate):
+    """批量开通账号的单行数据"""
+    role: UserRole = UserRole.STUDENT
+    nickname: Optional[str] = Field(None, max_length=50)
+
+
+class UserProvisionRowResult(BaseModel):
+    """批量开通账号的单行结果"""
+    row: int  # 行号（从 1 开始，不含表头）
+    username: Optional[str] = None
+    email: Optional[str] = None
+    status: str  # created, skipped, error
+    message: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+class UserProvisionResult(BaseModel):
+    """批量开通账号结果"""
+    total: int
+    created: int
+    skipped: int
+    failed: int
+    results: List[UserProvisionRowResult]
+
+
 class UserLogin(BaseModel):
     """用户登录模型"""
     username_or_email: str
@@ -34,7 +61,7 @@ class UserUpdate(BaseModel):
 class UserResponse(UserBase):
     """用户响应模型"""
     model_config = ConfigDict(from_attributes=True)
-    
+
     id: str
     nickname: Optional[str] = None
     bio: Optional[str] = None
@@ -45,6 +72,12 @@ class UserResponse(UserBase):
     created_at: datetime
     last_login_at: Optional[datetime] = None
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_uuid(cls, v):
+        """UUID 转为字符串"""
+        return str(v) if v is not None else v
+
 
 class TokenResponse(BaseModel):
     """Token 响应模型"""
@@ -0,0 +1,3 @@
+"""
+业务逻辑模块
+"""
@@ -0,0 +1,322 @@
+"""
+错题批量写入
+以单条多行 INSERT / UPDATE ... FROM / DELETE ... RETURNING 完成批量变更（批量更新按修改内容分组，每组一条），
+并在同一事务中维护错题计数。
+
+insert_questions / update_questions / delete_questions 不提交事务，由调用方决定提交时机；
+create_batch / update_batch / delete_batch 供批量接口使用，逐条返回结果并提交。
+"""
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.book_version import book_versions
+from app.core.exceptions import ValidationError as AppValidationError
+from app.models.error_question import ErrorQuestion
+from app.schemas.error_question import (
+    ErrorQuestionBatchItemResult,
+    ErrorQuestionBatchResult,
+    ErrorQuestionCreate,
+    ErrorQuestionResponse,
+)
+from app.services import question_counters
+from app.services.question_counters import COUNTER_DIMENSIONS
+
+# RETURNING 返回的完整列（不含全文检索向量）
+QUESTION_COLUMNS = tuple(c for c in ErrorQuestion.__table__.c if c.name != "search_vector")
+
+
+def normalize_tags(tags) -> List[str]:
+    """去除空白与重复标签，保持原有顺序"""
+    if not tags:
+        return []
+    return list(dict.fromkeys(tag.strip() for tag in tags if tag and tag.strip()))
+
+
+def question_values(user_id, data: ErrorQuestionCreate) -> Dict[str, Any]:
+    """由创建模型生成插入行"""
+    now = datetime.utcnow()
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "subject": data.subject,
+        "chapter": data.chapter,
+        "question_text": data.question_text,
+        "question_image_url": data.question_image_url,
+        "correct_answer": data.correct_answer,
+        "user_answer": data.user_answer,
+        "explanation": data.explanation,
+        "difficulty": data.difficulty,
+        "error_type": data.error_type,
+        "tags": normalize_tags(data.tags),
+        "review_count": 0,
+        "mastery_level": 0.0,
+        "is_archived": False,
+        "is_favorite": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def update_values(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """将更新模型的字段转换为列值"""
+    values = dict(changes)
+    if "tags" in values:
+        values["tags"] = normalize_tags(values["tags"])
+    return values
+
+
+async def insert_questions(
+    db: AsyncSession,
+    user_id,
+    items: Sequence[ErrorQuestionCreate],
+) -> List[RowMapping]:
+    """多行 INSERT ... RETURNING，按 items 的顺序返回插入后的完整行"""
+    if not items:
+        return []
+
+    rows = [question_values(user_id, item) for item in items]
+    result = await db.execute(
+        pg_insert(ErrorQuestion).values(rows).returning(*QUESTION_COLUMNS)
+    )
+    # RETURNING 不保证与 VALUES 同序，按客户端生成的 ID 对应
+    returned = {row["id"]: row for row in result.mappings()}
+    inserted = [returned[row["id"]] for row in rows]
+    book_versions.mark_changed(db, user_id)
+
+    deltas: Counter = Counter()
+    for row in inserted:
+        deltas.update(question_counters.question_deltas(None, row))
+    await question_counters.apply_deltas(db, user_id, deltas)
+    return inserted
+
+
+async def update_questions(
+    db: AsyncSession,
+    user_id,
+    ids: Sequence[uuid.UUID],
+    changes: Dict[str, Any],
+) -> List[RowMapping]:
+    """
+    单条 UPDATE ... FROM ... RETURNING 批量更新（限定当前用户）
+    FROM 子查询锁定并读取旧的维度取值，用于计算计数增量
+
+    Returns:
+        更新后的完整行（不属于该用户或不存在的 ID 不会出现在结果中）
+    """
+    if not ids:
+        return []
+
+    old = (
+        select(ErrorQuestion.id, *[getattr(ErrorQuestion, d) for d in COUNTER_DIMENSIONS])
+        .where(ErrorQuestion.id.in_(ids), ErrorQuestion.user_id == user_id)
+        .with_for_update()
+        .subquery("old")
+    )
+    result = await db.execute(
+        update(ErrorQuestion)
+        .where(ErrorQuestion.id == old.c.id)
+        .values(**update_values(changes))
+        .returning(
+            *QUESTION_COLUMNS,
+            *[old.c[d].label(f"old_{d}") for d in COUNTER_DIMENSIONS],
+        )
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.mappings().all()
+    if updated:
+        book_versions.mark_changed(db, user_id)
+
+    deltas: Counter = Counter()
+    for row in updated:
+        before = {d: row[f"old_{d}"] for d in COUNTER_DIMENSIONS}
+        deltas.update(question_counters.question_deltas(before, row))
+    await question_counters.apply_deltas(db, user_id, deltas)
+    return updated
+
+
+async def delete_questions(
+    db: AsyncSession,
+    user_id,
+    ids: Sequence[uuid.UUID],
+) -> List[RowMapping]:
+    """
+    单条 DELETE ... RETURNING 批量删除（限定当前用户）
+
+    Returns:
+        被删除的行（仅包含 id 与计数维度）
+    """
+    if not ids:
+        return []
+
+    result = await db.execute(
+        delete(ErrorQuestion)
+        .where(ErrorQuestion.id.in_(ids), ErrorQuestion.user_id == user_id)
+        .returning(ErrorQuestion.id, *[getattr(ErrorQuestion, d) for d in COUNTER_DIMENSIONS])
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.mappings().all()
+    if deleted:
+        book_versions.mark_changed(db, user_id)
+
+    deltas: Counter = Counter()
+    for row in deleted:
+        deltas.update(question_counters.question_deltas(row, None))
+    await question_counters.apply_deltas(db, user_id, deltas)
+    return deleted
+
+
+# ==================== 批量接口 ====================
+
+def _check_batch_size(size: int) -> None:
+    if size > settings.ERROR_BATCH_MAX_ITEMS:
+        raise AppValidationError(
+            f"单次最多操作 {settings.ERROR_BATCH_MAX_ITEMS} 道错题",
+            detail={"items": size},
+        )
+
+
+def validation_message(error: ValidationError) -> str:
+    """将 pydantic 校验错误合并为一行说明"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def _batch_result(results: List[ErrorQuestionBatchItemResult], success: str) -> ErrorQuestionBatchResult:
+    succeeded = sum(1 for r in results if r.status == success)
+    return ErrorQuestionBatchResult(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+async def create_batch(
+    db: AsyncSession,
+    user_id,
+    records: List[Dict[str, Any]],
+) -> ErrorQuestionBatchResult:
+    """批量创建错题：逐条校验，合法条目以一条多行 INSERT 写入"""
+    _check_batch_size(len(records))
+
+    results: List[ErrorQuestionBatchItemResult] = []
+    valid: List[ErrorQuestionCreate] = []
+    for index, record in enumerate(records):
+        try:
+            valid.append(ErrorQuestionCreate.model_validate(record))
+            results.append(ErrorQuestionBatchItemResult(index=index, status="created"))
+        except ValidationError as e:
+            results.append(
+                ErrorQuestionBatchItemResult(index=index, status="error", message=validation_message(e))
+            )
+
+    inserted = await insert_questions(db, user_id, valid)
+    await db.commit()
+
+    rows = iter(inserted)  # 与 valid 同序
+    for result in results:
+        if result.status == "created":
+            row = next(rows)
+            result.id = str(row["id"])
+            result.data = ErrorQuestionResponse.model_validate(dict(row))
+    return _batch_result(results, "created")
+
+
+def _change_set_key(changes: Dict[str, Any]) -> str:
+    """修改内容的规范化表示，用于合并相同的修改"""
+    return json.dumps(changes, sort_keys=True, default=str)
+
+
+async def update_batch(
+    db: AsyncSession,
+    user_id,
+    items: List[Tuple[uuid.UUID, Dict[str, Any]]],
+) -> ErrorQuestionBatchResult:
+    """
+    批量更新错题（含收藏、归档）：相同的修改合并为一条 UPDATE，全部在一个事务中提交
+
+    Args:
+        items: 按请求顺序的 (错题 ID, 需要更新的字段)
+
+    不存在或不属于当前用户的 ID 标记为 not_found；没有修改字段、或同一 ID 出现多次且修改不同的条目标记为 error
+    """
+    _check_batch_size(len(items))
+
+    # 修改内容 -> 错题 ID；同一 ID 以第一次出现的修改为准
+    groups: Dict[str, Tuple[Dict[str, Any], List[uuid.UUID]]] = {}
+    first_key: Dict[uuid.UUID, str] = {}
+    errors: Dict[int, str] = {}
+    for index, (question_id, changes) in enumerate(items):
+        if not changes:
+            errors[index] = "没有需要更新的字段"
+            continue
+        key = _change_set_key(changes)
+        if question_id in first_key:
+            if first_key[question_id] != key:
+                errors[index] = "同一道错题的修改不一致"
+            continue
+        first_key[question_id] = key
+        groups.setdefault(key, (changes, []))[1].append(question_id)
+
+    rows: Dict[uuid.UUID, RowMapping] = {}
+    for changes, ids in groups.values():
+        for row in await update_questions(db, user_id, ids, changes):
+            rows[row["id"]] = row
+    await db.commit()
+
+    results = []
+    for index, (question_id, _) in enumerate(items):
+        row = rows.get(question_id)
+        if index in errors:
+            results.append(ErrorQuestionBatchItemResult(
+                index=index, id=str(question_id), status="error", message=errors[index],
+            ))
+        elif row is None:
+            results.append(ErrorQuestionBatchItemResult(
+                index=index, id=str(question_id), status="not_found", message="错题不存在",
+            ))
+        else:
+            results.append(ErrorQuestionBatchItemResult(
+                index=index,
+                id=str(question_id),
+                status="updated",
+                data=ErrorQuestionResponse.model_validate(dict(row)),
+            ))
+    return _batch_result(results, "updated")
+
+
+async def delete_batch(
+    db: AsyncSession,
+    user_id,
+    ids: List[uuid.UUID],
+) -> ErrorQuestionBatchResult:
+    """批量删除错题，不存在或不属于当前用户的 ID 标记为 not_found"""
+    _check_batch_size(len(ids))
+
+    unique_ids = list(dict.fromkeys(ids))
+    deleted = await delete_questions(db, user_id, unique_ids)
+    await db.commit()
+
+    deleted_ids = {row["id"] for row in deleted}
+    results = []
+    for index, question_id in enumerate(ids):
+        found = question_id in deleted_ids
+        results.append(ErrorQuestionBatchItemResult(
+            index=index,
+            id=str(question_id),
+            status="deleted" if found else "not_found",
+            message=None if found else "错题不存在",
+        ))
+    return _batch_result(results, "deleted")
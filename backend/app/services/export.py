@@ -0,0 +1,166 @@
+"""
+错题本导出
+使用服务端游标按块读取错题，每块再用两条 IN 查询取出对应的 AI 分析与练习记录，
+边读边写出 NDJSON / CSV，内存占用与错题本大小无关。
+"""
+import csv
+import enum
+import io
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.database import read_session
+from app.core.exceptions import ValidationError
+from app.models.ai_analysis import AIAnalysis
+from app.models.error_question import ErrorQuestion
+from app.models.practice_record import PracticeRecord
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# 导出的错题字段
+QUESTION_FIELDS = (
+    "id",
+    "subject",
+    "chapter",
+    "question_text",
+    "question_image_url",
+    "correct_answer",
+    "user_answer",
+    "explanation",
+    "difficulty",
+    "error_type",
+    "tags",
+    "review_count",
+    "mastery_level",
+    "last_reviewed_at",
+    "next_review_at",
+    "is_archived",
+    "is_favorite",
+    "created_at",
+    "updated_at",
+)
+
+ANALYSIS_FIELDS = ("id", "analysis_type", "analysis_result", "model_name", "status", "created_at")
+
+PRACTICE_FIELDS = ("id", "is_correct", "user_answer", "time_spent", "confidence", "created_at")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+async def _related_rows(
+    db,
+    model,
+    fields,
+    question_ids: List[uuid.UUID],
+) -> Dict[uuid.UUID, List[dict]]:
+    """按错题 ID 分组读取关联记录"""
+    columns = [getattr(model, field) for field in fields]
+    result = await db.execute(
+        select(model.question_id, *columns)
+        .where(model.question_id.in_(question_ids))
+        .order_by(model.question_id, model.created_at)
+    )
+    grouped: Dict[uuid.UUID, List[dict]] = defaultdict(list)
+    for row in result.mappings():
+        grouped[row["question_id"]].append({field: row[field] for field in fields})
+    return grouped
+
+
+async def iter_question_chunks(user_id) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    按块产出用户的全部错题（含 AI 分析与练习记录）
+    使用独立的只读会话，响应开始流式输出后不依赖请求级的数据库会话
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    columns = [getattr(ErrorQuestion, field) for field in QUESTION_FIELDS]
+
+    async with read_session(user_id) as db:
+        result = await db.stream(
+            select(*columns)
+            .where(ErrorQuestion.user_id == user_id)
+            .order_by(ErrorQuestion.created_at, ErrorQuestion.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.mappings().partitions(chunk_size):
+            questions = [dict(row) for row in partition]
+            question_ids = [question["id"] for question in questions]
+
+            analyses = await _related_rows(db, AIAnalysis, ANALYSIS_FIELDS, question_ids)
+            practices = await _related_rows(db, PracticeRecord, PRACTICE_FIELDS, question_ids)
+
+            for question in questions:
+                question["analyses"] = analyses.get(question["id"], [])
+                question["practice_records"] = practices.get(question["id"], [])
+            yield questions
+
+
+async def export_ndjson(user_id) -> AsyncIterator[str]:
+    """NDJSON：每行一道错题，关联记录内嵌为数组"""
+    async for questions in iter_question_chunks(user_id):
+        yield "".join(_dumps(question) + "\n" for question in questions)
+
+
+async def export_csv(user_id) -> AsyncIterator[str]:
+    """CSV：每行一道错题，标签以 ; 分隔，关联记录以 JSON 字符串写入单独的列"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # 带 BOM，便于 Excel 识别 UTF-8
+    buffer.write("\ufeff")
+    writer.writerow([*QUESTION_FIELDS, "analyses", "practice_records"])
+
+    async for questions in iter_question_chunks(user_id):
+        for question in questions:
+            row = []
+            for field in QUESTION_FIELDS:
+                value = question[field]
+                if field == "tags":
+                    value = ";".join(value or [])
+                elif value is not None and not isinstance(value, (str, int, float)):
+                    value = _json_default(value)
+                row.append(value)
+            row.append(_dumps(question["analyses"]))
+            row.append(_dumps(question["practice_records"]))
+            writer.writerow(row)
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_stream(user_id, fmt: str) -> AsyncIterator[str]:
+    """
+    按格式返回导出流
+
+    Raises:
+        ValidationError: 不支持的导出格式
+    """
+    if fmt == "ndjson":
+        return export_ndjson(user_id)
+    if fmt == "csv":
+        return export_csv(user_id)
+    raise ValidationError("不支持的导出格式，仅支持 ndjson 或 csv")
@@ -0,0 +1,309 @@
+"""
+错题计数维护
+错题的创建、更新、删除在同一事务中以增量方式更新 user_question_counters，
+单维度筛选的总数查询只需一次主键查找。
+
+计数可能因绕过本模块的写入而漂移，由 reconcile_user / reconcile_all 定期修复：
+
+    python -m app.services.question_counters
+"""
+import asyncio
+import enum
+from collections import Counter
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.database import AppSession, is_read_only
+from app.models.error_question import ErrorQuestion
+from app.models.question_counter import UserQuestionCounter
+from app.models.user import User
+
+# 参与计数的维度（均为错题表字段）
+COUNTER_DIMENSIONS = ("subject", "difficulty", "error_type", "is_favorite", "is_archived")
+
+# 总数维度
+TOTAL = ("total", "")
+
+CounterKey = Tuple[str, str]
+
+
+def normalize(value: Any) -> str:
+    """将维度取值统一转换为字符串"""
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def counter_keys(question: Mapping[str, Any]) -> Iterable[CounterKey]:
+    """一道错题对应的全部计数键"""
+    yield TOTAL
+    for dimension in COUNTER_DIMENSIONS:
+        yield dimension, normalize(question[dimension])
+
+
+def question_deltas(
+    old: Optional[Mapping[str, Any]],
+    new: Optional[Mapping[str, Any]],
+) -> Counter:
+    """
+    计算一次变更对计数的影响
+
+    Args:
+        old: 变更前的维度取值（创建时为 None）
+        new: 变更后的维度取值（删除时为 None）
+    """
+    deltas: Counter = Counter()
+    if old is not None:
+        deltas.subtract(counter_keys(old))
+    if new is not None:
+        deltas.update(counter_keys(new))
+    return deltas
+
+
+def dimensions_of(question: ErrorQuestion) -> Dict[str, Any]:
+    """读取 ORM 对象的维度取值"""
+    return {dimension: getattr(question, dimension) for dimension in COUNTER_DIMENSIONS}
+
+
+async def apply_deltas(db: AsyncSession, user_id, deltas: Mapping[CounterKey, int]) -> None:
+    """
+    以一条 UPSERT 语句应用计数增量（不提交事务）
+    需在错题写入之后、同一事务中调用；用户尚无计数记录时改为在本事务中对账初始化
+    """
+    rows = [(dimension, value, delta) for (dimension, value), delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    # 仅在已有总数计数行时写入增量，通过 RETURNING 判断，无需先单独查询
+    delta_rows = values(
+        column("dimension", String),
+        column("value", String),
+        column("count", Integer),
+        name="deltas",
+    ).data(rows)
+    stmt = pg_insert(UserQuestionCounter).from_select(
+        ["user_id", "dimension", "value", "count"],
+        select(
+            literal(user_id, UserQuestionCounter.user_id.type),
+            delta_rows.c.dimension,
+            delta_rows.c.value,
+            delta_rows.c.count,
+        ).where(_has_total(user_id)),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            UserQuestionCounter.user_id,
+            UserQuestionCounter.dimension,
+            UserQuestionCounter.value,
+        ],
+        set_={"count": UserQuestionCounter.count + stmt.excluded.count},
+    ).returning(UserQuestionCounter.dimension)
+
+    if (await db.execute(stmt)).first() is None:
+        # 已有错题的用户若只写入增量，总数会停留在 ±1；对账统计已包含本事务的写入，无需再叠加增量
+        await reconcile_user(db, user_id)
+
+
+async def get_count(
+    db: AsyncSession,
+    user_id,
+    dimension: Optional[str] = None,
+    value: Any = None,
+) -> int:
+    """
+    获取单维度计数（不传维度时返回总数）
+    用户尚无计数记录时先执行一次对账初始化
+    """
+    key = TOTAL if dimension is None else (dimension, normalize(value))
+    result = await db.execute(
+        select(UserQuestionCounter.dimension, UserQuestionCounter.value, UserQuestionCounter.count)
+        .where(
+            UserQuestionCounter.user_id == user_id,
+            or_(
+                and_(
+                    UserQuestionCounter.dimension == TOTAL[0],
+                    UserQuestionCounter.value == TOTAL[1],
+                ),
+                and_(
+                    UserQuestionCounter.dimension == key[0],
+                    UserQuestionCounter.value == key[1],
+                ),
+            ),
+        )
+    )
+    counts = {(dim, val): count for dim, val, count in result}
+
+    if TOTAL not in counts:
+        counts = await _initialize(db, user_id)
+
+    return counts.get(key, 0)
+
+
+async def get_counters(db: AsyncSession, user_id) -> Dict[str, Dict[str, int]]:
+    """获取用户全部计数，按维度分组"""
+    result = await db.execute(
+        select(UserQuestionCounter.dimension, UserQuestionCounter.value, UserQuestionCounter.count)
+        .where(UserQuestionCounter.user_id == user_id)
+    )
+    counts = {(dim, val): count for dim, val, count in result}
+
+    if TOTAL not in counts:
+        counts = await _initialize(db, user_id)
+
+    grouped: Dict[str, Dict[str, int]] = {}
+    for (dimension, value), count in counts.items():
+        if count:
+            grouped.setdefault(dimension, {})[value] = count
+    grouped.setdefault(TOTAL[0], {TOTAL[1]: 0})
+    return grouped
+
+
+# ==================== 对账 ====================
+
+def _has_total(user_id):
+    """用户是否已有总数计数行（EXISTS 条件）"""
+    existing = aliased(UserQuestionCounter)
+    return exists().where(
+        existing.user_id == user_id,
+        existing.dimension == TOTAL[0],
+        existing.value == TOTAL[1],
+    )
+
+
+async def _lock_user(db: AsyncSession, user_id) -> None:
+    """
+    事务级咨询锁，串行化同一用户的计数初始化与对账
+    等待期间其他事务提交的错题与计数，在获得锁后的查询中均可见（READ COMMITTED）
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"question_counters:{user_id}"))))
+
+
+async def _initialize(db: AsyncSession, user_id) -> Dict[CounterKey, int]:
+    """
+    用户尚无计数记录时初始化；只读副本会话上只统计实际数量，留待主库读写时再初始化
+    初始化在同一引擎的独立会话中提交，不影响调用方会话的事务
+    """
+    if is_read_only(db):
+        return await _actual_counts(db, user_id)
+    async with AppSession(bind=db.bind, expire_on_commit=False) as backfill:
+        counts = await reconcile_user(backfill, user_id)
+        await backfill.commit()
+    return counts
+
+
+async def _actual_counts(db: AsyncSession, user_id) -> Dict[CounterKey, int]:
+    """通过 GROUPING SETS 一次查询出全部维度的实际数量"""
+    columns = [getattr(ErrorQuestion, dimension) for dimension in COUNTER_DIMENSIONS]
+    grouping = [func.grouping(column) for column in columns]
+    result = await db.execute(
+        select(*columns, *grouping, func.count())
+        .where(ErrorQuestion.user_id == user_id)
+        .group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+    )
+
+    counts: Dict[CounterKey, int] = {TOTAL: 0}
+    size = len(COUNTER_DIMENSIONS)
+    for row in result:
+        values, flags, count = row[:size], row[size:2 * size], row[-1]
+        grouped = [i for i, flag in enumerate(flags) if flag == 0]
+        if not grouped:
+            counts[TOTAL] = count
+        else:
+            index = grouped[0]
+            counts[(COUNTER_DIMENSIONS[index], normalize(values[index]))] = count
+    return counts
+
+
+async def reconcile_user(db: AsyncSession, user_id) -> Dict[CounterKey, int]:
+    """重新计算并覆盖用户的计数（不提交事务），返回最新计数"""
+    await _lock_user(db, user_id)
+    # 先锁定已有计数行，再统计实际数量：并发写入的增量会在本事务提交后再叠加
+    result = await db.execute(
+        select(UserQuestionCounter.dimension, UserQuestionCounter.value, UserQuestionCounter.count)
+        .where(UserQuestionCounter.user_id == user_id)
+        .with_for_update()
+    )
+    stored = {(dim, val): count for dim, val, count in result}
+    actual = await _actual_counts(db, user_id)
+
+    drift = {
+        key: actual.get(key, 0) - stored.get(key, 0)
+        for key in set(actual) | set(stored)
+        if actual.get(key, 0) != stored.get(key, 0)
+    }
+    if not drift:
+        return actual
+    if stored:
+        logger.warning(f"Question counters drifted for user {user_id}: {drift}")
+
+    stmt = pg_insert(UserQuestionCounter).values([
+        {"user_id": user_id, "dimension": dimension, "value": value, "count": count}
+        for (dimension, value), count in actual.items()
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                UserQuestionCounter.user_id,
+                UserQuestionCounter.dimension,
+                UserQuestionCounter.value,
+            ],
+            set_={"count": stmt.excluded.count},
+        )
+    )
+
+    stale = [key for key in stored if key not in actual]
+    if stale:
+        await db.execute(
+            delete(UserQuestionCounter).where(
+                UserQuestionCounter.user_id == user_id,
+                tuple_(UserQuestionCounter.dimension, UserQuestionCounter.value).in_(stale),
+            )
+        )
+    return actual
+
+
+async def reconcile_all(batch_size: int = 500) -> int:
+    """对所有用户执行对账，返回处理的用户数"""
+    from app.core.database import AsyncSessionLocal
+
+    processed = 0
+    last_id = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = select(User.id).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            user_ids = (await db.execute(query)).scalars().all()
+            if not user_ids:
+                return processed
+
+            for user_id in user_ids:
+                await reconcile_user(db, user_id)
+                await db.commit()
+            processed += len(user_ids)
+            last_id = user_ids[-1]
+            logger.info(f"Reconciled question counters for {processed} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_all())
@@ -0,0 +1,259 @@
+"""
+错题批量导入
+适用于从其他产品迁移的大文件（数万道错题）：
+
+1. 上传内容按块写入临时文件（aiofiles），请求内不缓冲整个文件
+2. 后台任务逐行读取临时文件，按 ErrorQuestionCreate 校验，
+   每 IMPORT_BATCH_SIZE 行以一条多行 INSERT 写入并立即提交，不会长时间占用事务
+3. 任务进度写入 Redis（不可用时保存在进程内），通过任务状态接口查询
+"""
+import csv
+import json
+import os
+import tempfile
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from loguru import logger
+from pydantic import ValidationError
+
+from app.config import settings
+from app.core.cache import cache
+from app.core.database import AsyncSessionLocal, bind_user
+from app.core.exceptions import NotFound
+from app.core.exceptions import ValidationError as AppValidationError
+from app.schemas.error_question import (
+    ErrorQuestionCreate,
+    ErrorQuestionImportError,
+    ErrorQuestionImportJob,
+)
+from app.services import error_questions
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# 上传写盘的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Redis 不可用时的进程内任务状态（仅保留最近的任务）
+_LOCAL_JOBS_MAX = 1000
+_local_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+# ==================== 任务状态 ====================
+
+def _job_key(job_id: str) -> str:
+    return f"import:job:{job_id}"
+
+
+async def save_job(user_id, job: ErrorQuestionImportJob) -> None:
+    """保存任务状态"""
+    record = {"user_id": str(user_id), "job": job.model_dump(mode="json")}
+    if await cache.set(_job_key(job.job_id), record, expire=settings.IMPORT_JOB_TTL):
+        return
+    _local_jobs[job.job_id] = record
+    _local_jobs.move_to_end(job.job_id)
+    while len(_local_jobs) > _LOCAL_JOBS_MAX:
+        _local_jobs.popitem(last=False)
+
+
+async def get_job(user_id, job_id: str) -> ErrorQuestionImportJob:
+    """
+    获取任务状态
+
+    Raises:
+        NotFound: 任务不存在、已过期或不属于该用户
+    """
+    record = await cache.get(_job_key(job_id)) or _local_jobs.get(job_id)
+    if not record or record["user_id"] != str(user_id):
+        raise NotFound("导入任务不存在")
+    return ErrorQuestionImportJob.model_validate(record["job"])
+
+
+# ==================== 上传 ====================
+
+async def receive_upload(file: UploadFile) -> Tuple[str, int]:
+    """
+    将上传内容按块写入临时文件
+
+    Returns:
+        (临时文件路径, 文件字节数)
+
+    Raises:
+        ValidationError: 文件为空或超过大小上限
+    """
+    fd, path = tempfile.mkstemp(prefix="error-import-", suffix=".upload")
+    os.close(fd)
+
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.IMPORT_MAX_SIZE:
+                    raise AppValidationError(
+                        f"导入文件不能超过 {settings.IMPORT_MAX_SIZE // 1024 // 1024}MB"
+                    )
+                await out.write(chunk)
+        if size == 0:
+            raise AppValidationError("导入文件为空")
+    except Exception:
+        await aiofiles.os.remove(path)
+        raise
+
+    return path, size
+
+
+# ==================== 解析 ====================
+
+async def _iter_csv(path: str) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """逐条读取 CSV 记录（首行为表头，支持引号内换行）"""
+    header: Optional[List[str]] = None
+    row_no = 0
+    pending = ""
+
+    async with aiofiles.open(path, "r", encoding="utf-8-sig", newline="") as f:
+        async for line in f:
+            pending += line
+            # 引号数为奇数说明字段内含换行，继续拼接下一行
+            if pending.count('"') % 2:
+                continue
+            record_text, pending = pending, ""
+            if not record_text.strip():
+                continue
+
+            values = next(csv.reader([record_text]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+
+            row_no += 1
+            if len(values) != len(header):
+                yield row_no, {"__error__": f"列数与表头不一致（表头 {len(header)} 列，本行 {len(values)} 列）"}
+                continue
+            record = {
+                key: value.strip()
+                for key, value in zip(header, values, strict=True)
+                if key and value and value.strip()
+            }
+            if "tags" in record:
+                record["tags"] = [tag.strip() for tag in record["tags"].split(";") if tag.strip()]
+            yield row_no, record
+
+    if pending.strip():
+        yield row_no + 1, {"__error__": "引号未闭合"}
+
+
+async def _iter_ndjson(path: str) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """逐行读取 NDJSON 记录"""
+    row_no = 0
+    async with aiofiles.open(path, "r", encoding="utf-8-sig") as f:
+        async for line in f:
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, {"__error__": f"不是合法的 JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield row_no, {"__error__": "不是 JSON 对象"}
+                continue
+            yield row_no, record
+
+
+# ==================== 导入任务 ====================
+
+async def create_job(
+    user_id,
+    file: UploadFile,
+    fmt: Optional[str],
+) -> Tuple[ErrorQuestionImportJob, str]:
+    """
+    接收上传并登记导入任务
+
+    Returns:
+        (任务状态, 临时文件路径)
+    """
+    fmt = fmt or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    if fmt not in IMPORT_FORMATS:
+        raise AppValidationError("不支持的文件格式，仅支持 csv 或 ndjson")
+
+    path, size = await receive_upload(file)
+    job = ErrorQuestionImportJob(
+        job_id=uuid.uuid4().hex,
+        status="pending",
+        format=fmt,
+        filename=file.filename,
+        size=size,
+        created_at=datetime.utcnow(),
+    )
+    await save_job(user_id, job)
+    return job, path
+
+
+async def _write_batch(user_id, batch: List[ErrorQuestionCreate]) -> None:
+    """以一个短事务写入一批错题（计数与错题本版本号由 insert_questions 维护）"""
+    async with AsyncSessionLocal() as db:
+        # 登记写入用户：导入期间该用户的读请求回到主库，避免从滞后副本读取旧页并缓存到新版本号下
+        bind_user(db, user_id)
+        await error_questions.insert_questions(db, user_id, batch)
+        await db.commit()
+
+
+async def run_job(user_id, job: ErrorQuestionImportJob, path: str) -> None:
+    """执行导入任务（后台任务）"""
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    await save_job(user_id, job)
+
+    records = _iter_ndjson(path) if job.format == "ndjson" else _iter_csv(path)
+    batch: List[ErrorQuestionCreate] = []
+
+    def record_error(row_no: int, message: str) -> None:
+        job.failed += 1
+        if len(job.errors) < settings.IMPORT_MAX_ERRORS:
+            job.errors.append(ErrorQuestionImportError(row=row_no, message=message))
+
+    try:
+        async for row_no, record in records:
+            job.processed += 1
+            if "__error__" in record:
+                record_error(row_no, record["__error__"])
+                continue
+            try:
+                batch.append(ErrorQuestionCreate.model_validate(record))
+            except ValidationError as e:
+                record_error(row_no, error_questions.validation_message(e))
+                continue
+
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                await _write_batch(user_id, batch)
+                job.imported += len(batch)
+                batch = []
+                await save_job(user_id, job)
+
+        if batch:
+            await _write_batch(user_id, batch)
+            job.imported += len(batch)
+
+        job.status = "completed"
+        job.message = f"成功导入 {job.imported} 道错题，失败 {job.failed} 行"
+    except Exception as e:
+        logger.exception(f"Error question import {job.job_id} failed: {e}")
+        job.status = "failed"
+        job.message = f"导入中断，已写入 {job.imported} 道错题"
+    finally:
+        job.finished_at = datetime.utcnow()
+        await save_job(user_id, job)
+        await aiofiles.os.remove(path)
+
+    logger.info(
+        f"Error question import {job.job_id}: user={user_id} status={job.status} "
+        f"imported={job.imported} failed={job.failed}"
+    )
@@ -0,0 +1,116 @@
+"""
+错题全文检索
+检索向量由数据库生成列 error_questions.search_vector 维护（见 SEARCH_VECTOR_EXPRESSION），
+中文按单字建立词元，查询时连续汉字组合为短语（<->），英文、数字按词匹配。
+
+查询串在 Python 中构造，只保留字母、数字与汉字，用户输入不会进入 tsquery 语法。
+"""
+import html
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.exceptions import ValidationError
+from app.models.error_question import ErrorQuestion
+
+# 与 SEARCH_VECTOR_EXPRESSION 中的汉字范围一致
+CJK_CHARS = "\u3400-\u9fff\uf900-\ufaff"
+
+# 一个检索词：连续的字母/数字/汉字
+_TERM_PATTERN = re.compile(r"[^\W_]+")
+
+# 检索词内部按 汉字单字 / 非汉字片段 切分
+_PIECE_PATTERN = re.compile(f"[{CJK_CHARS}]|[^{CJK_CHARS}]+")
+
+# 参与高亮的字段
+HIGHLIGHT_FIELDS = ("question_text", "explanation", "chapter")
+
+# 最多使用的检索词数量
+MAX_TERMS = 16
+
+
+def parse_terms(keyword: str) -> List[str]:
+    """
+    拆分检索词（去重，保持顺序）
+
+    Raises:
+        ValidationError: 没有有效的检索词
+    """
+    terms = list(dict.fromkeys(term.lower() for term in _TERM_PATTERN.findall(keyword or "")))
+    if not terms:
+        raise ValidationError("请输入有效的检索关键词")
+    return terms[:MAX_TERMS]
+
+
+def build_tsquery(terms: List[str]) -> str:
+    """
+    构造 to_tsquery 查询串：检索词之间为 AND，检索词内部为短语
+
+    例如 "二次函数 x2" -> "二 <-> 次 <-> 函 <-> 数 & x2"
+    """
+    return " & ".join(
+        " <-> ".join(_PIECE_PATTERN.findall(term))
+        for term in terms
+    )
+
+
+def tsquery(terms: List[str]) -> ColumnElement:
+    """to_tsquery('simple', ...) 表达式"""
+    return func.to_tsquery("simple", build_tsquery(terms))
+
+
+def search_condition(query: ColumnElement) -> ColumnElement:
+    """匹配条件：search_vector @@ tsquery"""
+    return ErrorQuestion.search_vector.op("@@")(query)
+
+
+def rank_expression(query: ColumnElement) -> ColumnElement:
+    """相关度：ts_rank_cd（考虑词元权重与邻近度）"""
+    return func.ts_rank_cd(ErrorQuestion.search_vector, query)
+
+
+def highlight(text: Optional[str], terms: List[str], context: int = 40) -> Optional[str]:
+    """
+    生成高亮片段：截取首个命中位置附近的文本，命中词用 <mark> 包裹（其余内容已做 HTML 转义）
+
+    Returns:
+        高亮片段，文本中没有命中时返回 None
+    """
+    if not text:
+        return None
+
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE,
+    )
+    first = pattern.search(text)
+    if first is None:
+        return None
+
+    start = max(first.start() - context, 0)
+    end = min(first.end() + context * 2, len(text))
+    snippet = text[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(snippet):
+        parts.append(html.escape(snippet[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(snippet[position:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def highlights_of(question: ErrorQuestion, terms: List[str]) -> Dict[str, str]:
+    """逐字段生成高亮片段（仅包含有命中的字段）"""
+    result = {}
+    for field in HIGHLIGHT_FIELDS:
+        snippet = highlight(getattr(question, field), terms)
+        if snippet is not None:
+            result[field] = snippet
+    return result
@@ -0,0 +1,199 @@
+"""
+批量开通账号
+教师/管理员上传 CSV 或 NDJSON 名单，一次性创建大量学生账号：
+
+- 用户名、邮箱冲突通过一次集合查询检出
+- 密码哈希在工作池中并行计算，计算期间不持有数据库连接与事务
+- 分批使用多行 INSERT 写入，整个名单在一个事务内提交
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import ValidationError as AppValidationError
+from app.core.hashing import password_hasher
+from app.models.user import User, UserRole
+from app.schemas.user import UserProvisionResult, UserProvisionRow, UserProvisionRowResult
+
+
+def parse_records(content: str, fmt: str) -> List[Dict[str, Any]]:
+    """
+    解析 CSV（首行为表头）或 NDJSON（每行一个 JSON 对象）
+
+    Raises:
+        ValidationError: 格式不支持或内容无法解析
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        return [
+            {key.strip(): value.strip() for key, value in row.items() if key and value}
+            for row in reader
+        ]
+
+    if fmt == "ndjson":
+        records = []
+        for line_no, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise AppValidationError(f"第 {line_no} 行不是合法的 JSON", detail=str(e)) from e
+            if not isinstance(record, dict):
+                raise AppValidationError(f"第 {line_no} 行不是 JSON 对象")
+            records.append(record)
+        return records
+
+    raise AppValidationError("不支持的文件格式，仅支持 csv 或 ndjson")
+
+
+def _error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+async def provision_users(
+    db: AsyncSession,
+    records: List[Dict[str, Any]],
+    operator: User,
+) -> UserProvisionResult:
+    """批量创建用户，返回逐行结果"""
+    if len(records) > settings.BULK_PROVISION_MAX_ROWS:
+        raise AppValidationError(
+            f"单次最多导入 {settings.BULK_PROVISION_MAX_ROWS} 行",
+            detail={"rows": len(records)},
+        )
+
+    results: List[UserProvisionRowResult] = []
+    candidates: List[Tuple[UserProvisionRowResult, UserProvisionRow]] = []
+    seen_usernames: set = set()
+    seen_emails: set = set()
+
+    # 1. 逐行校验（含文件内重复）
+    for row_no, record in enumerate(records, start=1):
+        result = UserProvisionRowResult(
+            row=row_no,
+            username=str(record["username"]) if record.get("username") is not None else None,
+            email=str(record["email"]) if record.get("email") is not None else None,
+            status="error",
+        )
+        results.append(result)
+
+        try:
+            row = UserProvisionRow.model_validate(record)
+        except ValidationError as e:
+            result.message = _error_message(e)
+            continue
+
+        if row.role != UserRole.STUDENT and operator.role != UserRole.ADMIN:
+            result.message = "仅管理员可以创建非学生账号"
+            continue
+        if row.username in seen_usernames:
+            result.message = "文件中用户名重复"
+            continue
+        if row.email in seen_emails:
+            result.message = "文件中邮箱重复"
+            continue
+
+        seen_usernames.add(row.username)
+        seen_emails.add(row.email)
+        candidates.append((result, row))
+
+    # 2. 一次集合查询检出已存在的用户名/邮箱
+    if candidates:
+        existing = await db.execute(
+            select(User.username, User.email).where(
+                or_(
+                    User.username.in_(seen_usernames),
+                    User.email.in_(seen_emails),
+                )
+            )
+        )
+        taken_usernames = set()
+        taken_emails = set()
+        for username, email in existing:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+        remaining = []
+        for result, row in candidates:
+            if row.username in taken_usernames:
+                result.status = "skipped"
+                result.message = "用户名已存在"
+            elif row.email in taken_emails:
+                result.status = "skipped"
+                result.message = "邮箱已被注册"
+            else:
+                remaining.append((result, row))
+        candidates = remaining
+
+    # 冲突查询到此结束：先结束只读事务、归还连接，避免哈希计算的数分钟内连接停留在 idle in transaction
+    # （查询与写入之间新注册的账号由下方 ON CONFLICT 跳过）
+    if db.in_transaction():
+        await db.commit()
+
+    # 3. 并行计算密码哈希
+    password_hashes = await password_hasher.hash_many([row.password for _, row in candidates])
+
+    # 4. 分批多行 INSERT（并发注册导致的冲突由 ON CONFLICT 跳过）
+    now = datetime.utcnow()
+    batch_size = settings.BULK_INSERT_BATCH_SIZE
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        values = []
+        for (result, row), password_hash in zip(batch, password_hashes[start:start + batch_size], strict=True):
+            user_id = uuid.uuid4()
+            result.user_id = str(user_id)
+            values.append({
+                "id": user_id,
+                "username": row.username,
+                "email": row.email,
+                "password_hash": password_hash,
+                "nickname": row.nickname,
+                "role": row.role,
+                "is_active": True,
+                "is_verified": False,
+                "token_version": 0,
+                "created_at": now,
+                "updated_at": now,
+            })
+
+        inserted = await db.execute(
+            pg_insert(User)
+            .values(values)
+            .on_conflict_do_nothing()
+            .returning(User.id)
+        )
+        inserted_ids = {str(user_id) for user_id in inserted.scalars()}
+
+        for result, _ in batch:
+            if result.user_id in inserted_ids:
+                result.status = "created"
+                result.message = None
+            else:
+                result.status = "skipped"
+                result.message = "用户名或邮箱已存在"
+                result.user_id = None
+
+    await db.commit()
+
+    created = sum(1 for r in results if r.status == "created")
+    skipped = sum(1 for r in results if r.status == "skipped")
+    return UserProvisionResult(
+        total=len(results),
+        created=created,
+        skipped=skipped,
+        failed=len(results) - created - skipped,
+        results=results,
+    )
@@ -0,0 +1,68 @@
+"""
+测试公共夹具
+"""
+import os
+import uuid
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  注册全部模型
+from app.core.cache import cache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.database import AppSession, Base
+from app.models.user import User
+
+# 需要 PostgreSQL 的测试使用独立的测试库，未配置时跳过（测试会清空其中的表）
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+async def fake_cache():
+    """以 fakeredis 替换全局缓存连接（文本、二进制与订阅连接共享同一实例）"""
+    server = fakeredis.FakeServer()
+    saved = cache.redis, cache.raw, cache._subscriber, cache.breaker
+    cache.redis = aioredis.FakeRedis(server=server, decode_responses=True)
+    cache.raw = aioredis.FakeRedis(server=server)
+    cache._subscriber = aioredis.FakeRedis(server=server, decode_responses=True)
+    cache.breaker = CircuitBreaker("redis-test")
+    cache._local.clear()
+    yield cache
+    await cache.redis.aclose()
+    await cache.raw.aclose()
+    await cache._subscriber.aclose()
+    cache.redis, cache.raw, cache._subscriber, cache.breaker = saved
+    cache._local.clear()
+
+
+@pytest.fixture
+async def db_engine():
+    """测试库引擎：按当前模型重建表结构"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, class_=AppSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def user(session_factory) -> User:
+    async with session_factory() as db:
+        name = f"user_{uuid.uuid4().hex[:8]}"
+        user = User(username=name, email=f"{name}@example.com", password_hash="x")
+        db.add(user)
+        await db.commit()
+        return user
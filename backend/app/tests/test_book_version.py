@@ -0,0 +1,64 @@
+"""
+错题本版本号测试：写入提交后紧接着的读取必须看到新版本
+"""
+import asyncio
+import uuid
+
+from app.core.book_version import USER_BOOK_TAG, book_versions
+from app.core.database import AppSession
+
+
+async def test_write_then_read_sees_new_version(fake_cache):
+    user_id = str(uuid.uuid4())
+    before = await book_versions.current(user_id)
+    await fake_cache.set("page", {"items": []}, tags=[USER_BOOK_TAG.format(user_id=user_id)])
+
+    session = AppSession()
+    book_versions.mark_changed(session, user_id)
+    await session.commit()
+
+    # commit() 返回时版本号已更新、依赖错题本的缓存已失效，不依赖后台任务调度
+    assert await book_versions.current(user_id) != before
+    assert await fake_cache.get("page") is None
+    await session.close()
+
+
+async def test_rollback_keeps_version(fake_cache):
+    user_id = str(uuid.uuid4())
+    before = await book_versions.current(user_id)
+
+    session = AppSession()
+    await session.begin()
+    book_versions.mark_changed(session, user_id)
+    await session.rollback()
+    await session.commit()
+
+    assert await book_versions.current(user_id) == before
+    await session.close()
+
+
+async def test_failed_bump_invalidates_old_version(fake_cache, monkeypatch):
+    user_id = str(uuid.uuid4())
+    before = await book_versions.current(user_id)
+    await fake_cache.set("page", {"items": []}, tags=[USER_BOOK_TAG.format(user_id=user_id)])
+    monkeypatch.setattr(book_versions, "RETRY_INTERVAL", 0.01)
+
+    # 提交时 Redis 不可用：写入已提交，版本号未能更新
+    fake_cache.breaker.trip(ConnectionError("down"))
+    fake_cache.breaker.recovery_timeout = 60
+    session = AppSession()
+    book_versions.mark_changed(session, user_id)
+    await session.commit()
+    await session.close()
+
+    # 待更新期间不再使用旧版本号（不生成 ETag、不读响应缓存）
+    fake_cache.breaker.recovery_timeout = 0
+    assert await book_versions.current(user_id) is None
+
+    # Redis 恢复后后台重试完成更新与缓存失效
+    for _ in range(100):
+        if not book_versions._pending:
+            break
+        await asyncio.sleep(0.01)
+    assert await book_versions.current(user_id) not in (None, before)
+    assert await fake_cache.get("page") is None
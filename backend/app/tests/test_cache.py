@@ -0,0 +1,38 @@
+"""
+Redis 缓存连接与熔断测试
+"""
+import fakeredis
+from fakeredis import aioredis
+
+from app.config import settings
+from app.core.cache import RedisCache
+from app.core.circuit_breaker import CircuitBreaker
+
+
+async def test_connect_keeps_clients_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    cache = RedisCache(breaker=CircuitBreaker("redis-test", recovery_timeout=60))
+    await cache.connect()
+    try:
+        assert cache.redis is not None and cache.raw is not None
+        assert cache.breaker.state == CircuitBreaker.OPEN
+        # 熔断期间直接返回降级值
+        assert await cache.get("k") is None
+        assert cache.breaker.rejected == 1
+    finally:
+        await cache.close()
+
+
+async def test_half_open_probe_recovers_after_startup_failure():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    cache = RedisCache(breaker=CircuitBreaker("redis-test", recovery_timeout=0))
+    cache.redis = aioredis.FakeRedis(server=server, decode_responses=True)
+    cache.raw = aioredis.FakeRedis(server=server)
+    cache.breaker.trip(ConnectionError("startup ping failed"))
+
+    server.connected = True
+    assert await cache.set("k", {"v": 1}, expire=60)
+    assert cache.breaker.state == CircuitBreaker.CLOSED
+    assert await cache.get("k") == {"v": 1}
+    await cache.close()
@@ -0,0 +1,99 @@
+"""
+@cached 装饰器测试（基于 cache.get_or_set）
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from app.core.cache import cache
+from app.core.cached import cached
+
+
+async def test_concurrent_misses_load_once(fake_cache):
+    calls = 0
+
+    @cached("test.single_flight", ttl=60)
+    async def compute(current_user: str, n: int):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"n": n}
+
+    results = await asyncio.gather(*(compute("u1", 1) for _ in range(10)))
+    assert results == [{"n": 1}] * 10
+    assert calls == 1
+    assert await compute("u1", 1) == {"n": 1}
+    assert calls == 1
+
+
+async def test_lock_held_elsewhere_waits_for_value(fake_cache):
+    """其他进程持有回源锁时等待其结果，而不是重复回源"""
+    calls = 0
+
+    @cached("test.lock", ttl=60, per_user=False)
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return ["mine"]
+
+    key = f"cached:test.lock:{_digest()}"
+    await fake_cache.redis.set(f"lock:{key}", "other", ex=5)
+
+    async def other_process():
+        await asyncio.sleep(0.05)
+        await fake_cache.set(key, {"v": ["theirs"], "e": time.time() + 60, "d": 0.01}, expire=60)
+
+    result, _ = await asyncio.gather(compute(), other_process())
+    assert result == ["theirs"]
+    assert calls == 0
+
+
+async def test_negative_ttl_and_tags(fake_cache):
+    calls = 0
+
+    @cached("test.negative", ttl=60, negative_ttl=30, tags=["book:{user_id}"])
+    async def compute(current_user: str):
+        nonlocal calls
+        calls += 1
+        return []
+
+    assert await compute("u1") == []
+    assert await compute("u1") == []
+    assert calls == 1
+
+    await cache.invalidate_tags("book:u1")
+    assert await compute("u1") == []
+    assert calls == 2
+
+
+async def test_invalidate_tags_removes_keys_and_tag_sets(fake_cache):
+    await cache.mset({"a": 1, "b": 2}, expire=60, tags=["t1"])
+    await cache.mset({"b": 2, "c": 3}, expire=60, tags=["t2"])
+    await cache.set("d", 4, expire=60, tags=["t3"])
+
+    assert await cache.invalidate_tags("t1", "t2", "missing") == 3
+    assert await cache.mget(["a", "b", "c", "d"]) == [None, None, None, 4]
+    assert not await fake_cache.redis.exists("tag:t1", "tag:t2")
+    assert await cache.invalidate_tags("t1") == 0
+
+
+async def test_stale_value_returned_while_refreshing(fake_cache, monkeypatch):
+    values = iter(["old", "new"])
+
+    @cached("test.stale", ttl=1, stale_ttl=60, per_user=False)
+    async def compute():
+        return next(values)
+
+    assert await compute() == "old"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+    assert await compute() == "old"
+    await asyncio.sleep(0.05)
+    assert await compute() == "new"
+
+
+def _digest() -> str:
+    """无参数函数的缓存键摘要"""
+    return hashlib.blake2b(json.dumps({}, sort_keys=True).encode(), digest_size=12).hexdigest()
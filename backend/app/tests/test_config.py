@@ -0,0 +1,25 @@
+"""
+配置解析测试
+"""
+from app.config import Settings
+
+
+def test_replica_urls_comma_separated(monkeypatch):
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS",
+        "postgresql+asyncpg://u:p@replica1/db, postgresql+asyncpg://u:p@replica2/db,",
+    )
+    assert Settings(_env_file=None).DATABASE_REPLICA_URLS == [
+        "postgresql+asyncpg://u:p@replica1/db",
+        "postgresql+asyncpg://u:p@replica2/db",
+    ]
+
+
+def test_replica_urls_json_array(monkeypatch):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", '["postgresql+asyncpg://u:p@replica1/db"]')
+    assert Settings(_env_file=None).DATABASE_REPLICA_URLS == ["postgresql+asyncpg://u:p@replica1/db"]
+
+
+def test_replica_urls_empty(monkeypatch):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "")
+    assert Settings(_env_file=None).DATABASE_REPLICA_URLS == []
@@ -0,0 +1,62 @@
+"""
+错题批量写入测试（数据库相关用例需要 PostgreSQL，见 conftest.TEST_DATABASE_URL）
+"""
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.error_question import ErrorQuestionBatchUpdate, ErrorQuestionCreate
+from app.services import error_questions, question_counters
+
+
+def test_batch_update_accepts_items_or_shared_changes():
+    first, second = uuid.uuid4(), uuid.uuid4()
+    batch = ErrorQuestionBatchUpdate.model_validate({
+        "items": [
+            {"id": str(first), "changes": {"is_favorite": True}},
+            {"id": str(second), "changes": {"subject": "physics"}},
+        ]
+    })
+    assert batch.change_sets() == [(first, {"is_favorite": True}), (second, {"subject": "physics"})]
+
+    batch = ErrorQuestionBatchUpdate.model_validate({
+        "ids": [str(first), str(second)], "changes": {"is_archived": True},
+    })
+    assert batch.change_sets() == [(first, {"is_archived": True}), (second, {"is_archived": True})]
+
+    with pytest.raises(ValidationError):
+        ErrorQuestionBatchUpdate.model_validate({"ids": [str(first)]})
+    with pytest.raises(ValidationError):
+        ErrorQuestionBatchUpdate.model_validate({
+            "items": [{"id": str(first), "changes": {}}], "ids": [str(first)], "changes": {},
+        })
+
+
+async def test_update_batch_applies_per_item_changes(session_factory, user):
+    async with session_factory() as db:
+        rows = await error_questions.insert_questions(
+            db, user.id, [ErrorQuestionCreate(subject="math") for _ in range(4)],
+        )
+        await db.commit()
+    a, b, c, d = [row["id"] for row in rows]
+
+    async with session_factory() as db:
+        result = await error_questions.update_batch(db, user.id, [
+            (a, {"subject": "physics"}),
+            (b, {"subject": "physics"}),
+            (c, {"is_favorite": True}),
+            (c, {"is_favorite": False}),
+            (d, {}),
+            (uuid.uuid4(), {"subject": "physics"}),
+        ])
+    assert [item.status for item in result.results] == [
+        "updated", "updated", "updated", "error", "error", "not_found",
+    ]
+    assert result.results[0].data.subject == "physics"
+    assert result.results[2].data.is_favorite is True
+
+    async with session_factory() as db:
+        counters = await question_counters.get_counters(db, user.id)
+    assert counters["subject"] == {"math": 2, "physics": 2}
+    assert counters["is_favorite"] == {"true": 1, "false": 3}
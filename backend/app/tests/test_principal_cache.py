@@ -0,0 +1,28 @@
+"""
+认证主体缓存测试：失效通知经发布/订阅清除各 worker 的进程内副本
+"""
+import asyncio
+
+from app.core.principal_cache import principal_cache
+
+
+async def test_invalidation_broadcast_clears_local_copies(fake_cache):
+    listener = asyncio.create_task(fake_cache._listen_invalidations())
+    try:
+        await asyncio.sleep(0.05)
+        # 模拟其他 worker 持有的进程内副本
+        principal_cache._store_local("u1", {"id": "u1"})
+        principal_cache._store_local("u2", {"id": "u2"})
+
+        await fake_cache.invalidate(principal_cache._redis_key("u1"))
+        for _ in range(100):
+            if "u1" not in principal_cache._local:
+                break
+            await asyncio.sleep(0.01)
+
+        assert "u1" not in principal_cache._local
+        assert "u2" in principal_cache._local
+    finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        principal_cache.clear()
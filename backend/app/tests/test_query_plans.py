@@ -0,0 +1,120 @@
+"""
+错题列表查询计划回归测试（需要 PostgreSQL，见 conftest.TEST_DATABASE_URL）
+
+对 API 接受的 筛选 + 排序 组合执行 EXPLAIN，断言按索引顺序扫描、没有 Sort 节点：
+- 单个筛选条件有专用复合索引时，断言计划使用该索引
+- 标签、已归档 / 未收藏以及两两组合的筛选条件，断言按某个索引的顺序扫描后逐行过滤
+禁用顺序扫描、位图扫描与排序，使结果不依赖测试数据量：不存在按索引顺序的计划时仍会出现 Sort。
+"""
+import json
+from itertools import combinations
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.errors import SORT_FIELDS, _filtered_query
+from app.models.error_question import ErrorQuestion
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, username, email, password_hash, role, is_active, is_verified, created_at, updated_at)
+    SELECT gen_random_uuid(), 'plan_user_' || i, 'plan_user_' || i || '@example.com', 'x',
+           'STUDENT', true, false, now(), now()
+    FROM generate_series(1, 20) AS i
+    """,
+    """
+    INSERT INTO error_questions (
+        id, user_id, subject, difficulty, error_type, review_count, mastery_level,
+        tags, is_archived, is_favorite, created_at, updated_at
+    )
+    SELECT gen_random_uuid(), u.id,
+           (ARRAY['math', 'physics', 'chemistry', 'english'])[1 + i % 4],
+           (ARRAY['EASY', 'MEDIUM', 'HARD'])[1 + i % 3]::difficultylevel,
+           (ARRAY['CONCEPT', 'CALCULATION', 'CARELESS', 'METHOD', 'OTHER'])[1 + i % 5]::errortype,
+           i % 7, random(), ARRAY['tag' || i % 5, 'tag' || i % 7], i % 10 = 0, i % 6 = 0,
+           now() - i * interval '1 minute', now() - (i % 97) * interval '1 hour'
+    FROM users AS u, generate_series(1, 500) AS i
+    """,
+    "ANALYZE users",
+    "ANALYZE error_questions",
+]
+
+# 有专用复合索引的单个筛选条件 -> 索引名前缀（后接排序字段）
+INDEXED_FILTERS: List[tuple] = [
+    ({}, "ix_error_questions_user"),
+    ({"subject": "math"}, "ix_error_questions_user_subject"),
+    ({"difficulty": "HARD"}, "ix_error_questions_user_difficulty"),
+    ({"error_type": "CONCEPT"}, "ix_error_questions_user_error_type"),
+    ({"is_archived": False}, "ix_error_questions_user_active"),
+    ({"is_favorite": True}, "ix_error_questions_user_favorite"),
+]
+
+# 没有专用索引、按排序字段索引顺序扫描后逐行过滤的单个筛选条件
+FILTERED_SCAN_FILTERS: List[Dict[str, Any]] = [
+    {"is_archived": True},
+    {"is_favorite": False},
+    {"tags_any": ["tag1", "tag2"]},
+    {"tags_all": ["tag1", "tag3"]},
+]
+
+SORT_INDEX_SUFFIXES = {"created_at": "created", "updated_at": "updated", "mastery_level": "mastery"}
+
+
+def _cases() -> Iterator:
+    single_filters = [filters for filters, _ in INDEXED_FILTERS[1:]] + FILTERED_SCAN_FILTERS
+    # 同一字段的两个取值不会同时出现，两两组合时跳过
+    pairs = [
+        {**first, **second}
+        for first, second in combinations(single_filters, 2)
+        if not first.keys() & second.keys()
+    ]
+    for order in ("desc", "asc"):
+        for sort_by in SORT_FIELDS:
+            suffix = SORT_INDEX_SUFFIXES[sort_by]
+            for filters, prefix in INDEXED_FILTERS:
+                yield filters, sort_by, order, f"{prefix}_{suffix}"
+            for filters in FILTERED_SCAN_FILTERS + pairs:
+                yield filters, sort_by, order, None
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.mark.parametrize("filters,sort_by,order,index_name", list(_cases()))
+async def test_list_query_uses_index_order(
+    db_engine, filters, sort_by, order, index_name: Optional[str]
+):
+    async with db_engine.connect() as conn:
+        for statement in SEED_SQL:
+            await conn.execute(text(statement))
+        user_id = await conn.scalar(text("SELECT id FROM users ORDER BY username LIMIT 1"))
+
+        sort_column = getattr(ErrorQuestion, sort_by)
+        direction = (lambda column: column.desc()) if order == "desc" else (lambda column: column.asc())
+        query = (
+            _filtered_query(select(ErrorQuestion.id), user_id, **filters)
+            .order_by(direction(sort_column), direction(ErrorQuestion.id))
+            .limit(20)
+        )
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        await conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+        await conn.execute(text("SET LOCAL enable_sort = off"))
+        explain = await conn.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        # asyncpg 默认不解码 json 类型
+        plan = (json.loads(explain) if isinstance(explain, str) else explain)[0]["Plan"]
+        await conn.rollback()
+
+    nodes = list(_plan_nodes(plan))
+    node_types = [node["Node Type"] for node in nodes]
+    assert "Sort" not in node_types, f"{filters} ORDER BY {sort_by} {order}: {node_types}"
+    assert {"Index Scan", "Index Only Scan"} & set(node_types), node_types
+    if index_name is not None:
+        index_names = [node.get("Index Name") for node in nodes]
+        assert index_name in index_names, f"{filters} ORDER BY {sort_by} {order}: {index_names}"
@@ -0,0 +1,40 @@
+"""
+错题计数测试（需要 PostgreSQL，见 conftest.TEST_DATABASE_URL）
+"""
+from app.models.error_question import ErrorQuestion
+from app.schemas.error_question import ErrorQuestionCreate
+from app.services import error_questions, question_counters
+
+
+async def test_existing_user_initialized_on_first_write(session_factory, user):
+    # 计数上线前已有的错题：不经过计数维护直接写入
+    async with session_factory() as db:
+        db.add_all([ErrorQuestion(user_id=user.id, subject="math") for _ in range(3)])
+        db.add(ErrorQuestion(user_id=user.id, subject="physics"))
+        await db.commit()
+
+    async with session_factory() as db:
+        await error_questions.insert_questions(db, user.id, [ErrorQuestionCreate(subject="math")])
+        await db.commit()
+
+    async with session_factory() as db:
+        assert await question_counters.get_count(db, user.id) == 5
+        assert await question_counters.get_count(db, user.id, "subject", "math") == 4
+        assert await question_counters.get_count(db, user.id, "subject", "physics") == 1
+
+
+async def test_deltas_applied_after_initialization(session_factory, user):
+    async with session_factory() as db:
+        await error_questions.insert_questions(
+            db, user.id, [ErrorQuestionCreate(subject="math"), ErrorQuestionCreate(subject="math")],
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        await error_questions.insert_questions(db, user.id, [ErrorQuestionCreate(subject="physics")])
+        await db.commit()
+
+    async with session_factory() as db:
+        counters = await question_counters.get_counters(db, user.id)
+        assert counters["total"] == {"": 3}
+        assert counters["subject"] == {"math": 2, "physics": 1}
@@ -0,0 +1,44 @@
+"""
+限流测试：客户端 IP 识别与登录两级限流
+"""
+import ipaddress
+
+import pytest
+
+from app.core import rate_limit
+from app.core.exceptions import RateLimitExceeded
+from app.core.rate_limit import RateLimiter, RateLimitPolicy, client_ip, login_identity
+
+
+def _scope(peer: str, real_ip: str = None) -> dict:
+    headers = [(b"x-real-ip", real_ip.encode())] if real_ip else []
+    return {"type": "http", "client": (peer, 50000), "headers": headers}
+
+
+def test_real_ip_ignored_without_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", [])
+    assert client_ip(_scope("203.0.113.5", "10.9.9.9")) == "203.0.113.5"
+
+
+def test_real_ip_used_only_from_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+    assert client_ip(_scope("10.0.0.2", "198.51.100.7")) == "198.51.100.7"
+    # 非代理地址伪造的 X-Real-IP 不生效
+    assert client_ip(_scope("203.0.113.5", "198.51.100.7")) == "203.0.113.5"
+
+
+async def test_login_limited_per_account_not_per_ip(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", [])
+    limiter = RateLimiter(policies=[], default_policy=RateLimitPolicy("default", 60))
+    policy = RateLimitPolicy("login_account", 3, by_user=False)
+    scope = _scope("203.0.113.5")
+
+    for _ in range(3):
+        await limiter.enforce(policy, login_identity(scope, "Alice"))
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await limiter.enforce(policy, login_identity(scope, " alice "))
+    assert excinfo.value.status_code == 429
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+
+    # 同一出口 IP 的其他账号不受影响
+    await limiter.enforce(policy, login_identity(scope, "bob"))
@@ -0,0 +1,47 @@
+"""
+Refresh Token 轮换存储测试
+"""
+import pytest
+
+from app.core.refresh_tokens import (
+    RefreshTokenRejected,
+    RefreshTokenStoreUnavailable,
+    refresh_tokens,
+)
+
+CLAIMS = {"sub": "u1", "email": "u1@example.com", "role": "student", "active": True, "ver": 0}
+
+
+async def test_rotate_and_detect_reuse(fake_cache):
+    ids = refresh_tokens.new_token_ids()
+    await refresh_tokens.register({**CLAIMS, **ids})
+    payload = {"sub": "u1", "ver": 0, **ids}
+
+    snapshot = await refresh_tokens.rotate(payload, "next")
+    assert snapshot == {"email": "u1@example.com", "role": "student", "active": True, "ver": 0}
+
+    with pytest.raises(RefreshTokenRejected):
+        await refresh_tokens.rotate(payload, "again")
+    # 重复使用后整个家族被吊销
+    with pytest.raises(RefreshTokenRejected):
+        await refresh_tokens.rotate({**payload, "jti": "next"}, "third")
+
+
+async def test_revoked_family_rejected(fake_cache):
+    ids = refresh_tokens.new_token_ids()
+    await refresh_tokens.register({**CLAIMS, **ids})
+    await refresh_tokens.revoke_family(ids["fam"])
+    with pytest.raises(RefreshTokenRejected):
+        await refresh_tokens.rotate({"sub": "u1", "ver": 0, **ids}, "next")
+
+
+async def test_unavailable_while_breaker_open(fake_cache):
+    fake_cache.breaker.trip(ConnectionError("down"))
+    ids = refresh_tokens.new_token_ids()
+
+    # 登记降级为空操作；吊销与轮换无法确认时抛出异常，由接口返回 503
+    await refresh_tokens.register({**CLAIMS, **ids})
+    with pytest.raises(RefreshTokenStoreUnavailable):
+        await refresh_tokens.revoke_family(ids["fam"])
+    with pytest.raises(RefreshTokenStoreUnavailable):
+        await refresh_tokens.rotate({"sub": "u1", "ver": 0, **ids}, "next")
@@ -0,0 +1,51 @@
+"""
+Token 版本登记表测试
+"""
+import asyncio
+
+import fakeredis
+from fakeredis import aioredis
+
+from app.core.token_versions import TokenVersionRegistry
+
+
+async def _wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def test_not_ready_while_redis_down_then_recovers(monkeypatch):
+    server = fakeredis.FakeServer()
+    server.connected = False
+    monkeypatch.setattr(asyncio, "sleep", _fast_sleep)
+
+    registry = TokenVersionRegistry()
+    registry._redis = aioredis.FakeRedis(server=server, decode_responses=True)
+    task = asyncio.create_task(registry._listen())
+    try:
+        await _real_sleep(0.05)
+        assert not registry.ready
+
+        # Redis 恢复：后台重试完成订阅与快照加载
+        server.connected = True
+        await registry._redis.hset(registry.HASH_KEY, "u1", TokenVersionRegistry._encode(3, True, 2e9))
+        await _wait_until(lambda: registry.ready)
+        assert not registry.is_valid("u1", 2)
+        assert registry.is_valid("u1", 3)
+
+        # 订阅建立后的变更实时生效
+        await registry._redis.publish(registry.CHANNEL, f"u2={TokenVersionRegistry._encode(1, False, 2e9)}")
+        await _wait_until(lambda: not registry.is_valid("u2", 5))
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _fast_sleep(delay: float) -> None:
+    """缩短重连退避等待"""
+    await _real_sleep(min(delay, 0.01))
@@ -0,0 +1,96 @@
+"""
+缓存编解码基准（纯 CPU，无需 Redis）
+
+    python -m benchmarks.codecs [--number 2000] [--page-size 20]
+
+对典型缓存值（错题列表分页、统计字典）比较各编解码器的编码 / 解码耗时与编码后体积，
+并给出开启 zstd 压缩（阈值 1024 字节）后的体积。未安装的可选依赖（orjson / msgpack / zstandard）跳过。
+"""
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+from app.core import codecs
+from app.core.codecs import CacheSerializer
+from app.schemas.error_question import ErrorQuestionResponse
+
+
+def question_page(size: int) -> dict:
+    """错题列表分页（按 ErrorQuestionResponse 序列化）"""
+    now = datetime(2026, 1, 1)
+    items = [
+        ErrorQuestionResponse(
+            id=str(uuid.uuid4()),
+            user_id=str(uuid.uuid4()),
+            subject="数学",
+            chapter="二次函数",
+            question_text=f"已知函数 f(x) = x^2 - {index}x + 3，求 f(x) 在区间 [0, 4] 上的最大值与最小值。" * 3,
+            question_image_url=f"https://example.com/images/{index}.png",
+            correct_answer="最大值为 3，最小值为 -1，在 x = 2 处取得",
+            user_answer="最大值为 3，最小值为 -1",
+            explanation="配方得 f(x) = (x - 2)^2 - 1，对称轴在区间内，最小值在顶点处取得。" * 2,
+            tags=["期中", "易错"],
+            review_count=index % 5,
+            mastery_level=0.25 * (index % 4),
+            last_reviewed_at=now - timedelta(days=index),
+            next_review_at=now + timedelta(days=index),
+            is_archived=False,
+            is_favorite=index % 3 == 0,
+            created_at=now,
+            updated_at=now,
+        ).model_dump(mode="json")
+        for index in range(size)
+    ]
+    return {"items": items, "total": size * 10, "page": 1, "page_size": size}
+
+
+def statistics_dict() -> dict:
+    """错题统计"""
+    return {
+        "total": 1234,
+        "by_subject": {subject: 100 + index for index, subject in enumerate(["数学", "物理", "化学", "英语", "语文"])},
+        "by_error_type": {name: 50 + index for index, name in enumerate(["计算错误", "概念不清", "审题错误"])},
+        "mastery": {"mastered": 300, "learning": 600, "new": 334},
+    }
+
+
+def available_codecs():
+    yield "json"
+    if codecs.orjson is not None:
+        yield "orjson"
+    if codecs.msgpack is not None:
+        yield "msgpack"
+
+
+def bench(name: str, value: dict, number: int) -> None:
+    print(f"\n{name}")
+    print(f"{'codec':<10} {'encode µs':>10} {'decode µs':>10} {'bytes':>8} {'zstd bytes':>11}")
+    for codec in available_codecs():
+        serializer = CacheSerializer(codec=codec)
+        data = serializer.dumps(value)
+        assert serializer.loads(data) == value
+        encode = timeit.timeit(lambda serializer=serializer: serializer.dumps(value), number=number) / number * 1e6
+        decode = timeit.timeit(lambda serializer=serializer, data=data: serializer.loads(data), number=number) / number * 1e6
+
+        compressed = "-"
+        if codecs.zstandard is not None:
+            compressed = str(len(CacheSerializer(codec=codec, compress_threshold=1024).dumps(value)))
+        print(f"{codec:<10} {encode:>10.1f} {decode:>10.1f} {len(data):>8} {compressed:>11}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    missing = [name for name in ("orjson", "msgpack", "zstandard") if getattr(codecs, name) is None]
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+    bench(f"question page ({args.page_size} items)", question_page(args.page_size), args.number)
+    bench("statistics", statistics_dict(), args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+基准脚本公共工具
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, List, Optional
+
+import fakeredis
+from fakeredis import aioredis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import app.models  # noqa: F401  注册全部模型
+from app.core.cache import cache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.database import Base
+
+
+async def connect_redis(fake: bool) -> str:
+    """连接 REDIS_URL 指向的 Redis；fake=True 时使用进程内 fakeredis（只用于验证正确性，耗时无参考意义）"""
+    if fake:
+        server = fakeredis.FakeServer()
+        cache.redis = aioredis.FakeRedis(server=server, decode_responses=True)
+        cache.raw = aioredis.FakeRedis(server=server)
+        cache.breaker = CircuitBreaker("redis-benchmark")
+        return "fakeredis"
+    await cache.connect()
+    # 基准需要真实连接，不可用时直接报错而不是测出降级路径的耗时
+    await cache.redis.ping()
+    return "redis"
+
+
+def add_database_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCHMARK_DATABASE_URL"),
+        help="基准专用的 PostgreSQL（默认读取 BENCHMARK_DATABASE_URL），会在其中建表并写入测试数据",
+    )
+
+
+async def connect_database(url: Optional[str]) -> AsyncEngine:
+    """连接基准数据库并按当前模型建表（不删除已有数据，不要指向生产库）"""
+    if not url:
+        raise SystemExit("--database-url or BENCHMARK_DATABASE_URL is required")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+class StatementCounter:
+    """统计引擎发出的 SQL 语句数（每条语句一次数据库往返，不含 BEGIN / COMMIT）"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+async def measure(operation: Callable[[], Awaitable[object]], rounds: int) -> List[float]:
+    """顺序执行 rounds 次，返回每次耗时（毫秒）"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: List[float]) -> None:
+    """输出中位数与 P95"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<40} n={len(samples):<6} median={statistics.median(ordered):8.3f}ms  p95={p95:8.3f}ms")
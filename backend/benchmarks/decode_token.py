@@ -0,0 +1,64 @@
+"""
+JWT 校验缓存基准（纯 CPU，无需 Redis）
+
+    python -m benchmarks.decode_token [--number 20000] [--calls-per-page 8]
+
+比较 decode_token 每次调用的耗时：
+- uncached：关闭已验证 Token 缓存（max_size=0），每次都做 HMAC 校验与 JSON 解析
+- cached：同一 Token 重复调用，命中 LRU
+- page load：模拟一次页面加载中同一 Token 的 --calls-per-page 次 API 调用（首次未命中，其余命中）
+"""
+import argparse
+import timeit
+import uuid
+
+from app.core import security
+from app.core.security import create_access_token, decode_token
+
+
+def per_call_us(statement, number: int) -> float:
+    return timeit.timeit(statement, number=number) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--calls-per-page", type=int, default=8)
+    args = parser.parse_args()
+
+    cache = security.token_cache
+    max_size = cache.max_size
+    claims = {"sub": str(uuid.uuid4()), "email": "bench@example.com", "role": "student", "active": True, "ver": 0}
+    token = create_access_token(claims)
+
+    cache.max_size = 0
+    cache.clear()
+    uncached = per_call_us(lambda: decode_token(token), args.number)
+
+    cache.max_size = max_size
+    decode_token(token)
+    cached = per_call_us(lambda: decode_token(token), args.number)
+
+    # 每次页面加载使用新 Token：首次调用校验签名，其余命中缓存
+    tokens = [create_access_token({**claims, "sub": str(uuid.uuid4())}) for _ in range(args.number // args.calls_per_page)]
+    cache.clear()
+    cache.hits = cache.misses = 0
+
+    def page_loads() -> None:
+        for page_token in tokens:
+            for _ in range(args.calls_per_page):
+                decode_token(page_token)
+
+    page = timeit.timeit(page_loads, number=1) / len(tokens) * 1e6
+    stats = cache.stats()
+
+    print(f"{'uncached decode_token':<32} {uncached:8.2f} µs/call")
+    print(f"{'cached decode_token':<32} {cached:8.2f} µs/call  ({uncached / cached:.1f}x)")
+    print(
+        f"{'page load (' + str(args.calls_per_page) + ' calls)':<32} {page:8.2f} µs/page  "
+        f"vs {uncached * args.calls_per_page:.2f} µs uncached, hit_rate={stats['hit_rate']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
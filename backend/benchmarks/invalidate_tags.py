@@ -0,0 +1,79 @@
+"""
+按标签失效基准
+
+    python -m benchmarks.invalidate_tags [--keys 2000] [--rounds 20] [--fake]
+
+1. 耗时：每轮写入 --keys 个带标签的键，测量 invalidate_tags 的耗时（一次脚本调用 + 一次发布流水线）
+2. 并发写入：失效进行期间持续写入带同一标签的新键，结束后统计“键仍存在但不在任何标签集合中”的
+   孤儿键数量（之后的 invalidate_tags 无法再删除它们），原子失效下应为 0
+"""
+import argparse
+import asyncio
+import uuid
+
+from app.core.cache import cache
+from benchmarks.common import connect_redis, measure, report
+
+TAG = "bench:invalidate"
+
+
+async def fill(prefix: str, count: int) -> None:
+    items = {f"{prefix}:{index}": {"index": index} for index in range(count)}
+    await cache.mset(items, expire=300, tags=[TAG])
+
+
+async def bench_latency(keys: int, rounds: int) -> None:
+    async def invalidate() -> None:
+        deleted = await cache.invalidate_tags(TAG)
+        assert deleted == keys, deleted
+
+    samples = []
+    for _ in range(rounds):
+        await fill(f"bench:{uuid.uuid4().hex}", keys)
+        samples += await measure(invalidate, 1)
+    report(f"invalidate_tags ({keys} keys)", samples)
+
+
+async def bench_concurrent_writes(keys: int, rounds: int) -> None:
+    prefix = f"bench:{uuid.uuid4().hex}"
+    written = []
+
+    async def writer() -> None:
+        for index in range(keys):
+            key = f"{prefix}:w{index}"
+            await cache.set(key, index, expire=300, tags=[TAG])
+            written.append(key)
+
+    async def invalidator() -> None:
+        for _ in range(rounds):
+            await cache.invalidate_tags(TAG)
+            await asyncio.sleep(0)
+
+    await fill(prefix, keys)
+    await asyncio.gather(writer(), invalidator())
+
+    tagged = await cache.redis.smembers(f"{cache.TAG_PREFIX}{TAG}")
+    existing = [key for key, found in zip(written, await cache.redis.mget(written), strict=True) if found is not None]
+    orphans = [key for key in existing if key not in tagged]
+    print(f"{'concurrent writes':<40} written={len(written)} existing={len(existing)} orphans={len(orphans)}")
+
+    await cache.invalidate_tags(TAG)
+    await cache.delete_many(orphans)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fake", action="store_true", help="使用 fakeredis")
+    args = parser.parse_args()
+
+    print(f"backend: {await connect_redis(args.fake)}")
+    await cache.invalidate_tags(TAG)
+    await bench_latency(args.keys, args.rounds)
+    await bench_concurrent_writes(args.keys, args.rounds)
+    await cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+错题修改 / 删除基准：改造前的 SELECT + ORM 修改 + refresh 与当前的单条 UPDATE / DELETE ... RETURNING
+
+    python -m benchmarks.question_mutations --database-url postgresql+asyncpg://... [--rounds 500]
+
+每次操作使用新的会话（相当于一个请求），统计每次操作的 SQL 语句数（往返次数）与耗时。
+改造前的实现按 PUT / DELETE /errors/{id} 原有逻辑在本文件中保留，仅用于对比。
+需要 PostgreSQL：会在目标库中建表，写入一个基准用户及其错题，结束后删除该用户（级联删除错题）。
+"""
+import argparse
+import asyncio
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.database import AppSession
+from app.models.error_question import DifficultyLevel, ErrorQuestion
+from app.models.user import User
+from app.schemas.error_question import ErrorQuestionCreate, ErrorQuestionResponse
+from app.services import error_questions, question_counters
+from benchmarks.common import (
+    StatementCounter,
+    add_database_argument,
+    connect_database,
+    measure,
+    report,
+)
+
+
+async def legacy_update(db, user_id, question_id, changes: Dict[str, Any]) -> ErrorQuestionResponse:
+    """改造前：SELECT → ORM 修改 → 提交 → refresh"""
+    result = await db.execute(
+        select(ErrorQuestion).where(ErrorQuestion.id == question_id, ErrorQuestion.user_id == user_id)
+    )
+    question = result.scalar_one_or_none()
+    old_dimensions = question_counters.dimensions_of(question)
+    for field, value in changes.items():
+        setattr(question, field, value)
+    await question_counters.apply_deltas(
+        db,
+        user_id,
+        question_counters.question_deltas(old_dimensions, question_counters.dimensions_of(question)),
+    )
+    await db.commit()
+    await db.refresh(question)
+    return ErrorQuestionResponse.model_validate(question)
+
+
+async def current_update(db, user_id, question_id, changes: Dict[str, Any]) -> ErrorQuestionResponse:
+    """当前：UPDATE ... RETURNING → 提交"""
+    rows = await error_questions.update_questions(db, user_id, [question_id], changes)
+    await db.commit()
+    return ErrorQuestionResponse.model_validate(dict(rows[0]))
+
+
+async def legacy_delete(db, user_id, question_id) -> None:
+    """改造前：SELECT → ORM 删除（加载关联集合）→ 提交"""
+    result = await db.execute(
+        select(ErrorQuestion).where(ErrorQuestion.id == question_id, ErrorQuestion.user_id == user_id)
+    )
+    question = result.scalar_one_or_none()
+    await db.delete(question)
+    await question_counters.apply_deltas(
+        db,
+        user_id,
+        question_counters.question_deltas(question_counters.dimensions_of(question), None),
+    )
+    await db.commit()
+
+
+async def current_delete(db, user_id, question_id) -> None:
+    """当前：DELETE ... RETURNING → 提交"""
+    rows = await error_questions.delete_questions(db, user_id, [question_id])
+    assert rows
+    await db.commit()
+
+
+async def seed(factory, user_id, count: int) -> List[uuid.UUID]:
+    ids: List[uuid.UUID] = []
+    for start in range(0, count, 500):
+        items = [
+            ErrorQuestionCreate(
+                subject=("math", "physics", "chemistry")[index % 3],
+                chapter="二次函数",
+                question_text=f"已知函数 f(x) = x^2 - {index}x + 3，求最值。",
+                tags=["期中"],
+            )
+            for index in range(start, min(start + 500, count))
+        ]
+        async with factory() as db:
+            rows = await error_questions.insert_questions(db, user_id, items)
+            await db.commit()
+        ids += [row["id"] for row in rows]
+    return ids
+
+
+async def run(factory, counter: StatementCounter, name: str, operation, args_list: List[tuple]) -> None:
+    pending = iter(args_list)
+
+    async def one() -> None:
+        async with factory() as db:
+            await operation(db, *next(pending))
+
+    before = counter.count
+    samples = await measure(one, len(args_list))
+    report(name, samples)
+    print(f"{'':<40} statements/op={(counter.count - before) / len(args_list):.1f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_database_argument(parser)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = await connect_database(args.database_url)
+    factory = async_sessionmaker(engine, class_=AppSession, expire_on_commit=False)
+    counter = StatementCounter(engine)
+
+    name = f"bench_{uuid.uuid4().hex[:8]}"
+    async with factory() as db:
+        user = User(username=name, email=f"{name}@example.com", password_hash="x")
+        db.add(user)
+        await db.commit()
+
+    try:
+        # 每种实现各修改、各删除 rounds 条不同的错题
+        ids = await seed(factory, user.id, args.rounds * 2)
+        legacy_ids, current_ids = ids[:args.rounds], ids[args.rounds:]
+        changes = [
+            {"difficulty": (DifficultyLevel.HARD, DifficultyLevel.EASY)[index % 2], "user_answer": f"answer {index}"}
+            for index in range(args.rounds)
+        ]
+
+        await run(factory, counter, "update: SELECT + ORM + refresh", legacy_update,
+                  [(user.id, qid, change) for qid, change in zip(legacy_ids, changes, strict=True)])
+        await run(factory, counter, "update: UPDATE ... RETURNING", current_update,
+                  [(user.id, qid, change) for qid, change in zip(current_ids, changes, strict=True)])
+        await run(factory, counter, "delete: SELECT + ORM delete", legacy_delete,
+                  [(user.id, qid) for qid in legacy_ids])
+        await run(factory, counter, "delete: DELETE ... RETURNING", current_delete,
+                  [(user.id, qid) for qid in current_ids])
+    finally:
+        async with factory() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+限流基准
+
+    python -m benchmarks.rate_limit [--rounds 2000] [--concurrency 50] [--fake]
+
+1. Lua 令牌桶：RateLimiter.hit 经 Redis 脚本的单次耗时，以及 --concurrency 个并发请求下的吞吐
+2. 配额：同一主体并发发起 --concurrency 个请求，放行数应恰好等于桶容量（多个 worker 共享配额的前提）
+3. 进程内降级：Redis 不可用（cache.redis 为 None）时 RateLimiter.hit 回退到 LocalTokenBuckets 的耗时
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.core.cache import cache
+from app.core.rate_limit import RateLimiter, RateLimitPolicy
+from benchmarks.common import connect_redis, measure, report
+
+# 容量足够大，测量耗时时不触发限流
+POLICY = RateLimitPolicy("bench", per_minute=10_000_000)
+
+
+def new_limiter() -> RateLimiter:
+    return RateLimiter(policies=[], default_policy=POLICY)
+
+
+async def bench_latency(name: str, limiter: RateLimiter, rounds: int) -> None:
+    identity = f"user:{uuid.uuid4().hex}"
+    samples = await measure(lambda: limiter.hit(POLICY, identity), rounds)
+    report(name, samples)
+
+
+async def bench_throughput(name: str, limiter: RateLimiter, rounds: int, concurrency: int) -> None:
+    # 每个并发任务使用不同主体，模拟多个用户同时请求
+    identities = [f"user:{uuid.uuid4().hex}" for _ in range(concurrency)]
+
+    async def worker(identity: str) -> None:
+        for _ in range(rounds // concurrency):
+            await limiter.hit(POLICY, identity)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(identity) for identity in identities))
+    elapsed = time.perf_counter() - start
+    total = rounds // concurrency * concurrency
+    print(f"{name:<40} {total / elapsed:10.0f} hits/s  (concurrency={concurrency})")
+
+
+async def check_quota(limiter: RateLimiter, concurrency: int) -> None:
+    capacity = max(1, concurrency // 5)
+    # 补充速率极低，测量期间不会补充令牌
+    policy = RateLimitPolicy("bench_quota", per_minute=1, burst=capacity)
+    identity = f"user:{uuid.uuid4().hex}"
+    results = await asyncio.gather(*(limiter.hit(policy, identity) for _ in range(concurrency)))
+    allowed = sum(result[0] for result in results)
+    print(f"{'concurrent quota':<40} requests={concurrency} capacity={capacity} allowed={allowed}")
+    assert allowed == capacity, allowed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--fake", action="store_true", help="使用 fakeredis")
+    args = parser.parse_args()
+
+    print(f"backend: {await connect_redis(args.fake)}")
+    limiter = new_limiter()
+    await bench_latency("hit (redis lua)", limiter, args.rounds)
+    await bench_throughput("hit (redis lua)", limiter, args.rounds, args.concurrency)
+    await check_quota(limiter, args.concurrency)
+    assert limiter.fallbacks == 0, limiter.stats()
+
+    redis, cache.redis = cache.redis, None
+    try:
+        limiter = new_limiter()
+        await bench_latency("hit (local fallback)", limiter, args.rounds)
+        await bench_throughput("hit (local fallback)", limiter, args.rounds, args.concurrency)
+        await check_quota(limiter, args.concurrency)
+        assert limiter.fallbacks == limiter.allowed + limiter.limited, limiter.stats()
+    finally:
+        cache.redis = redis
+    await cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+"""
+错题全文检索基准（合成语料）
+
+    python -m benchmarks.search --database-url postgresql+asyncpg://... [--users 2000] [--per-user 1000] [--queries 200]
+
+1. 语料：--users 个基准用户 × 每人 --per-user 道错题（默认 200 万行），题目、解析、章节由中文短语随机拼接；
+   search_vector 为生成列，写入时由数据库计算。已存在同样规模的语料时直接复用（--reseed 重建）
+2. 检索：随机用户 × 随机关键词 × 筛选条件（无 / 学科 / 难度 / 错误类型），按 GET /errors/search 的方式
+   构造查询（相关度排序、多取一条判断下一页、生成高亮），统计耗时
+3. 对照：同样的关键词用 ILIKE '%关键词%' 逐行匹配三个文本列
+4. 输出一条检索语句的执行计划摘要，确认使用的索引
+
+需要 PostgreSQL：会在目标库中建表并写入大量数据，请使用基准专用库。
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.api.v1.errors import _filtered_query
+from app.models.error_question import ErrorQuestion
+from app.models.user import User
+from app.services import search
+from benchmarks.common import add_database_argument, connect_database, measure, report
+
+USER_PREFIX = "search_bench_"
+
+PHRASES = [
+    "已知二次函数的图像经过三点", "求函数在闭区间上的最大值与最小值", "利用配方法求顶点坐标",
+    "判断数列是否为等比数列", "求三角形外接圆的半径", "证明两条直线互相垂直",
+    "物体沿光滑斜面下滑", "对小球进行受力分析", "根据牛顿第二定律列方程", "计算电路中的总电阻",
+    "写出反应的化学方程式并配平", "计算溶液中溶质的质量分数", "判断氧化还原反应中的电子转移",
+    "阅读短文回答问题", "根据上下文选择恰当的时态", "分析文言文中虚词的用法",
+    "注意单位换算", "忽略了定义域的限制", "符号写错导致结果相反", "审题不清遗漏条件",
+]
+CHAPTERS = ["二次函数", "数列", "解三角形", "牛顿运动定律", "电路", "化学反应", "溶液", "阅读理解", "文言文"]
+SUBJECTS = ["math", "physics", "chemistry", "english", "chinese"]
+
+QUERIES = ["二次函数", "受力分析", "化学方程式 配平", "定义域", "最大值 最小值", "等比数列", "电阻", "时态"]
+FILTERS: List[Dict[str, Any]] = [{}, {"subject": "math"}, {"difficulty": "HARD"}, {"error_type": "CONCEPT"}]
+
+SEED_USERS_SQL = text("""
+INSERT INTO users (id, username, email, password_hash, role, is_active, is_verified, created_at, updated_at)
+SELECT gen_random_uuid(), CAST(:prefix AS text) || i, CAST(:prefix AS text) || i || '@example.com', 'x', 'STUDENT', true, false, now(), now()
+FROM generate_series(1, CAST(:users AS int)) AS i
+""")
+
+# 文本列由短语数组随机拼接，每行取值独立
+SEED_QUESTIONS_SQL = text("""
+INSERT INTO error_questions (
+    id, user_id, subject, chapter, question_text, explanation, difficulty, error_type,
+    review_count, mastery_level, is_archived, is_favorite, created_at, updated_at
+)
+SELECT gen_random_uuid(), u.id,
+       (CAST(:subjects AS text[]))[1 + i % cardinality(CAST(:subjects AS text[]))],
+       (CAST(:chapters AS text[]))[1 + floor(random() * cardinality(CAST(:chapters AS text[])))::int],
+       (CAST(:phrases AS text[]))[1 + floor(random() * cardinality(CAST(:phrases AS text[])))::int] || '，'
+           || (CAST(:phrases AS text[]))[1 + floor(random() * cardinality(CAST(:phrases AS text[])))::int] || '。f(x) = x^2 - ' || i || 'x + 3',
+       (CAST(:phrases AS text[]))[1 + floor(random() * cardinality(CAST(:phrases AS text[])))::int] || '，'
+           || (CAST(:phrases AS text[]))[1 + floor(random() * cardinality(CAST(:phrases AS text[])))::int],
+       (ARRAY['EASY', 'MEDIUM', 'HARD'])[1 + i % 3]::difficultylevel,
+       (ARRAY['CONCEPT', 'CALCULATION', 'CARELESS', 'METHOD', 'OTHER'])[1 + i % 5]::errortype,
+       i % 7, random(), i % 10 = 0, i % 6 = 0,
+       now() - i * interval '1 minute', now()
+FROM (SELECT id FROM users WHERE username LIKE CAST(:prefix AS text) || '%' ORDER BY username OFFSET :offset LIMIT :limit) AS u,
+     generate_series(1, CAST(:per_user AS int)) AS i
+""")
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN 语句（参数按原查询绑定；to_tsquery 的 regconfig 参数无法以字面量渲染）"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN {compiler.process(element.statement, **kw)}"
+
+
+async def seed(engine: AsyncEngine, users: int, per_user: int, reseed: bool) -> List[Any]:
+    """生成或复用语料，返回基准用户 ID"""
+    async with engine.connect() as conn:
+        existing = (await conn.execute(
+            select(User.id).where(User.username.like(f"{USER_PREFIX}%"))
+        )).scalars().all()
+        rows = 0
+        if existing:
+            rows = await conn.scalar(
+                select(func.count()).select_from(ErrorQuestion).where(ErrorQuestion.user_id.in_(existing))
+            )
+    if not reseed and len(existing) == users and rows == users * per_user:
+        print(f"reusing corpus: {users} users, {rows} questions")
+        return list(existing)
+
+    async with engine.begin() as conn:
+        # 错题、计数等随用户级联删除
+        await conn.execute(delete(User).where(User.username.like(f"{USER_PREFIX}%")))
+        await conn.execute(SEED_USERS_SQL, {"prefix": USER_PREFIX, "users": users})
+
+    params = {
+        "prefix": USER_PREFIX,
+        "per_user": per_user,
+        "subjects": SUBJECTS,
+        "chapters": CHAPTERS,
+        "phrases": PHRASES,
+    }
+    # 按用户分批写入，每批单独提交
+    batch = max(1, 200_000 // per_user)
+    start = time.perf_counter()
+    for offset in range(0, users, batch):
+        async with engine.begin() as conn:
+            await conn.execute(SEED_QUESTIONS_SQL, {**params, "offset": offset, "limit": batch})
+        done = min(offset + batch, users) * per_user
+        print(f"  seeded {done} / {users * per_user} questions ({time.perf_counter() - start:.0f}s)")
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE error_questions"))
+        return list((await conn.execute(
+            select(User.id).where(User.username.like(f"{USER_PREFIX}%"))
+        )).scalars().all())
+
+
+def search_query(user_id, keyword: str, filters: Dict[str, Any], limit: int = 20):
+    """与 GET /errors/search 相同的查询（首页）"""
+    terms = search.parse_terms(keyword)
+    tsquery = search.tsquery(terms)
+    rank = search.rank_expression(tsquery).label("rank")
+    query = _filtered_query(select(ErrorQuestion, rank), user_id, **filters).where(search.search_condition(tsquery))
+    return terms, query.order_by(rank.desc(), ErrorQuestion.id).limit(limit + 1)
+
+
+def ilike_query(user_id, keyword: str, filters: Dict[str, Any], limit: int = 20):
+    """对照：逐词 ILIKE 匹配三个文本列"""
+    query = _filtered_query(select(ErrorQuestion), user_id, **filters)
+    for term in search.parse_terms(keyword):
+        pattern = f"%{term}%"
+        query = query.where(or_(
+            ErrorQuestion.question_text.ilike(pattern),
+            ErrorQuestion.explanation.ilike(pattern),
+            ErrorQuestion.chapter.ilike(pattern),
+        ))
+    return query.order_by(ErrorQuestion.created_at.desc(), ErrorQuestion.id).limit(limit + 1)
+
+
+async def bench(engine: AsyncEngine, user_ids: List[Any], queries: int) -> None:
+    rng = random.Random(0)
+    cases = [(rng.choice(user_ids), rng.choice(QUERIES), rng.choice(FILTERS)) for _ in range(queries)]
+    hits: List[int] = []
+
+    async with engine.connect() as conn:
+        pending = iter(cases)
+
+        async def run_search() -> None:
+            user_id, keyword, filters = next(pending)
+            terms, query = search_query(user_id, keyword, filters)
+            rows = (await conn.execute(query)).all()
+            hits.append(len(rows))
+            for question, _ in rows:
+                search.highlights_of(question, terms)
+
+        report("full-text search (tsvector + GIN)", await measure(run_search, len(cases)))
+        print(f"{'':<40} avg rows/page={sum(hits) / len(hits):.1f}")
+
+        pending = iter(cases)
+
+        async def run_ilike() -> None:
+            user_id, keyword, filters = next(pending)
+            (await conn.execute(ilike_query(user_id, keyword, filters))).all()
+
+        report("ILIKE scan", await measure(run_ilike, len(cases)))
+
+        user_id, keyword, filters = cases[0]
+        _, query = search_query(user_id, keyword, filters)
+        plan = (await conn.execute(Explain(query))).scalars().all()
+        print(f"\nplan for {keyword!r} {filters}:")
+        for line in plan:
+            print(f"  {line}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_database_argument(parser)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--per-user", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--reseed", action="store_true", help="删除并重建语料")
+    args = parser.parse_args()
+
+    engine = await connect_database(args.database_url)
+    try:
+        user_ids = await seed(engine, args.users, args.per_user, args.reseed)
+        await bench(engine, user_ids, args.queries)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())